@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for Adw.MessageDialog body translation.
+
+Times SimpleLocalizationManager._translate_body_smart() on the bodies the
+upgrader shows repeatedly (password prompt, GNOME conflict warning,
+update-in-progress notice) plus a bulleted multi-paragraph body, with
+and without the per-(locale, body) LRU cache. It also checks that the
+cached path keeps bullets, blank lines and indentation exactly like the
+uncached one, and that a language switch invalidates the cache.
+
+Requires PyGObject with GTK 4/libadwaita.
+
+Usage:
+    python benchmarks/body_translation.py [--number N] [--lang LANG] [--app-dir PATH]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+
+BODIES = (
+    "Please enter your password to modify system packages.",
+    "Installing Kinexin Desktop alongside your current desktop (GNOME) may cause "
+    "configuration conflicts.\n\nYou can choose to remove GNOME completely to ensure "
+    "the best experience, or keep both installed side-by-side.",
+    "Linexin Updater is currently updating your system. Please wait for the update "
+    "to finish before restarting.",
+    "Please wait while the system is being updated...\n\n"
+    "• Install\n  • Continue\n•  Back\n\nThis may take several minutes.",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--lang", default="pl_PL.UTF-8")
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    os.environ["LC_ALL"] = args.lang
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from simple_localization_manager import get_localization_manager
+
+    manager = get_localization_manager()
+    language = manager.current_language
+
+    for body in BODIES:
+        expected = manager._translate_body_lines(language, body)
+        if manager._translate_body_smart(body) != expected:
+            print(f"FAIL: cached translation differs for {body!r}")
+            return 1
+
+    def uncached():
+        for body in BODIES:
+            manager._translate_body_lines(language, body)
+
+    def cached():
+        for body in BODIES:
+            manager._translate_body_smart(body)
+
+    calls = args.number * len(BODIES)
+    uncached_s = min(timeit.repeat(uncached, number=args.number, repeat=5))
+    cached_s = min(timeit.repeat(cached, number=args.number, repeat=5))
+    print(f"{language}, {len(BODIES)} bodies, {calls} translations per run")
+    print(f"uncached   {uncached_s / calls * 1e6:8.2f} us per body")
+    print(f"cached     {cached_s / calls * 1e6:8.2f} us per body   "
+          f"({uncached_s / cached_s:.1f}x faster)")
+    print(f"cache      {manager._translate_body_cached.cache_info()}")
+
+    # Switching language must not serve bodies of the previous one
+    other = "de_DE" if not language.startswith("de_") else "fr_FR"
+    manager.set_language(other)
+    stale = [body for body in BODIES
+             if manager._translate_body_smart(body)
+             != manager._translate_body_lines(manager.current_language, body)]
+    if stale:
+        print(f"FAIL: {len(stale)} bodies still cached for {language}")
+        return 1
+    print(f"OK: cache invalidated on switch to {manager.current_language}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
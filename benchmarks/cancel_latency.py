@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Cancel-to-idle latency of privileged and spawned operations, on fake backends.
+
+Starts the real privileged helper through a fake `sudo` (it execs the
+helper as the current user, with --test-root so that the helper accepts
+the fake programs and lock file in the benchmark's directory), runs fake
+`pacman` commands through it and cancels them, timing how long it takes
+from the cancel request until the run call has returned. Each fake pacman takes the lock file, starts a
+background child the way pacman starts its downloader, and behaves like
+one of:
+
+  cooperative  - cleans up on SIGINT (drops the lock) and exits
+  stubborn     - ignores SIGINT, dies on the SIGTERM that follows
+  hard-killed  - ignores SIGINT and SIGTERM; needs SIGKILL and leaves
+                 its lock behind for the helper to remove
+
+After every run the benchmark checks that nothing of the process group
+is left and that the lock is gone. With PyGObject installed it also
+times cancelling a program spawned by the TaskRunner.
+
+No root, pacman or network is needed.
+
+Usage:
+    python benchmarks/cancel_latency.py [--runs N] [--app-dir PATH]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+START_DELAY = 0.3  # seconds a fake command runs before it is cancelled
+IDLE_TIMEOUT = 30  # seconds a cancelled operation may take to stop
+
+FAKE_SUDO = """#!/bin/sh
+# Read the password, drop the options and run the helper as ourselves
+read -r _password
+while [ "$1" != "--" ]; do shift; done
+shift
+exec "$@" --test-root "$(dirname "$0")"
+"""
+
+FAKE_PACMAN = """#!/bin/sh
+# Called as `pacman -S --noconfirm <behaviour>`, a form the helper accepts;
+# the lock file and the background child's pid file live next to it
+lock="$(dirname "$0")/db.lck"
+touch "$lock"
+case "$3" in
+    cooperative) trap 'sleep 0.2; rm -f "$lock"; exit 130' INT ;;
+    stubborn) trap '' INT ;;
+    hard-killed) trap '' INT TERM ;;
+esac
+sleep 300 &
+echo $! > "$(dirname "$0")/child.pid"
+while :; do sleep 0.05; done
+"""
+
+SCENARIOS = ("cooperative", "stubborn", "hard-killed")
+
+
+def write_script(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(content)
+    os.chmod(path, 0o755)
+    return path
+
+
+def process_alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # A zombie is gone for our purposes, it only awaits its parent
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def cancel_privileged(helper, pacman, scenario, tmp, run_index):
+    """Run one fake pacman through the helper, cancel it; returns the latency in ms."""
+    lock = os.path.join(tmp, "db.lck")
+    pid_file = os.path.join(tmp, "child.pid")
+    for path in (lock, pid_file):
+        if os.path.exists(path):
+            os.unlink(path)
+
+    job = f"bench-{scenario}-{run_index}"
+    finished = threading.Event()
+
+    def run():
+        helper.run([pacman, "-S", "--noconfirm", scenario], check=False, job=job, lock=lock)
+        finished.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    if not wait_for(lambda: os.path.exists(pid_file) and os.path.getsize(pid_file), IDLE_TIMEOUT):
+        raise RuntimeError("the fake pacman did not start")
+    time.sleep(START_DELAY)
+    with open(pid_file) as f:
+        child = int(f.read())
+
+    start = time.perf_counter()
+    if not helper.cancel(job):
+        raise RuntimeError(f"the helper does not know job {job}")
+    if not finished.wait(IDLE_TIMEOUT):
+        raise RuntimeError(f"{scenario}: still running {IDLE_TIMEOUT} s after cancel")
+    latency = (time.perf_counter() - start) * 1000
+
+    if not wait_for(lambda: not process_alive(child), 1):
+        raise RuntimeError(f"{scenario}: background child {child} survived the cancel")
+    if os.path.exists(lock):
+        raise RuntimeError(f"{scenario}: lock file left behind")
+    return latency
+
+
+def cancel_spawned(runs):
+    """Cancel `sleep` spawned through the TaskRunner; returns latencies in ms, or None."""
+    try:
+        from gi.repository import GLib
+        from task_runner import TaskRunner
+    except ImportError:
+        return None
+
+    runner = TaskRunner()
+    loop = GLib.MainLoop()
+    samples = []
+
+    def one_run():
+        operation = runner.spawn(["sh", "-c", "sleep 300 & sleep 300"])
+        state = {}
+
+        def cancel():
+            state["start"] = time.perf_counter()
+            operation.cancel()
+            return False
+
+        def on_done(operation):
+            samples.append((time.perf_counter() - state["start"]) * 1000)
+            if not operation.cancelled():
+                raise RuntimeError(f"spawned operation ended with {operation.exception()!r}")
+            if len(samples) < runs:
+                one_run()
+            else:
+                loop.quit()
+
+        operation.add_done_callback(on_done)
+        GLib.timeout_add(int(START_DELAY * 1000), cancel)
+
+    one_run()
+    loop.run()
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<12} median {statistics.median(samples):8.1f} ms   "
+          f"min {min(samples):8.1f} ms   max {max(samples):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from privileged_helper import PrivilegedHelper, CANCEL_GRACE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_script(tmp, "sudo", FAKE_SUDO)
+        pacman = write_script(tmp, "pacman", FAKE_PACMAN)
+        os.environ["PATH"] = tmp + os.pathsep + os.environ["PATH"]
+
+        helper = PrivilegedHelper()
+        if not helper.start("password"):
+            print("FAIL: the helper did not start")
+            return 1
+        try:
+            print(f"cancel to idle, {args.runs} runs each "
+                  f"(signals escalate every {CANCEL_GRACE} s)")
+            for scenario in SCENARIOS:
+                samples = [cancel_privileged(helper, pacman, scenario, tmp, i)
+                           for i in range(args.runs)]
+                report(scenario, samples)
+        finally:
+            helper.stop()
+
+    samples = cancel_spawned(args.runs)
+    if samples is None:
+        print("spawned      skipped (PyGObject is not installed)")
+    else:
+        report("spawned", samples)
+    print("no leftover processes, every lock released")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the upgrader's Python import phase.
+
+Compares importing ``upgrader_app`` (and with it every widget module, the
+localization manager and the translations) in two setups:
+
+  source    - no usable bytecode cache, as on an install that only ships
+              .py files into a directory the desktop user cannot write to
+  bytecode  - bytecode precompiled with compileall, as the PKGBUILD ships
+
+Each run is a fresh interpreter. Requires PyGObject with GTK 4/libadwaita.
+
+Usage:
+    python benchmarks/cold_start.py [--runs N] [--app-dir PATH]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+
+
+def time_import(app_dir, pycache_prefix):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_prefix)
+    # -B: never write bytecode, just like the read-only system install
+    cmd = [sys.executable, "-B", "-c", "import upgrader_app"]
+    start = time.perf_counter()
+    subprocess.run(cmd, cwd=app_dir, env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_series(label, app_dir, pycache_prefix, runs):
+    samples = [time_import(app_dir, pycache_prefix) for _ in range(runs)]
+    print(f"{label:<10} median {statistics.median(samples):8.1f} ms   "
+          f"min {min(samples):8.1f} ms   max {max(samples):8.1f} ms")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+    app_dir = os.path.abspath(args.app_dir)
+
+    with tempfile.TemporaryDirectory() as empty_prefix, \
+         tempfile.TemporaryDirectory() as compiled_prefix:
+        subprocess.run(
+            [sys.executable, "-m", "compileall", "-q", app_dir],
+            env=dict(os.environ, PYTHONPYCACHEPREFIX=compiled_prefix),
+            check=True,
+        )
+
+        source = run_series("source", app_dir, empty_prefix, args.runs)
+        bytecode = run_series("bytecode", app_dir, compiled_prefix, args.runs)
+
+    print(f"saved      {source - bytecode:8.1f} ms per launch "
+          f"({(1 - bytecode / source) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Connectivity check against local listeners: the TCP race and the HTTP probe.
+
+Sets up, on 127.0.0.1:
+
+  refused   - a port nothing listens on
+  slow      - a listener whose backlog is full, so connects hang unanswered
+  accepting - a listener that accepts
+  http      - an HTTP server answering /generate_204 with 204 and
+              /portal with a login page, like a captive portal
+  proxy     - an HTTP proxy answering every request with 204
+
+and checks that the race picks the accepting listener past the other two
+without waiting on the slow one, gives up on refused and slow targets
+within its deadline, and that has_internet_connection() keeps to the
+same deadline however long the HTTP request may take, and lets the HTTP
+probe overrule the race: a portal means offline even though TCP got
+through, and a 204 through the proxy means online even though every
+direct connect failed. Times each case. No network access is needed.
+
+Used by check() in the PKGBUILD.
+
+Usage:
+    python benchmarks/connectivity.py [--deadline S] [--app-dir PATH]
+"""
+
+import argparse
+import http.server
+import os
+import socket
+import sys
+import threading
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+SLACK = 0.5  # seconds a check may overrun its deadline
+
+
+class ProbeHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.endswith("/generate_204"):
+            self.send_response(204)
+            self.end_headers()
+        else:
+            body = b"<html>Log in to use this network</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ProxyHandler(ProbeHandler):
+    def do_GET(self):
+        # A proxy gets the absolute URL; answer for the internet
+        self.send_response(204 if self.path.startswith("http://") else 400)
+        self.end_headers()
+
+
+def listener(backlog=8):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(backlog)
+    return sock
+
+
+def refused_port():
+    sock = listener()
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def slow_listener():
+    """A listener that leaves new connects hanging: its backlog is full."""
+    sock = listener(backlog=0)
+    fillers = []
+    # Linux queues backlog + 1 connections; later SYNs go unanswered
+    for _ in range(4):
+        filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        filler.setblocking(False)
+        filler.connect_ex(sock.getsockname())
+        fillers.append(filler)
+    time.sleep(0.1)
+    return sock, fillers
+
+
+def serve_http(handler):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def timed(operation):
+    start = time.perf_counter()
+    result = operation()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deadline", type=float, default=0.8)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from connectivity import race_connect, has_internet_connection
+
+    deadline = args.deadline
+    refused = ("127.0.0.1", refused_port())
+    slow_sock, fillers = slow_listener()
+    slow = slow_sock.getsockname()
+    accepting_sock = listener()
+    accepting = accepting_sock.getsockname()
+    http_server, http_url = serve_http(ProbeHandler)
+    proxy_server, proxy_url = serve_http(ProxyHandler)
+    # Local requests must not go through a proxy configured on this machine
+    for name in ("http_proxy", "HTTP_PROXY", "all_proxy", "ALL_PROXY"):
+        os.environ.pop(name, None)
+    os.environ["no_proxy"] = "*"
+
+    failures = []
+
+    def case(label, operation, expected, limit):
+        result, elapsed = timed(operation)
+        ok = result == expected and elapsed <= limit
+        print(f"{'ok' if ok else 'FAIL':<5}{label:<44} {elapsed * 1000:8.1f} ms  -> {result}")
+        if not ok:
+            failures.append(label)
+
+    try:
+        case("race: refused, slow, accepting",
+             lambda: race_connect([refused, slow, accepting], deadline),
+             accepting, deadline / 2)
+        case("race: refused, slow",
+             lambda: race_connect([refused, slow], deadline),
+             None, deadline + SLACK)
+        case("race: refused",
+             lambda: race_connect([refused], deadline),
+             None, SLACK)
+        case("online: accepting, 204",
+             lambda: has_internet_connection([accepting], deadline, f"{http_url}/generate_204", deadline),
+             True, deadline + SLACK)
+        case("captive portal: accepting, login page",
+             lambda: has_internet_connection([accepting], deadline, f"{http_url}/portal", deadline),
+             False, deadline + SLACK)
+        case("HTTP blocked: accepting, no HTTP answer",
+             lambda: has_internet_connection([accepting], deadline, f"http://{refused[0]}:{refused[1]}/", deadline),
+             True, deadline + SLACK)
+        case("offline: refused, no HTTP answer",
+             lambda: has_internet_connection([refused, slow], deadline, f"http://{refused[0]}:{refused[1]}/", deadline),
+             False, deadline + SLACK)
+        case("hanging HTTP: refused, slow, long timeout",
+             lambda: has_internet_connection([refused, slow], deadline, f"http://{slow[0]}:{slow[1]}/", 4 * deadline),
+             False, deadline + SLACK)
+
+        os.environ["http_proxy"] = proxy_url
+        del os.environ["no_proxy"]
+        case("behind a proxy: refused, slow, 204 via proxy",
+             lambda: has_internet_connection([refused, slow], deadline, probe_timeout=deadline),
+             True, deadline + SLACK)
+    finally:
+        http_server.shutdown()
+        proxy_server.shutdown()
+        for sock in (slow_sock, accepting_sock, *fillers):
+            sock.close()
+
+    if failures:
+        print(f"FAIL: {len(failures)} case(s) failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Memory stress test for the localization manager's original-text store.
+
+Creates and destroys thousands of translated Adw.MessageDialogs, the way
+the upgrader does for every confirmation and error, and samples resident
+memory and the Python heap every batch. Fails when, after a warm-up
+batch, memory keeps growing with the number of dialogs created or when
+the localization manager itself still holds allocations made for them.
+
+Requires PyGObject with GTK 4/libadwaita and a display (run it inside a
+desktop session or under xvfb-run / a headless Wayland compositor).
+
+Usage:
+    python benchmarks/dialog_churn.py [--dialogs N] [--batch N] [--app-dir PATH]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+# Growth per 1000 dialogs tolerated as allocator noise
+HEAP_TOLERANCE_KB = 64
+RSS_TOLERANCE_KB = 1024
+
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def churn(count, Adw, GLib, _):
+    context = GLib.MainContext.default()
+    for _i in range(count):
+        dialog = Adw.MessageDialog(
+            heading=_("Update Failed"),
+            body="• " + _("Check your internet connection") + "\n\n" + _("Try again later."),
+        )
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("ok", _("OK"))
+        dialog.set_heading(_("Reboot Required"))
+        dialog.destroy()
+    while context.pending():
+        context.iteration(False)
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dialogs", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+
+    import gi
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Adw", "1")
+    from gi.repository import Adw, GLib
+    from simple_localization_manager import _, get_localization_manager
+
+    Adw.init()
+    manager = get_localization_manager()
+    manager_file = sys.modules[type(manager).__module__].__file__
+
+    # Warm-up: fill caches, style data and allocator pools once
+    churn(args.batch, Adw, GLib, _)
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    base_rss = rss_kb()
+
+    created = 0
+    while created < args.dialogs:
+        churn(args.batch, Adw, GLib, _)
+        created += args.batch
+        heap_kb = tracemalloc.get_traced_memory()[0] // 1024
+        print(f"{created:7d} dialogs   RSS {rss_kb() - base_rss:+7d} KiB   "
+              f"heap {heap_kb:6d} KiB")
+
+    snapshot = tracemalloc.take_snapshot()
+    manager_kb = sum(
+        stat.size_diff for stat in snapshot.compare_to(baseline, "filename")
+        if stat.traceback[0].filename == manager_file
+    ) // 1024
+    heap_growth_kb = tracemalloc.get_traced_memory()[0] // 1024
+    rss_growth_kb = rss_kb() - base_rss
+    per_thousand = 1000 / args.dialogs
+
+    print(f"held by the localization manager: {manager_kb} KiB")
+    failed = False
+    if manager_kb > 0:
+        print("FAIL: the localization manager keeps state for destroyed dialogs")
+        failed = True
+    if heap_growth_kb * per_thousand > HEAP_TOLERANCE_KB:
+        print(f"FAIL: Python heap grew {heap_growth_kb} KiB")
+        failed = True
+    if rss_growth_kb * per_thousand > RSS_TOLERANCE_KB:
+        print(f"FAIL: RSS grew {rss_growth_kb} KiB")
+        failed = True
+    if not failed:
+        print("OK: memory stays flat")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+First-frame latency with and without the font fallback pre-warm.
+
+Launches the upgrader with --trace-startup under a CJK or Devanagari
+locale, once with the background pre-warm and once with
+LINEXIN_UPGRADER_NO_FONT_PREWARM=1, and reads the "launch to first frame"
+span from each trace. The upgrader is stopped as soon as its trace has
+been written.
+
+Requires PyGObject with GTK 4/libadwaita, a display, and fonts for the
+chosen script (e.g. noto-fonts-cjk for zh_CN).
+
+Usage:
+    python benchmarks/font_prewarm.py [--runs N] [--lang LANG] [--app-dir PATH]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+TRACE_TIMEOUT = 30  # seconds to wait for the first frame
+
+
+def first_frame_ms(app_dir, lang, prewarm, trace_path):
+    env = dict(os.environ, LANG=lang, LC_ALL=lang)
+    env.pop("LINEXIN_UPGRADER_NO_FONT_PREWARM", None)
+    if not prewarm:
+        env["LINEXIN_UPGRADER_NO_FONT_PREWARM"] = "1"
+    if os.path.exists(trace_path):
+        os.unlink(trace_path)
+
+    process = subprocess.Popen(
+        [sys.executable, "upgrader", f"--trace-startup={trace_path}"],
+        cwd=app_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + TRACE_TIMEOUT
+        while not os.path.exists(trace_path):
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("the upgrader did not paint a first frame")
+            time.sleep(0.05)
+        # The trace is written in one go; wait until it parses
+        while True:
+            try:
+                with open(trace_path) as f:
+                    trace = json.load(f)
+                break
+            except ValueError:
+                time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait()
+
+    span = next(e for e in trace["traceEvents"] if e["name"] == "launch to first frame")
+    return span["dur"] / 1000, trace.get("metadata", {}).get("font_prewarm")
+
+
+def run_series(label, app_dir, lang, prewarm, runs, trace_path):
+    samples = []
+    for _ in range(runs):
+        ms, state = first_frame_ms(app_dir, lang, prewarm, trace_path)
+        samples.append(ms)
+    print(f"{label:<12} median {statistics.median(samples):8.1f} ms   "
+          f"min {min(samples):8.1f} ms   max {max(samples):8.1f} ms   "
+          f"(font_prewarm: {state})")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--lang", default="zh_CN.UTF-8")
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+    app_dir = os.path.abspath(args.app_dir)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path = os.path.join(tmp, "trace.json")
+        print(f"LANG={args.lang}, launch to first frame")
+        without = run_series("no prewarm", app_dir, args.lang, False, args.runs, trace_path)
+        with_prewarm = run_series("prewarm", app_dir, args.lang, True, args.runs, trace_path)
+
+    print(f"saved        {without - with_prewarm:8.1f} ms of first-frame latency")
+
+
+if __name__ == "__main__":
+    main()
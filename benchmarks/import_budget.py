@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the upgrader entry point.
+
+Runs ``python -X importtime -c "import upgrader_app"`` and fails when:
+
+  - a page module or one of the heavy dependencies that should only load
+    with its page or on first use is imported at startup (by our modules;
+    what the PyGObject stack imports for itself is not ours to defer), or
+  - the time spent importing our own modules (everything except the
+    PyGObject/GTK stack, which we do not control) exceeds the budget.
+
+Used by check() in the PKGBUILD. Requires PyGObject with GTK 4/libadwaita.
+
+Usage:
+    python benchmarks/import_budget.py [--budget-ms N] [--app-dir PATH]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+DEFAULT_BUDGET_MS = 75
+
+# Modules that must only be imported once their page is built, or once
+# the helper that needs them first runs
+DEFERRED_MODULES = (
+    "welcome_widget",
+    "news_widget",
+    "update1_slide1",
+    "update1_slide2",
+    "update2_slide1",
+    "update3_slide1",
+    "finish_widget",
+    "urllib.request",
+    "configparser",
+    "cairo",
+    "socket",
+    "shutil",
+    "subprocess",
+)
+
+
+def collect_importtime(app_dir):
+    """Return [(level, self_us, cumulative_us, name)] for a warm import."""
+    with tempfile.TemporaryDirectory() as prefix:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=prefix)
+        cmd = [sys.executable, "-X", "importtime", "-c", "import upgrader_app"]
+        # First run fills the bytecode cache, the second one is measured
+        subprocess.run(cmd, cwd=app_dir, env=env, check=True,
+                       stderr=subprocess.DEVNULL)
+        result = subprocess.run(cmd, cwd=app_dir, env=env, check=True,
+                                stderr=subprocess.PIPE, text=True)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, raw_name = line[len("import time:"):].split("|")
+        name = raw_name.rstrip()
+        level = (len(name) - len(name.lstrip())) // 2
+        rows.append((level, int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def walk_gi(rows):
+    """Yield (row, is_gi, parent_in_gi) for every row, parents first."""
+    # importtime prints children before their parent; walking it backwards
+    # visits parents first, so we can tell top-level gi imports apart from
+    # modules pulled in by gi itself.
+    stack = []
+    for row in reversed(rows):
+        level, _, _, name = row
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        parent_in_gi = stack[-1][1] if stack else False
+        is_gi = name == "gi" or name.startswith("gi.")
+        yield row, is_gi, parent_in_gi
+        stack.append((level, parent_in_gi or is_gi))
+
+
+def own_imports(rows):
+    """Names of the modules imported outside the PyGObject stack."""
+    return {row[3] for row, is_gi, parent_in_gi in walk_gi(rows)
+            if not (is_gi or parent_in_gi)}
+
+
+def split_costs(rows):
+    """Return (total_us, gi_us) for the upgrader_app import."""
+    total_us = next(cum for _, _, cum, name in rows if name == "upgrader_app")
+    gi_us = sum(row[2] for row, is_gi, parent_in_gi in walk_gi(rows)
+                if is_gi and not parent_in_gi)
+    return total_us, gi_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    rows = collect_importtime(os.path.abspath(args.app_dir))
+    imported = own_imports(rows)
+
+    failed = False
+    for module in DEFERRED_MODULES:
+        if module in imported:
+            print(f"FAIL: {module} is imported at startup")
+            failed = True
+
+    total_us, gi_us = split_costs(rows)
+    own_ms = (total_us - gi_us) / 1000
+    print(f"upgrader_app import: {total_us / 1000:.1f} ms total, "
+          f"{gi_us / 1000:.1f} ms PyGObject/GTK, {own_ms:.1f} ms own "
+          f"(budget {args.budget_ms:.0f} ms)")
+    if own_ms > args.budget_ms:
+        print("FAIL: import-time budget exceeded")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
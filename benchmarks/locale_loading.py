@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Per-launch cost of loading translations in the localization manager.
+
+Compares, in a fresh interpreter each run:
+
+  all     - every shipped locale loaded up front (the old behaviour,
+            reproduced with load_translations())
+  active  - only the detected locale and the en_US fallback (the default)
+
+for both translation backends: the translations/*.py modules, and the
+mmapped catalogs the PKGBUILD compiles. Reports wall time spent in the
+manager, resident memory it added and Python heap it allocated.
+
+Requires PyGObject with GTK 4/libadwaita.
+
+Usage:
+    python benchmarks/locale_loading.py [--runs N] [--lang LANG] [--app-dir PATH]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+
+MEASURE = r"""
+import json, os, sys, time, tracemalloc
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+import simple_localization_manager as slm
+
+rss_before = rss_kb()
+tracemalloc.start()
+start = time.perf_counter()
+manager = slm.get_localization_manager()
+if sys.argv[1] == "all":
+    manager.load_translations()
+elapsed_ms = (time.perf_counter() - start) * 1000
+heap_kb = tracemalloc.get_traced_memory()[0] // 1024
+tracemalloc.stop()
+
+print(json.dumps({
+    "ms": elapsed_ms,
+    "rss_kb": rss_kb() - rss_before,
+    "heap_kb": heap_kb,
+    "locales": len(set(map(id, manager.translations.values()))),
+}))
+"""
+
+
+def measure(app_dir, mode, lang):
+    env = dict(os.environ, LANG=lang, LC_ALL=lang, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE, mode],
+        cwd=app_dir, env=env, check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def run_series(label, app_dir, mode, lang, runs):
+    samples = [measure(app_dir, mode, lang) for _ in range(runs)]
+    result = {key: statistics.median(s[key] for s in samples)
+              for key in ("ms", "rss_kb", "heap_kb", "locales")}
+    print(f"{label:<18} {result['locales']:3.0f} locales   "
+          f"{result['ms']:7.2f} ms   {result['rss_kb']:7.0f} KiB RSS   "
+          f"{result['heap_kb']:7.0f} KiB heap")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--lang", default="pl_PL.UTF-8")
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Work on copies so the catalogs are never written into the tree
+        modules_dir = os.path.join(tmp, "modules")
+        catalogs_dir = os.path.join(tmp, "catalogs")
+        ignore = shutil.ignore_patterns("__pycache__", "*.catalog")
+        shutil.copytree(os.path.abspath(args.app_dir), modules_dir, ignore=ignore)
+        shutil.copytree(os.path.abspath(args.app_dir), catalogs_dir, ignore=ignore)
+        subprocess.run(
+            [sys.executable, "translation_catalog.py", "translations"],
+            cwd=catalogs_dir, check=True, stdout=subprocess.DEVNULL,
+        )
+
+        print(f"LANG={args.lang}, median of {args.runs} runs")
+        for backend, app_dir in (("modules", modules_dir), ("catalogs", catalogs_dir)):
+            eager = run_series(f"{backend}/all", app_dir, "all", args.lang, args.runs)
+            lazy = run_series(f"{backend}/active", app_dir, "active", args.lang, args.runs)
+            print(f"{'saved':<18}             {eager['ms'] - lazy['ms']:7.2f} ms   "
+                  f"{eager['rss_kb'] - lazy['rss_kb']:7.0f} KiB RSS   "
+                  f"{eager['heap_kb'] - lazy['heap_kb']:7.0f} KiB heap\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Installed-package lookups: `pacman -Q` vs. the in-memory local database.
+
+Builds a fixture local database (a directory of <name>-<version>/desc
+entries, like /var/lib/pacman/local) and times:
+
+  build     - parsing the whole fixture into the index (first query)
+  query     - answering is_installed() from the index
+  refresh   - the first query after a package was added, which has to
+              notice the change and rebuild
+
+checking the answers against the fixture along the way. If pacman is
+installed, it also times `pacman -Q kinexin-desktop` and the same lookup
+in the real local database, and checks that both agree.
+
+Usage:
+    python benchmarks/pacman_db.py [--runs N] [--packages N] [--app-dir PATH]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+
+DESC = """%NAME%
+{name}
+
+%VERSION%
+{version}
+
+%DESC%
+Fixture package
+
+%SIZE%
+{size}
+
+{extra}"""
+
+
+def write_package(db_path, name, version, size=1024, reason=None, groups=()):
+    entry = os.path.join(db_path, f"{name}-{version}")
+    os.makedirs(entry)
+    extra = ""
+    if groups:
+        extra += "%GROUPS%\n" + "\n".join(groups) + "\n\n"
+    if reason is not None:
+        extra += f"%REASON%\n{reason}\n\n"
+    with open(os.path.join(entry, "desc"), "w") as f:
+        f.write(DESC.format(name=name, version=version, size=size, extra=extra))
+
+
+def build_fixture(db_path, count):
+    os.makedirs(db_path)
+    with open(os.path.join(db_path, "ALPM_DB_VERSION"), "w") as f:
+        f.write("9\n")
+    for i in range(count):
+        write_package(db_path, f"package-{i}", f"1.{i}-1", size=i, reason=i % 2)
+    write_package(db_path, "kinexin-desktop", "1.2-1", size=4096)
+    write_package(db_path, "nautilus", "46.2-1", reason=1, groups=("gnome",))
+
+
+def time_us(operation, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<10} median {statistics.median(samples):10.1f} us   "
+          f"min {min(samples):10.1f} us   max {max(samples):10.1f} us")
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--packages", type=int, default=1200)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from pacman_db import LocalDatabase, LOCAL_DB_PATH, REASON_DEPEND
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "local")
+        build_fixture(db_path, args.packages)
+        print(f"fixture of {args.packages + 2} packages, {args.runs} runs")
+
+        build_samples = time_us(lambda: LocalDatabase(db_path).packages(), args.runs)
+
+        db = LocalDatabase(db_path)
+        check(db.is_installed("kinexin-desktop"), "kinexin-desktop not found")
+        check(not db.is_installed("linexin-desktop"), "linexin-desktop found")
+        check(db.version("package-7") == "1.7-1", "wrong version")
+        check(db.get("package-7").reason == REASON_DEPEND, "wrong install reason")
+        check(db.get("kinexin-desktop").size == 4096, "wrong size")
+        check(db.group("gnome") == ["nautilus"], "wrong gnome group")
+        check(len(db.packages()) == args.packages + 2, "ALPM_DB_VERSION counted as a package")
+        query_samples = time_us(lambda: db.is_installed("kinexin-desktop"), args.runs)
+
+        refresh_samples = []
+        for i in range(args.runs):
+            name = f"added-{i}"
+            write_package(db_path, name, "1-1")
+            start = time.perf_counter()
+            found = db.is_installed(name)
+            refresh_samples.append((time.perf_counter() - start) * 1e6)
+            check(found, f"{name} added but not seen")
+        shutil.rmtree(os.path.join(db_path, "added-0-1-1"))
+        check(not db.is_installed("added-0"), "removal not seen")
+
+        report("build", build_samples)
+        report("query", query_samples)
+        report("refresh", refresh_samples)
+
+    if shutil.which("pacman") is None:
+        print("pacman -Q   skipped (pacman is not installed)")
+        return 0
+
+    real = LocalDatabase(LOCAL_DB_PATH)
+
+    def via_pacman():
+        return subprocess.run(["pacman", "-Q", "kinexin-desktop"], stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL).returncode == 0
+
+    pacman_samples = time_us(via_pacman, args.runs)
+    real.packages()
+    real_samples = time_us(lambda: real.is_installed("kinexin-desktop"), args.runs)
+    check(via_pacman() == real.is_installed("kinexin-desktop"), "pacman -Q disagrees")
+    report("pacman -Q", pacman_samples)
+    report("local db", real_samples)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Page construction benchmark, with and without the localization patches.
+
+Builds every wizard page class repeatedly in two setups, each in a fresh
+interpreter:
+
+  patched   - the default: Gtk/Adw constructors and setters are wrapped
+              by SimpleLocalizationManager
+  explicit  - LINEXIN_UPGRADER_NO_L10N_PATCHES=1: classes are left alone
+              and only the _() calls in the pages translate
+
+and reports the median construction time per page.
+
+Requires PyGObject with GTK 4/libadwaita and a display (run it inside a
+desktop session or under xvfb-run / a headless Wayland compositor).
+
+Usage:
+    python benchmarks/page_construction.py [--runs N] [--lang LANG] [--app-dir PATH]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+
+# (module, class) for every page the upgrader can show
+PAGES = (
+    ("welcome_widget", "WelcomeWidget"),
+    ("news_widget", "WhatsNewWidget"),
+    ("update1_slide1", "InstallDefaultsWidget"),
+    ("update1_slide2", "LinexinCenterStyleWidget"),
+    ("update2_slide1", "DEPicker"),
+    ("update3_slide1", "ThemePicker"),
+    ("finish_widget", "FinishWidget"),
+)
+
+MEASURE = r"""
+import contextlib, importlib, io, json, statistics, sys, time
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Adw
+from simple_localization_manager import get_localization_manager
+
+Adw.init()
+get_localization_manager()
+pages, runs = json.loads(sys.argv[1]), int(sys.argv[2])
+
+results = {}
+for module_name, class_name in pages:
+    page_class = getattr(importlib.import_module(module_name), class_name)
+    samples = []
+    # The first instance pays for class and type initialisation
+    for _ in range(runs + 1):
+        # Pages print debug output while they build; keep it out of the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            page_class()
+            samples.append((time.perf_counter() - start) * 1000)
+    results[class_name] = statistics.median(samples[1:])
+print(json.dumps(results))
+"""
+
+
+def measure(app_dir, runs, lang, patched):
+    env = dict(os.environ, LANG=lang, LC_ALL=lang)
+    env.pop("LINEXIN_UPGRADER_NO_L10N_PATCHES", None)
+    if not patched:
+        env["LINEXIN_UPGRADER_NO_L10N_PATCHES"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE, json.dumps(PAGES), str(runs)],
+        cwd=app_dir, env=env, check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--lang", default="pl_PL.UTF-8")
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+    app_dir = os.path.abspath(args.app_dir)
+
+    patched = measure(app_dir, args.runs, args.lang, patched=True)
+    explicit = measure(app_dir, args.runs, args.lang, patched=False)
+
+    print(f"LANG={args.lang}, median of {args.runs} constructions")
+    print(f"{'page':<26} {'patched':>10} {'explicit':>10} {'saved':>8}")
+    for _, class_name in PAGES:
+        with_patches, without = patched[class_name], explicit[class_name]
+        print(f"{class_name:<26} {with_patches:8.2f}ms {without:8.2f}ms "
+              f"{(1 - without / with_patches) * 100:7.0f}%")
+    total_patched, total_explicit = sum(patched.values()), sum(explicit.values())
+    print(f"{'all pages':<26} {total_patched:8.2f}ms {total_explicit:8.2f}ms "
+          f"{(1 - total_explicit / total_patched) * 100:7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
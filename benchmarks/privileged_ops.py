@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Per-operation latency of privileged commands: shell + sudo vs. the helper.
+
+Runs the same root command repeatedly in two ways:
+
+  sudo     - the old pattern, a fresh `sh -c "echo '<pw>' | sudo -S ..."`
+             (shell, sudo, PAM stack and pipe) for every operation
+  helper   - one PrivilegedHelper started up front, then a JSON request
+             over its Unix socket per operation
+
+and reports the median and worst latency of each, plus the one-off cost
+of authenticating and starting the helper.
+
+Needs a user allowed to run sudo; the password is read from the terminal.
+
+Usage:
+    python benchmarks/privileged_ops.py [--runs N] [--app-dir PATH] [-- COMMAND...]
+"""
+
+import argparse
+import getpass
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+DEFAULT_COMMAND = ["pacman", "-Q", "pacman"]
+
+
+def time_ms(operation, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<8} median {statistics.median(samples):8.2f} ms   "
+          f"min {min(samples):8.2f} ms   max {max(samples):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+    command = [arg for arg in args.command if arg != "--"] or DEFAULT_COMMAND
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from privileged_helper import PrivilegedHelper
+
+    password = getpass.getpass("sudo password: ")
+    shell_command = f"echo '{password}' | sudo -S -p '' {shlex.join(command)}"
+
+    def via_sudo():
+        subprocess.run(shell_command, shell=True, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    helper = PrivilegedHelper()
+    start = time.perf_counter()
+    if not helper.start(password):
+        print("FAIL: could not authenticate")
+        return 1
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    try:
+        print(f"{shlex.join(command)} as root, {args.runs} runs")
+        sudo_samples = time_ms(via_sudo, args.runs)
+        helper_samples = time_ms(lambda: helper.run(command, capture=True), args.runs)
+    finally:
+        helper.stop()
+        subprocess.run(["sudo", "-k"])
+
+    report("sudo", sudo_samples)
+    report("helper", helper_samples)
+    print(f"helper start-up (authentication included) {startup_ms:.1f} ms, "
+          f"{statistics.median(sudo_samples) / statistics.median(helper_samples):.1f}x "
+          f"faster per operation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
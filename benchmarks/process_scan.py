@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Cost of the "is the system updating?" process check: pgrep vs. /proc scan.
+
+Times the three ways of answering it:
+
+  pgrep     - the old check, `pgrep -x paru`, `pgrep -x makepkg` and
+              `pgrep -f "flatpak update"`, one fork/exec each
+  scan      - one ProcessTable pass over /proc matching all three
+              patterns at once (a fresh snapshot every run)
+  cached    - the same query answered from a snapshot within its TTL
+
+and checks that pgrep and the scan agree. Needs only procps' pgrep, no
+PyGObject.
+
+Usage:
+    python benchmarks/process_scan.py [--runs N] [--app-dir PATH]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_APP_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "src", "usr", "share", "linexin-upgrade-tool",
+)
+# What system_probe.is_system_updating() looks for; importing system_probe
+# would pull in PyGObject, so they are repeated here
+UPDATE_PROCESS_NAMES = ("paru", "makepkg")
+UPDATE_CMDLINE_PATTERNS = ("flatpak update",)
+PGREP_CHECKS = [["pgrep", "-x", name] for name in UPDATE_PROCESS_NAMES] + \
+               [["pgrep", "-f", pattern] for pattern in UPDATE_CMDLINE_PATTERNS]
+
+
+def time_us(operation, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = operation()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples, result
+
+
+def report(label, samples):
+    print(f"{label:<8} median {statistics.median(samples):10.1f} us   "
+          f"min {min(samples):10.1f} us   max {max(samples):10.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--app-dir", default=DEFAULT_APP_DIR)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    from process_table import ProcessTable
+
+    def via_pgrep():
+        return any(subprocess.run(check, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL).returncode == 0
+                   for check in PGREP_CHECKS)
+
+    fresh = ProcessTable(ttl=0)
+    cached = ProcessTable()
+
+    def via_scan():
+        return fresh.is_running(UPDATE_PROCESS_NAMES, UPDATE_CMDLINE_PATTERNS)
+
+    def via_cache():
+        return cached.is_running(UPDATE_PROCESS_NAMES, UPDATE_CMDLINE_PATTERNS)
+
+    print(f"{len(fresh.processes())} processes, {args.runs} runs")
+    pgrep_samples, pgrep_result = time_us(via_pgrep, args.runs)
+    scan_samples, scan_result = time_us(via_scan, args.runs)
+    via_cache()
+    cached_samples, _ = time_us(via_cache, args.runs)
+
+    report("pgrep", pgrep_samples)
+    report("scan", scan_samples)
+    report("cached", cached_samples)
+    if pgrep_result != scan_result:
+        print(f"FAIL: pgrep says {pgrep_result}, the scan says {scan_result}")
+        return 1
+    print(f"both report updating={scan_result}; the scan is "
+          f"{statistics.median(pgrep_samples) / statistics.median(scan_samples):.0f}x faster")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
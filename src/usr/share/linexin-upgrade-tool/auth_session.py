@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+One authentication for the whole wizard.
+
+The upgrader, the apps page (DEPicker) and the theme page (ThemePicker)
+all need root. They ask the AuthSession instead of prompting on their
+own. The first request shows the password dialog. The password is then
+checked off the main loop, by starting the privileged helper, while the
+dialog shows a spinner, so the GTK main thread never waits for PAM. From
+then on the helper stays up and later requests go straight through,
+which means the password is asked for and checked once per run.
+"""
+
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, GObject
+
+from simple_localization_manager import _
+from privileged_helper import get_privileged_helper
+from task_runner import get_task_runner
+
+
+class AuthSession(GObject.Object):
+    """
+    Singleton holding the wizard's root session. `authenticated` turns
+    True once the privileged helper is running and stays True.
+    """
+
+    authenticated = GObject.Property(type=bool, default=False)
+
+    def authenticate(self, parent, on_authenticated, on_cancelled=None):
+        """
+        Call `on_authenticated()` once the session is authenticated, right
+        away if it already is. Otherwise prompt over `parent`; if the user
+        gives up, `on_cancelled()` is called instead.
+        """
+        if self.authenticated:
+            on_authenticated()
+            return
+        self._present_dialog(parent, on_authenticated, on_cancelled)
+
+    def _present_dialog(self, parent, on_authenticated, on_cancelled):
+        dialog = Adw.MessageDialog(
+            transient_for=parent,
+            heading=_("Authentication Required"),
+            body=_("Please enter your password to modify system packages.")
+        )
+
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+
+        entry = Gtk.PasswordEntry()
+        entry.set_hexpand(True)
+        content_box.append(entry)
+
+        spinner = Gtk.Spinner()
+        spinner.set_size_request(24, 24)
+        spinner.set_visible(False)
+        content_box.append(spinner)
+
+        error_label = Gtk.Label()
+        error_label.add_css_class("error")
+        error_label.set_wrap(True)
+        error_label.set_visible(False)
+        content_box.append(error_label)
+
+        dialog.set_extra_child(content_box)
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("continue", _("Continue"))
+        dialog.set_default_response("continue")
+        dialog.set_close_response("cancel")
+        dialog.set_response_enabled("continue", False)
+
+        state = {"busy": False, "done": False}
+
+        def set_busy(busy):
+            state["busy"] = busy
+            entry.set_sensitive(not busy)
+            spinner.set_visible(busy)
+            if busy:
+                spinner.start()
+            else:
+                spinner.stop()
+            dialog.set_response_enabled("cancel", not busy)
+            dialog.set_response_enabled("continue", not busy and bool(entry.get_text()))
+
+        def on_changed(entry):
+            error_label.set_visible(False)
+            dialog.set_response_enabled("continue", not state["busy"] and bool(entry.get_text()))
+
+        def on_activate(entry):
+            if not state["busy"] and entry.get_text():
+                dialog.response("continue")
+
+        def on_close_request(dialog):
+            # Keep the dialog up while the password is being checked, and
+            # after a wrong one so it can be corrected in place
+            return state["busy"]
+
+        def on_validated(ok):
+            set_busy(False)
+            if ok:
+                state["done"] = True
+                self.authenticated = True
+                dialog.close()
+                on_authenticated()
+            else:
+                error_label.set_label(_("Incorrect password. Please try again."))
+                error_label.set_visible(True)
+                entry.set_text("")
+                entry.grab_focus()
+
+        def on_response(dialog, response):
+            if state["done"] or state["busy"]:
+                return
+            if response != "continue":
+                state["done"] = True
+                if on_cancelled:
+                    on_cancelled()
+                return
+
+            password = entry.get_text()
+            set_busy(True)
+            error_label.set_visible(False)
+
+            operation = get_task_runner().call_blocking(get_privileged_helper().start, password)
+            operation.add_done_callback(on_checked)
+
+        def on_checked(operation):
+            try:
+                ok = operation.result()
+            except Exception as e:
+                # The helper could not be started at all; let the user retry or cancel
+                set_busy(False)
+                error_label.set_label(_("Could not check the password: ") + str(e))
+                error_label.set_visible(True)
+                return
+            on_validated(ok)
+
+        entry.connect("changed", on_changed)
+        entry.connect("activate", on_activate)
+        dialog.connect("close-request", on_close_request)
+        dialog.connect("response", on_response)
+        dialog.present()
+
+
+_session_instance = None
+
+
+def get_auth_session():
+    global _session_instance
+    if _session_instance is None:
+        _session_instance = AuthSession()
+    return _session_instance
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Fast connectivity check that races TCP connects to several well-known
+endpoints, happy-eyeballs style.
+
+Attempts start a short stagger apart (or immediately after one fails) and
+the first endpoint that accepts a connection wins. Everything runs on one
+thread with non-blocking sockets and a single overall deadline, so an
+offline or filtered machine gets its answer in `deadline` seconds at most
+instead of stacking per-target timeouts.
+
+Targets are plain IP addresses so no DNS lookup can block the race. Pass
+your own targets (e.g. local listeners) to exercise it in isolation.
+
+A TCP connect alone can mislead, though: behind an HTTP proxy the direct
+connects all fail, and a captive portal may accept them while serving
+its login page to everything else. has_internet_connection() therefore
+sends an HTTP request for a 204 page (through the configured proxy, if
+any) alongside the race and trusts its answer: 204 means online,
+anything else means a portal is in the way. Only when the request gets
+no answer within the deadline does the race decide, so the whole check
+still takes `deadline` seconds at most.
+"""
+
+import errno
+import selectors
+import threading
+import time
+
+# Public DNS and HTTPS endpoints of three independent providers; 443 gets
+# through most filtered networks that block port 53.
+DEFAULT_TARGETS = (
+    ("1.1.1.1", 443),
+    ("8.8.8.8", 53),
+    ("9.9.9.9", 443),
+    ("8.8.8.8", 443),
+    ("1.1.1.1", 53),
+)
+DEFAULT_DEADLINE = 1.5  # seconds for the whole race
+DEFAULT_STAGGER = 0.15  # seconds between starting two attempts
+
+# Answers 204 with an empty body; captive portals answer with their page
+PROBE_URL = "http://clients3.google.com/generate_204"
+PROBE_TIMEOUT = 3  # seconds for the HTTP probe
+
+
+def race_connect(targets=DEFAULT_TARGETS, deadline=DEFAULT_DEADLINE,
+                 stagger=DEFAULT_STAGGER):
+    """
+    Return the first (host, port) in `targets` that accepts a TCP
+    connection before `deadline` seconds have passed, or None.
+    """
+    import socket
+    pending = list(targets)
+    selector = selectors.DefaultSelector()
+    start = time.monotonic()
+    give_up_at = start + deadline
+    next_attempt_at = start
+
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= give_up_at:
+                return None
+
+            # Start the next attempt when its turn has come
+            if pending and now >= next_attempt_at:
+                target = pending.pop(0)
+                sock = _start_connect(target)
+                if sock is None:
+                    # Failed right away (e.g. no route): try the next now
+                    next_attempt_at = now
+                    continue
+                selector.register(sock, selectors.EVENT_WRITE, target)
+                next_attempt_at = now + stagger
+
+            if not selector.get_map() and not pending:
+                return None
+
+            wake_at = give_up_at
+            if pending:
+                wake_at = min(wake_at, next_attempt_at)
+            for key, _ in selector.select(max(wake_at - now, 0)):
+                sock = key.fileobj
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                selector.unregister(sock)
+                sock.close()
+                if error == 0:
+                    return key.data
+                # This attempt failed: do not wait for the stagger
+                next_attempt_at = time.monotonic()
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+
+
+def _start_connect(target):
+    """Begin a non-blocking connect; return the socket or None on failure."""
+    import socket
+    host, port = target
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    error = sock.connect_ex((host, port))
+    if error in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+        return sock
+    sock.close()
+    return None
+
+
+def http_probe(url=PROBE_URL, timeout=PROBE_TIMEOUT):
+    """
+    True if `url` answers 204, False if something else answered in its
+    place (a captive portal), None if there was no usable answer.
+    """
+    import urllib.error
+    import urllib.request
+    try:
+        # A fresh opener picks up the proxy settings as they are now
+        with urllib.request.build_opener().open(url, timeout=timeout) as response:
+            return response.status == 204
+    except urllib.error.HTTPError as e:
+        # 511 Network Authentication Required is how portals say so
+        return False if e.code == 511 else None
+    except OSError:
+        return None
+
+
+def has_internet_connection(targets=DEFAULT_TARGETS, deadline=DEFAULT_DEADLINE,
+                            probe_url=PROBE_URL, probe_timeout=PROBE_TIMEOUT):
+    """Check if internet connection is available"""
+    start = time.monotonic()
+    probe = {}
+    thread = threading.Thread(
+        target=lambda: probe.update(result=http_probe(probe_url, probe_timeout)),
+        daemon=True,
+    )
+    thread.start()
+
+    winner = race_connect(targets, deadline)
+    # The request gets whatever is left of the deadline, no more
+    thread.join(max(deadline - (time.monotonic() - start), 0))
+    answer = probe.get("result")
+
+    if answer is not None:
+        return answer
+    return winner is not None
@@ -2,9 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import gi
-import os
-import gettext
-import locale
 import subprocess
 
 gi.require_version("Gtk", "4.0")
@@ -13,6 +10,9 @@ gi.require_version("Adw", "1")
 # Import GLib for the timer and Adw for the animation
 from gi.repository import Gtk, Adw, Gdk, GLib
 from simple_localization_manager import get_localization_manager, _
+from system_probe import get_system_probe
+from privileged_helper import get_privileged_helper
+from task_runner import get_task_runner
 
 class FinishWidget(Gtk.Box):
     def __init__(self, **kwargs):
@@ -290,26 +290,12 @@ class FinishWidget(Gtk.Box):
         if requires_restart:
             self.btn_finish.set_label(_("Restart Now"))
 
-    def set_sudo_password(self, password):
-        self.sudo_password = password
-
-    def _is_system_updating(self):
-        """Check if Linexin Updater is currently updating the system."""
-        # Check pacman database lock
-        if os.path.exists("/var/lib/pacman/db.lck"):
-            return True
-        # Check for running update processes (paru, makepkg, flatpak update)
-        for check in [["pgrep", "-x", "paru"], ["pgrep", "-x", "makepkg"], ["pgrep", "-f", "flatpak update"]]:
-            try:
-                result = subprocess.run(check, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                if result.returncode == 0:
-                    return True
-            except Exception:
-                pass
-        return False
-
     def show_reboot_dialog(self):
-        if self._is_system_updating():
+        # Ask the SystemProbe for a fresh answer without blocking the UI
+        get_system_probe().refresh("system-updating", self._on_system_updating_checked)
+
+    def _on_system_updating_checked(self, is_updating):
+        if is_updating:
             self._show_update_in_progress_dialog()
             return
 
@@ -356,32 +342,35 @@ class FinishWidget(Gtk.Box):
             print(f"Warning: Could not write reboot flag: {e}")
 
         # Try reboot methods in order of reliability
-        rebooted = False
+        # Method 1: the privileged helper, running if the wizard authenticated
+        if get_privileged_helper().is_running():
+            operation = get_task_runner().run_privileged(["reboot"])
+            operation.add_done_callback(lambda operation: self._on_helper_reboot_done(operation, root))
+        else:
+            self._reboot_without_helper(root)
 
-        # Method 1: sudo with password (if available), pass via stdin to avoid shell injection
-        if hasattr(self, 'sudo_password') and self.sudo_password:
-            try:
-                proc = subprocess.Popen(
-                    ["sudo", "-S", "reboot"],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                proc.communicate(input=(self.sudo_password + "\n").encode())
-                rebooted = True
-            except Exception as e:
-                print(f"Sudo reboot failed: {e}")
+    def _on_helper_reboot_done(self, operation, root):
+        try:
+            operation.result()
+        except Exception as e:
+            print(f"Helper reboot failed: {e}")
+            self._reboot_without_helper(root)
+        else:
+            app = root.get_application()
+            if app: app.quit()
+
+    def _reboot_without_helper(self, root):
+        rebooted = False
 
         # Method 2: gdbus call to systemd-logind (works for active desktop session)
-        if not rebooted:
-            try:
-                subprocess.Popen(["gdbus", "call", "--system",
-                    "--dest", "org.freedesktop.login1",
-                    "--object-path", "/org/freedesktop/login1",
-                    "--method", "org.freedesktop.login1.Manager.Reboot", "true"])
-                rebooted = True
-            except Exception as e:
-                print(f"gdbus logind reboot failed: {e}")
+        try:
+            subprocess.Popen(["gdbus", "call", "--system",
+                "--dest", "org.freedesktop.login1",
+                "--object-path", "/org/freedesktop/login1",
+                "--method", "org.freedesktop.login1.Manager.Reboot", "true"])
+            rebooted = True
+        except Exception as e:
+            print(f"gdbus logind reboot failed: {e}")
 
         # Method 3: systemctl reboot
         if not rebooted:
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Background pre-warming of font fallback for scripts the default UI font
+does not cover.
+
+The first label drawn in Chinese or Devanagari makes fontconfig sort and
+load fallback fonts for that script, which stalls the GTK main thread on
+the welcome and news pages. Laying the locale's strings out once on a
+worker thread, with a private Pango font map, loads the fontconfig
+configuration, charset caches and font files the main thread then finds
+ready.
+
+Set LINEXIN_UPGRADER_NO_FONT_PREWARM=1 to turn it off, e.g. to compare
+first-frame times in a --trace-startup trace.
+"""
+
+import os
+import threading
+
+from startup_tracer import tracer
+
+NO_PREWARM_ENV = "LINEXIN_UPGRADER_NO_FONT_PREWARM"
+
+# Languages whose script needs fallback fonts, by language code
+PREWARM_LANGUAGES = {
+    "zh": "Han",
+    "hi": "Devanagari",
+}
+
+# The pages use the default sans font in regular and bold weights
+FONT_DESCRIPTIONS = ("Sans 11", "Sans Bold 11", "Sans Bold 20")
+
+
+def needs_prewarm(language):
+    """Whether `language` (e.g. "zh_CN.UTF-8") renders in a fallback script."""
+    return language.split("_")[0] in PREWARM_LANGUAGES
+
+
+def start_prewarm(language, strings):
+    """
+    Lay the UI `strings` of `language` out on a background thread if the
+    language needs it. Returns the thread, or None if nothing was started.
+    """
+    if not needs_prewarm(language):
+        tracer.note("font_prewarm", "not needed")
+        return None
+    if os.environ.get(NO_PREWARM_ENV, "") not in ("", "0"):
+        tracer.note("font_prewarm", "disabled")
+        return None
+
+    tracer.note("font_prewarm", "on")
+    thread = threading.Thread(
+        target=_prewarm, args=(language, strings), name="font-prewarm", daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def _prewarm(language, strings):
+    script = PREWARM_LANGUAGES[language.split("_")[0]]
+    try:
+        with tracer.span(f"fonts: prewarm {script}", "fonts", language=language):
+            import gi
+            gi.require_version("Pango", "1.0")
+            gi.require_version("PangoCairo", "1.0")
+            from gi.repository import Pango, PangoCairo
+
+            # A private font map, so nothing is shared with the main thread's
+            # Pango objects; fontconfig's caches are process-wide
+            font_map = PangoCairo.FontMap.new()
+            context = font_map.create_context()
+            context.set_language(Pango.Language.from_string(language.split(".")[0]))
+            layout = Pango.Layout.new(context)
+            layout.set_text("\n".join(strings), -1)
+            for description in FONT_DESCRIPTIONS:
+                layout.set_font_description(Pango.FontDescription.from_string(description))
+                # Measuring itemizes the text and loads every fallback font
+                layout.get_pixel_size()
+        tracer.instant("fonts: prewarm finished", "fonts")
+    except Exception as e:
+        print(f"Warning: Font pre-warm failed: {e}")
@@ -1,8 +1,6 @@
 
 import gi
 import os
-import gettext
-import locale
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
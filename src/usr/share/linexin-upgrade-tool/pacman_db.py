@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Read-only view of pacman's local package database, without running pacman.
+
+pacman records every installed package as a directory
+/var/lib/pacman/local/<name>-<version>/ whose `desc` file lists the
+package's fields:
+
+    %NAME%
+    kinexin-desktop
+
+    %VERSION%
+    1.2-1
+
+    %GROUPS%
+    ...
+
+The LocalDatabase parses all of them into one index the first time it is
+asked something, and answers every later "is X installed?" from memory.
+pacman adds or removes an entry for each package it installs, upgrades
+or removes, which changes the directory's mtime (and, on most file
+systems, its link count); every query compares both (one stat) and
+rebuilds the index when they have moved.
+
+Pass another `path` (a directory laid out like the local database) to
+use it on a fixture.
+"""
+
+import os
+import threading
+from collections import namedtuple
+
+LOCAL_DB_PATH = "/var/lib/pacman/local"
+# Held by pacman while it changes the database
+PACMAN_LOCK_PATH = "/var/lib/pacman/db.lck"
+
+# %REASON% values; packages without the field were installed explicitly
+REASON_EXPLICIT = 0
+REASON_DEPEND = 1
+
+InstalledPackage = namedtuple("InstalledPackage", "name version size reason groups")
+
+
+def parse_desc(text):
+    """Fields of a desc file: {"NAME": ["kinexin-desktop"], ...}."""
+    fields = {}
+    values = None
+    for line in text.splitlines():
+        if line.startswith("%") and line.endswith("%") and len(line) > 2:
+            values = fields.setdefault(line[1:-1], [])
+        elif line and values is not None:
+            values.append(line)
+    return fields
+
+
+def read_package(desc_path):
+    """The InstalledPackage a desc file describes, or None if it names none."""
+    with open(desc_path, encoding="utf-8", errors="replace") as f:
+        fields = parse_desc(f.read())
+    if not fields.get("NAME"):
+        return None
+
+    def first(field, default):
+        return fields.get(field, [default])[0]
+
+    return InstalledPackage(
+        name=first("NAME", None),
+        version=first("VERSION", ""),
+        size=int(first("SIZE", 0)),
+        reason=int(first("REASON", REASON_EXPLICIT)),
+        groups=tuple(fields.get("GROUPS", ())),
+    )
+
+
+def read_local_db(path=LOCAL_DB_PATH):
+    """Parse every package under `path`: {name: InstalledPackage}."""
+    packages = {}
+    for entry in os.listdir(path):
+        try:
+            package = read_package(os.path.join(path, entry, "desc"))
+        except (OSError, ValueError):
+            # ALPM_DB_VERSION and other non-package entries, or an entry
+            # pacman is writing right now
+            continue
+        if package is not None:
+            packages[package.name] = package
+    return packages
+
+
+class LocalDatabase:
+    """
+    Lazily built, self-refreshing index of the installed packages. Safe to
+    query from several threads.
+    """
+
+    def __init__(self, path=LOCAL_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._packages = None
+        self._stamp = None
+
+    def packages(self):
+        """{name: InstalledPackage} of everything installed. Do not modify it."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # Not an Arch system (or no pacman yet): nothing is installed
+            return {}
+        stamp = (st.st_mtime_ns, st.st_nlink)
+        with self._lock:
+            if self._packages is None or stamp != self._stamp:
+                self._packages = read_local_db(self.path)
+                self._stamp = stamp
+            return self._packages
+
+    def get(self, name):
+        """The installed package `name`, or None."""
+        return self.packages().get(name)
+
+    def is_installed(self, name):
+        return name in self.packages()
+
+    def version(self, name):
+        """Installed version of `name` (e.g. "1.2-1"), or None."""
+        package = self.get(name)
+        return package.version if package is not None else None
+
+    def group(self, group):
+        """Names of the installed packages in `group`, e.g. "gnome"."""
+        return sorted(package.name for package in self.packages().values()
+                      if group in package.groups)
+
+
+_database_instance = None
+
+
+def get_local_database():
+    global _database_instance
+    if _database_instance is None:
+        _database_instance = LocalDatabase()
+    return _database_instance
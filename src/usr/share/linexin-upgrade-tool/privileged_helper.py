@@ -0,0 +1,798 @@
+#!/usr/bin/env python3
+"""
+One privileged helper process for the whole upgrade run.
+
+Instead of piping the password into a fresh `sudo -S` shell for every
+pacman, cp or sed call, the upgrader authenticates once and starts this
+file as root (through `sudo -S`, or pkexec when no password is known).
+The root side listens on a Unix socket in a private 0700 directory and
+runs the commands it is sent, so every later operation costs a socket
+round-trip instead of a shell, a PAM stack and a pipe, and the password
+never reaches an argv or a file.
+
+Protocol, one JSON object per line:
+
+    -> {"id": 1, "method": "run", "params": {"argv": ["pacman", "-Sy", "..."]}}
+    <- {"id": 1, "result": {"returncode": 0, "stdout": null, "stderr": null}}
+    <- {"id": 1, "error": "message"}
+
+Besides "run", the helper applies a FileBatch (copy, symlink, INI key,
+write) in one "apply_file_ops" request: every file is staged under a
+temporary name next to its destination, the current destinations are
+kept as backups, and all files are renamed into place once staging
+succeeded, followed by one sync. If a rename fails, the ones already
+done are rolled back from the backups. A post-install step thus needs
+one round-trip and no shell at all.
+
+Every command runs in its own process group. A "cancel" request, sent
+over a second connection while "run" is still waiting, stops the group
+of the job it names: SIGINT first, so pacman, flatpak and makepkg clean
+up, then SIGTERM and SIGKILL for whatever did not exit in time. A pacman
+lock the stopped job leaves behind is removed.
+
+Anything the upgrader's user runs can connect to the socket, so the helper
+does not take arbitrary work: "run" only starts the programs in
+ALLOWED_PROGRAMS, from the system's own bin directories, with the
+arguments ARGUMENT_CHECKS accepts (for pacman the operations in
+PACMAN_OPERATIONS, on package names, without --root, --dbpath, --hookdir
+or another config), and file operations only write to ALLOWED_PATHS and
+below ALLOWED_PATH_PREFIXES and only copy from the upgrader's data
+directory. Everything else is rejected with a HelperError.
+
+This narrows what root does; it does not make the socket safe to hand
+out. paru installs the packages it builds with `pacman -U`, so code
+running as the upgrader's user can still get a package of its own
+installed. Only that user and root can reach the socket (0700
+directory, peer credentials); that is the boundary.
+
+The helper exits once the upgrader's own connection closes. Programs that
+want a sudo replacement (paru's --sudo) get a wrapper script that runs
+`privileged_helper.py --run SOCKET -- argv...` against the same socket.
+
+Only the standard library is used here: the root side runs in isolated
+mode (python -I), without the upgrader's directory on sys.path. The
+upgrader imports this module at startup, so subprocess, socket, shutil
+and the like are only imported by the functions that use them.
+"""
+
+import atexit
+import json
+import os
+import re
+import signal
+import stat
+import struct
+import sys
+import threading
+
+HELPER_PATH = os.path.abspath(__file__)
+SOCKET_NAME = "helper.sock"
+SUDO_WRAPPER_NAME = "sudo"
+READY_LINE = "linexin-helper-ready"
+STOP_TIMEOUT = 5  # seconds to wait for the helper to exit
+TEMP_SUFFIX = ".linexin-tmp"
+BACKUP_SUFFIX = ".linexin-bak"
+
+# Signals for a process group that has to stop, each sent once the
+# previous one went unanswered for CANCEL_GRACE seconds
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM, signal.SIGKILL)
+CANCEL_GRACE = 5
+
+# What the root side agrees to do
+ALLOWED_PROGRAMS = ("pacman", "flatpak", "reboot")
+PROGRAM_DIRS = ["/usr/bin", "/usr/sbin", "/bin", "/sbin"]
+ALLOWED_LOCKS = ["/var/lib/pacman/db.lck"]
+ALLOWED_PATHS = ("/etc/os-release", "/usr/lib/os-release", "/version")
+ALLOWED_PATH_PREFIXES = ("/usr/share/applications/",)
+COPY_SOURCE_DIR = "/usr/share/linexin-upgrade-tool/"
+
+# pacman operations the upgrader and paru (through the --run relay) send,
+# with the flags and options each may carry; -Q only reads
+PACMAN_OPERATIONS = {
+    "S": {"y", "w", "--noconfirm", "--needed", "--asdeps", "--asexplicit", "--overwrite"},
+    "U": {"--noconfirm", "--needed", "--asdeps", "--asexplicit", "--overwrite"},
+    "R": {"s", "c", "n", "--noconfirm"},
+    "D": {"--asdeps", "--asexplicit"},
+    "Q": set(),
+}
+# Options allowed with any operation
+PACMAN_COMMON_OPTIONS = {"--config", "--color"}
+# Options taking a value, and the values they may take (None: any)
+PACMAN_VALUE_OPTIONS = {
+    "--overwrite": None,
+    "--config": {"/etc/pacman.conf"},
+    "--color": {"auto", "always", "never"},
+}
+# A package or group name, optionally prefixed by its repository
+PACKAGE_NAME_RE = re.compile(r"(?:[a-z0-9_-]+/)?[a-zA-Z0-9@_+][a-zA-Z0-9@._+-]*")
+# What paru hands to pacman -U: the packages it built
+PACKAGE_FILE_RE = re.compile(r"/.+\.pkg\.tar(?:\.[a-z0-9]+)?")
+# The theme step's read-only GTK config access for every flatpak app
+FLATPAK_OVERRIDE_RE = re.compile(r"--filesystem=xdg-config/gtk-[34]\.0:ro")
+
+
+class HelperError(RuntimeError):
+    """The helper is not running, went away, or rejected a request."""
+
+
+# --- Root side ---
+
+def _peer_uid(conn):
+    import socket
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+# Running "run" requests by job id, and the jobs asked to stop
+_jobs = {}
+_cancelled = set()
+_jobs_lock = threading.Lock()
+
+
+def _check_pacman_args(args):
+    """Reject pacman arguments other than the forms in PACMAN_OPERATIONS."""
+    operation = None
+    flags = set()
+    operands = []
+    args = iter(args)
+    for arg in args:
+        if arg.startswith("--"):
+            name, has_value, value = arg.partition("=")
+            if name in PACMAN_VALUE_OPTIONS:
+                if not has_value:
+                    value = next(args, None)
+                allowed = PACMAN_VALUE_OPTIONS[name]
+                if value is None or (allowed is not None and value not in allowed):
+                    raise HelperError(f"pacman {name} {value} is not allowed")
+            elif has_value:
+                raise HelperError(f"pacman {arg} is not allowed")
+            flags.add(name)
+        elif arg.startswith("-") and len(arg) > 1:
+            for letter in arg[1:]:
+                if not letter.isupper():
+                    flags.add(letter)
+                elif operation is None:
+                    operation = letter
+                else:
+                    raise HelperError("pacman takes a single operation")
+        else:
+            operands.append(arg)
+
+    if operation not in PACMAN_OPERATIONS:
+        raise HelperError(f"pacman -{operation or '?'} is not allowed")
+    extra = flags - PACMAN_OPERATIONS[operation] - PACMAN_COMMON_OPTIONS
+    if extra:
+        raise HelperError(f"pacman -{operation} does not allow {', '.join(sorted(extra))}")
+    for operand in operands:
+        if operation == "U":
+            if not (PACKAGE_FILE_RE.fullmatch(operand) and os.path.isfile(operand)):
+                raise HelperError(f"{operand} is not a package file")
+        elif not PACKAGE_NAME_RE.fullmatch(operand):
+            raise HelperError(f"{operand} is not a package name")
+
+
+def _check_flatpak_args(args):
+    if not (args and args[0] == "override" and args[1:]
+            and all(FLATPAK_OVERRIDE_RE.fullmatch(arg) for arg in args[1:])):
+        raise HelperError(f"flatpak {' '.join(args)} is not allowed")
+
+
+def _check_reboot_args(args):
+    if args:
+        raise HelperError("reboot takes no arguments")
+
+
+ARGUMENT_CHECKS = {
+    "pacman": _check_pacman_args,
+    "flatpak": _check_flatpak_args,
+    "reboot": _check_reboot_args,
+}
+
+
+def _resolve_program(argv):
+    """
+    Absolute path of the allowed program `argv` starts, once its arguments
+    passed ARGUMENT_CHECKS; HelperError otherwise.
+    """
+    import shutil
+    if not argv:
+        raise HelperError("empty command")
+    directory, name = os.path.split(argv[0])
+    if name not in ALLOWED_PROGRAMS or (directory and directory not in PROGRAM_DIRS):
+        raise HelperError(f"{argv[0]} is not an allowed program")
+    ARGUMENT_CHECKS[name](argv[1:])
+    path = shutil.which(name, path=os.pathsep.join([directory] if directory else PROGRAM_DIRS))
+    if path is None:
+        raise HelperError(f"{name} is not installed")
+    return path
+
+
+def _check_destination(path):
+    """HelperError unless `path`, with symlinks in its directory resolved, may be written."""
+    def allowed(candidate):
+        return candidate in ALLOWED_PATHS or candidate.startswith(ALLOWED_PATH_PREFIXES)
+
+    if not os.path.isabs(path) or ".." in path.split(os.sep):
+        raise HelperError(f"{path} is not a normalised absolute path")
+    resolved = os.path.join(os.path.realpath(os.path.dirname(path)), os.path.basename(path))
+    if not (allowed(path) and allowed(resolved)):
+        raise HelperError(f"{path} is not an allowed destination")
+
+
+def _check_copy_source(src):
+    if not os.path.realpath(src).startswith(COPY_SOURCE_DIR):
+        raise HelperError(f"{src} is not an allowed copy source")
+
+
+def _kill_group(pgid, sig):
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+
+
+def stop_process_group(process, signals=STOP_SIGNALS):
+    """Stop `process` and everything in its process group (see STOP_SIGNALS)."""
+    import subprocess
+    for sig in signals:
+        if not _kill_group(process.pid, sig):
+            return
+        try:
+            process.wait(timeout=CANCEL_GRACE)
+            break
+        except subprocess.TimeoutExpired:
+            continue
+    else:
+        return
+    # Children that outlived the group leader
+    _kill_group(process.pid, signal.SIGKILL)
+
+
+def _run(argv, input=None, capture=False, cwd=None, timeout=None, job=None, lock=None):
+    """
+    Run `argv` in a new process group. `job` names it for "cancel"; `lock`
+    is a lock file (pacman's) the command holds while it runs, removed if
+    the command is stopped and the lock was free when it started.
+    """
+    import subprocess
+    program = _resolve_program(argv)
+    if lock is not None and lock not in ALLOWED_LOCKS:
+        raise HelperError(f"{lock} is not an allowed lock file")
+    lock_was_free = lock is not None and not os.path.exists(lock)
+    pipe = subprocess.PIPE if capture else None
+    process = subprocess.Popen(
+        [program, *argv[1:]],
+        stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+        stdout=pipe,
+        stderr=pipe,
+        cwd=cwd,
+        text=True,
+        start_new_session=True,
+    )
+    if job is not None:
+        with _jobs_lock:
+            _jobs[job] = process
+
+    timed_out = False
+    try:
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            stop_process_group(process)
+            stdout, stderr = process.communicate()
+    finally:
+        with _jobs_lock:
+            _jobs.pop(job, None)
+            cancelled = job in _cancelled
+            _cancelled.discard(job)
+
+    if timed_out or cancelled:
+        _kill_group(process.pid, signal.SIGKILL)
+        # pacman takes the lock first thing, so this is the one it left
+        if lock_was_free and os.path.exists(lock):
+            os.unlink(lock)
+            print(f"privileged_helper: removed stale {lock}", file=sys.stderr)
+    return {"returncode": process.returncode, "timed_out": timed_out,
+            "cancelled": cancelled, "stdout": stdout, "stderr": stderr}
+
+
+def _cancel(job, escalate=True):
+    """
+    Start stopping the job; its "run" request answers once it is gone.
+    Without `escalate` it only gets SIGINT and decides itself when to stop.
+    """
+    with _jobs_lock:
+        process = _jobs.get(job)
+        if process is None:
+            return False
+        _cancelled.add(job)
+    signals = STOP_SIGNALS if escalate else STOP_SIGNALS[:1]
+    threading.Thread(target=stop_process_group, args=(process, signals), daemon=True).start()
+    return True
+
+
+def set_ini_key(text, section, key, value, only_if=None):
+    """
+    Return `text` with `key=value` in `[section]`, editing only that line
+    (or adding it at the end of the section) so comments, ordering and
+    other sections stay as they are. With `only_if`, only a key currently
+    set to that value is changed, and a missing one is not added.
+    """
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    entry = f"{key}={value}\n"
+    in_section = False
+    insert_at = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            if in_section:
+                break
+            in_section = stripped[1:-1] == section
+            if in_section:
+                insert_at = i + 1
+        elif in_section and stripped and not stripped.startswith(("#", ";")):
+            name, _, current = stripped.partition("=")
+            if name.strip() == key:
+                if only_if is not None and current.strip() != only_if:
+                    return "".join(lines)
+                lines[i] = entry
+                return "".join(lines)
+            insert_at = i + 1
+    if only_if is not None:
+        return "".join(lines)
+    if insert_at is None:
+        if lines:
+            lines.append("\n")
+        lines += [f"[{section}]\n", entry]
+    else:
+        lines.insert(insert_at, entry)
+    return "".join(lines)
+
+
+def _temp_path(path, suffix=TEMP_SUFFIX):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}{suffix}")
+
+
+def _stage_file(path, data, mode, like=None):
+    temp = _temp_path(path)
+    if os.path.lexists(temp):
+        os.unlink(temp)
+    # O_EXCL|O_NOFOLLOW: never write through something planted at `temp`;
+    # and only fix it up through the fd, `temp` may be swapped meanwhile
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            os.fchmod(f.fileno(), mode & 0o777)
+            if like is not None:
+                os.fchown(f.fileno(), like.st_uid, like.st_gid)
+    except BaseException:
+        if os.path.lexists(temp):
+            os.unlink(temp)
+        raise
+    return temp
+
+
+def _stage(op):
+    """Prepare one operation under a temporary name; None if nothing changes."""
+    kind, path = op["op"], op["path"]
+    _check_destination(path)
+    if kind == "copy":
+        _check_copy_source(op["src"])
+        with open(op["src"], "rb") as f:
+            data = f.read()
+        mode = op.get("mode") or stat.S_IMODE(os.stat(op["src"]).st_mode)
+        return _stage_file(path, data, mode)
+    if kind == "write":
+        return _stage_file(path, op["content"].encode(), op.get("mode") or 0o644)
+    if kind == "symlink":
+        temp = _temp_path(path)
+        if os.path.lexists(temp):
+            os.unlink(temp)
+        os.symlink(op["target"], temp)
+        return temp
+    if kind == "set_ini_key":
+        try:
+            info = os.stat(path)
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            if op.get("skip_missing"):
+                return None
+            raise
+        new_text = set_ini_key(text, op["section"], op["key"], op["value"], op.get("only_if"))
+        if new_text == text:
+            return None
+        return _stage_file(path, new_text.encode(), stat.S_IMODE(info.st_mode), like=info)
+    raise ValueError(f"unknown file operation {kind!r}")
+
+
+def _remove(path):
+    if os.path.lexists(path):
+        os.unlink(path)
+
+
+def _apply_file_ops(ops):
+    """
+    Stage every operation, back up the destinations, then rename them all
+    into place and sync once. A failing rename restores the destinations
+    replaced before it; temporary and backup files are removed either way.
+    Only a crash of the helper itself in the middle of the renames can
+    leave part of a batch applied.
+    """
+    staged = []      # (temp, path)
+    backups = {}     # path -> backup, for destinations that existed
+    replaced = []
+    try:
+        for op in ops:
+            temp = _stage(op)
+            if temp is not None:
+                staged.append((temp, op["path"]))
+        for _, path in staged:
+            if os.path.lexists(path):
+                backup = _temp_path(path, BACKUP_SUFFIX)
+                _remove(backup)
+                os.link(path, backup, follow_symlinks=False)
+                backups[path] = backup
+        try:
+            for temp, path in staged:
+                os.replace(temp, path)
+                replaced.append(path)
+        except BaseException:
+            for path in reversed(replaced):
+                if path in backups:
+                    os.replace(backups.pop(path), path)
+                else:
+                    os.unlink(path)
+            raise
+    finally:
+        for temp, _ in staged:
+            _remove(temp)
+        for backup in backups.values():
+            _remove(backup)
+    os.sync()
+    return replaced
+
+
+METHODS = {
+    "ping": lambda: "pong",
+    "run": _run,
+    "cancel": _cancel,
+    "apply_file_ops": _apply_file_ops,
+}
+
+
+def _handle_connection(conn):
+    with conn, conn.makefile("r", encoding="utf-8") as reader:
+        for line in reader:
+            request = {}
+            try:
+                request = json.loads(line)
+                method = METHODS[request["method"]]
+                response = {"id": request.get("id"), "result": method(**request.get("params", {}))}
+            except Exception as e:
+                response = {"id": request.get("id"), "error": f"{type(e).__name__}: {e}"}
+            try:
+                conn.sendall((json.dumps(response) + "\n").encode())
+            except OSError:
+                # The client is gone, e.g. a stopped --run relay
+                return
+
+
+def _accept_loop(listener, owner_uid):
+    while True:
+        conn, _ = listener.accept()
+        if _peer_uid(conn) not in (owner_uid, 0):
+            conn.close()
+            continue
+        threading.Thread(target=_handle_connection, args=(conn,), daemon=True).start()
+
+
+def serve(socket_path, owner_uid):
+    """Run as root: serve requests on `socket_path` until the owner disconnects."""
+    import socket
+    # sudo may not have consumed the password (e.g. NOPASSWD); nothing we
+    # run may read it from our stdin
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    os.chown(socket_path, owner_uid, -1)
+    os.chmod(socket_path, 0o600)
+    listener.listen()
+
+    print(READY_LINE, flush=True)
+    # Our stdout is the upgrader's pipe; children write to the terminal instead
+    os.dup2(2, 1)
+
+    # The first connection is the upgrader itself; its lifetime is ours
+    owner, _ = listener.accept()
+    try:
+        if _peer_uid(owner) != owner_uid:
+            return 1
+        threading.Thread(target=_accept_loop, args=(listener, owner_uid), daemon=True).start()
+        _handle_connection(owner)
+    finally:
+        os.unlink(socket_path)
+    return 0
+
+
+# --- Client side ---
+
+class FileBatch:
+    """
+    File changes for the helper to apply as root in one request; see
+    `PrivilegedHelper.apply()`. Methods return the batch, so they chain.
+    """
+
+    def __init__(self):
+        self.ops = []
+
+    def copy(self, src, path, mode=None):
+        """Copy `src` to `path`, with `src`'s permissions unless `mode` is given."""
+        self.ops.append({"op": "copy", "src": src, "path": path, "mode": mode})
+        return self
+
+    def symlink(self, target, path):
+        """Point `path` at `target`, replacing whatever `path` was (ln -sf)."""
+        self.ops.append({"op": "symlink", "target": target, "path": path})
+        return self
+
+    def set_ini_key(self, path, section, key, value, skip_missing=False, only_if=None):
+        """
+        Set `key=value` in `[section]` of the INI/.desktop file at `path`;
+        with `only_if`, only where the key currently has that value.
+        """
+        self.ops.append({"op": "set_ini_key", "path": path, "section": section,
+                         "key": key, "value": value, "skip_missing": skip_missing,
+                         "only_if": only_if})
+        return self
+
+    def write(self, path, content, mode=0o644):
+        """Write `content` to `path`, creating its directory if needed."""
+        self.ops.append({"op": "write", "path": path, "content": content, "mode": mode})
+        return self
+
+
+class PrivilegedHelper:
+    """
+    Client for the root helper. `start()` authenticates and launches it
+    once; `run()` then executes commands as root until `stop()` or exit.
+    The connection `start()` opens only keeps the helper alive: every call
+    goes over a connection of its own, so it can be made from any thread
+    and a FileBatch does not wait behind a pacman transaction.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._socket = None
+        self._dir = None
+        atexit.register(self.stop)
+
+    @property
+    def socket_path(self):
+        return os.path.join(self._dir, SOCKET_NAME) if self._dir else None
+
+    def is_running(self):
+        return self._socket is not None
+
+    def start(self, password=None):
+        """
+        Start the helper as root. With a password it goes through `sudo -S`
+        (ignoring cached credentials, so a wrong password always fails),
+        otherwise through pkexec. Returns False if authentication failed,
+        True once the helper is up or if it already was.
+        """
+        import socket
+        import subprocess
+        import tempfile
+        with self._lock:
+            if self._socket is not None:
+                return True
+
+            self._dir = tempfile.mkdtemp(prefix="linexin-helper-")
+            command = [sys.executable, "-I", HELPER_PATH,
+                       "--serve", self.socket_path, "--owner", str(os.getuid())]
+            if password is not None:
+                command = ["sudo", "-k", "-S", "-p", "", "--"] + command
+            else:
+                command = ["pkexec"] + command
+
+            try:
+                self._process = subprocess.Popen(
+                    command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+                )
+                # One line only: on a wrong password sudo hits EOF and exits
+                # instead of waiting for another attempt
+                try:
+                    if password is not None:
+                        self._process.stdin.write(password + "\n")
+                    self._process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+                if self._process.stdout.readline().strip() != READY_LINE:
+                    self._process.wait()
+                    self._cleanup()
+                    return False
+                self._process.stdout.close()
+
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self._socket.connect(self.socket_path)
+            except OSError as e:
+                print(f"Warning: Could not start the privileged helper: {e}")
+                self._cleanup()
+                return False
+        return True
+
+    def call(self, method, **params):
+        """Send one request over a connection of its own and return its result."""
+        with self._lock:
+            if self._socket is None:
+                raise HelperError("the privileged helper is not running")
+            socket_path = self.socket_path
+        try:
+            response = _request_once(socket_path, method, params)
+        except OSError as e:
+            raise HelperError(f"lost the privileged helper: {e}") from e
+        if not response:
+            raise HelperError("the privileged helper exited")
+        if "error" in response:
+            raise HelperError(response["error"])
+        return response["result"]
+
+    def run(self, argv, check=True, capture=False, input=None, timeout=None, job=None, lock=None):
+        """
+        Run `argv` as root, without a shell. Mirrors subprocess.run(): returns
+        a CompletedProcess, raises CalledProcessError if `check` is set, and
+        TimeoutExpired once the helper has stopped a command over `timeout`.
+        With a `job` id the command can be stopped through `cancel(job)`;
+        see `_run()` for `lock`.
+        """
+        import subprocess
+        argv = list(argv)
+        result = self.call("run", argv=argv, input=input, capture=capture,
+                           timeout=timeout, job=job, lock=lock)
+        if result.get("timed_out"):
+            raise subprocess.TimeoutExpired(argv, timeout, result["stdout"], result["stderr"])
+        completed = subprocess.CompletedProcess(
+            argv, result["returncode"], result["stdout"], result["stderr"]
+        )
+        if check:
+            completed.check_returncode()
+        return completed
+
+    def cancel(self, job):
+        """
+        Stop the command started with `job`, from any thread. Returns
+        False if no such command is running.
+        """
+        if self._dir is None:
+            return False
+        try:
+            return _request_once(self.socket_path, "cancel", {"job": job}).get("result", False)
+        except OSError:
+            return False
+
+    def apply(self, batch):
+        """
+        Apply a FileBatch all or nothing: if any operation fails, every
+        destination is left (or restored) as it was. Returns the changed
+        paths.
+        """
+        return self.call("apply_file_ops", ops=batch.ops)
+
+    def write_sudo_wrapper(self):
+        """
+        Write a sudo stand-in that forwards its command to the helper, for
+        tools such as paru that take a --sudo program. Returns its path.
+        """
+        if self._socket is None:
+            raise HelperError("the privileged helper is not running")
+        path = os.path.join(self._dir, SUDO_WRAPPER_NAME)
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\n")
+            f.write(f"exec '{sys.executable}' -I '{HELPER_PATH}' --run '{self.socket_path}' -- \"$@\"\n")
+        os.chmod(path, 0o700)
+        return path
+
+    def stop(self):
+        """Disconnect, which makes the helper exit, and remove its directory."""
+        with self._lock:
+            self._cleanup()
+
+    def _cleanup(self):
+        import shutil
+        import subprocess
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                print("Warning: The privileged helper did not exit")
+            self._process = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+
+_helper_instance = None
+
+
+def get_privileged_helper():
+    global _helper_instance
+    if _helper_instance is None:
+        _helper_instance = PrivilegedHelper()
+    return _helper_instance
+
+
+def _request_once(socket_path, method, params):
+    """Send one request over a connection of its own; returns the response."""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        request = {"id": 1, "method": method, "params": params}
+        conn.sendall((json.dumps(request) + "\n").encode())
+        with conn.makefile("r", encoding="utf-8") as reader:
+            return json.loads(reader.readline() or "{}")
+
+
+def run_through_socket(socket_path, argv):
+    """`--run`: act as sudo for another program. Returns the exit status."""
+    # Drop sudo options the caller passes (e.g. paru's `sudo -v`)
+    while argv and argv[0].startswith("-"):
+        argv = argv[1:]
+
+    if not argv:
+        response = _request_once(socket_path, "ping", {})
+    else:
+        # The command runs in a process group of the helper's, out of reach
+        # of signals meant for our caller; pass a stop on. Only SIGINT: it
+        # may be pacman in the middle of a transaction (paru's -U).
+        job = f"relay-{os.getpid()}"
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            response = _request_once(socket_path, "run", {"argv": argv, "job": job})
+        except KeyboardInterrupt:
+            _request_once(socket_path, "cancel", {"job": job, "escalate": False})
+            return 130
+    if "result" not in response:
+        print(f"privileged_helper: {response.get('error', 'no response')}", file=sys.stderr)
+        return 1
+    return response["result"]["returncode"] if argv else 0
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Linexin Upgrade Tool privileged helper")
+    parser.add_argument("--serve", metavar="SOCKET")
+    parser.add_argument("--owner", type=int)
+    # For benchmarks with fake backends: also trust programs and lock files in DIR
+    parser.add_argument("--test-root", metavar="DIR")
+    parser.add_argument("--run", metavar="SOCKET")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    if args.serve and args.owner is not None:
+        if args.test_root:
+            PROGRAM_DIRS.insert(0, args.test_root)
+            ALLOWED_LOCKS.append(os.path.join(args.test_root, "db.lck"))
+        return serve(args.serve, args.owner)
+    if args.run:
+        command = args.command[1:] if args.command[:1] == ["--"] else args.command
+        return run_through_socket(args.run, command)
+    parser.error("either --serve SOCKET --owner UID or --run SOCKET -- COMMAND is required")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+In-process view of the running processes, read straight from /proc.
+
+Questions like "is paru or a flatpak update running?" used to cost one
+pgrep fork/exec per pattern. The ProcessTable instead reads every
+process's comm and cmdline in a single pass over /proc, keeps that
+snapshot for a short TTL, and matches any number of names and command
+line patterns against it in one loop. Answering from a fresh snapshot
+takes microseconds.
+
+Matching follows pgrep: names are compared exactly against comm (`-x`),
+patterns are regular expressions searched in the command line with its
+arguments joined by spaces (`-f`). Our own process is never matched.
+
+Pass another `proc_path` (a directory of <pid>/comm and <pid>/cmdline
+files) to exercise it in isolation.
+"""
+
+import os
+import re
+import threading
+import time
+
+PROC_PATH = "/proc"
+# Seconds a snapshot answers queries before /proc is read again
+SNAPSHOT_TTL = 1.0
+
+
+def read_processes(proc_path=PROC_PATH):
+    """
+    One pass over `proc_path`: a list of (pid, comm, cmdline) tuples.
+    Kernel threads have an empty cmdline.
+    """
+    processes = []
+    for entry in os.listdir(proc_path):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc_path, entry, "comm"), "rb") as f:
+                comm = f.read().rstrip(b"\n").decode(errors="replace")
+            with open(os.path.join(proc_path, entry, "cmdline"), "rb") as f:
+                cmdline = f.read().rstrip(b"\0").replace(b"\0", b" ").decode(errors="replace")
+        except OSError:
+            # Exited while we were reading, or not ours to look at
+            continue
+        processes.append((int(entry), comm, cmdline))
+    return processes
+
+
+class ProcessTable:
+    """
+    Cached snapshot of the process table. Safe to query from several
+    threads; concurrent queries on a stale snapshot share one re-read.
+    """
+
+    def __init__(self, proc_path=PROC_PATH, ttl=SNAPSHOT_TTL):
+        self.proc_path = proc_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._processes = None
+        self._read_at = 0.0
+
+    def processes(self):
+        """The current snapshot, re-read once it is older than `ttl`."""
+        with self._lock:
+            now = time.monotonic()
+            if self._processes is None or now - self._read_at >= self.ttl:
+                self._processes = read_processes(self.proc_path)
+                self._read_at = now
+            return self._processes
+
+    def invalidate(self):
+        """Make the next query read /proc again."""
+        with self._lock:
+            self._processes = None
+
+    def find(self, names=(), patterns=()):
+        """
+        Pids of the processes whose comm is one of `names` or whose
+        command line matches one of the regular expressions `patterns`.
+        """
+        names = frozenset(names)
+        # One alternation, so each command line is searched once
+        regex = re.compile("|".join(f"(?:{pattern})" for pattern in patterns)) if patterns else None
+        own_pid = os.getpid()
+        return [
+            pid for pid, comm, cmdline in self.processes()
+            if pid != own_pid
+            and (comm in names or (regex is not None and regex.search(cmdline)))
+        ]
+
+    def is_running(self, names=(), patterns=()):
+        """Whether any process matches; see find()."""
+        return bool(self.find(names, patterns))
+
+
+_table_instance = None
+
+
+def get_process_table():
+    global _table_instance
+    if _table_instance is None:
+        _table_instance = ProcessTable()
+    return _table_instance
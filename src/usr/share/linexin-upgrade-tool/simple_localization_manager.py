@@ -1,22 +1,70 @@
 #!/usr/bin/env python3
-import gettext
+import functools
 import locale
 import os
+import re
 import sys
 import importlib
+import weakref
 from pathlib import Path
 import gi
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw, GObject
+from gi.repository import Gtk, Adw, GObject, GLib
+
+from font_prewarm import start_prewarm
+from startup_tracer import tracer
+from translation_catalog import LOCALE_PARENTS, TranslationCatalog, catalog_path
+
+FALLBACK_LANGUAGE = "en_US.UTF-8"
+# Set to 1 to leave Gtk/Adw classes unpatched; texts are then translated
+# only where code calls _() or bind()
+NO_PATCHES_ENV = "LINEXIN_UPGRADER_NO_L10N_PATCHES"
+# Main locale of a language when it is not <lang>_<LANG>, e.g. de -> de_DE
+LANGUAGE_DEFAULTS = {'en': 'en_US', 'pt': 'pt_BR'}
+# Attribute holding a widget's original English texts: {prop: text}
+ORIGINALS_ATTR = "_l10n_originals"
+# Translated dialog bodies kept per (locale, body)
+BODY_CACHE_SIZE = 64
+# Translated texts kept for the current language; the UI has a few hundred
+LOOKUP_CACHE_SIZE = 512
+# Splits Pango markup into text runs (even indices) and tags (odd indices)
+MARKUP_TAG_RE = re.compile(r"(<[^>]*>)")
+MARKUP_ENTITIES = (("&lt;", "<"), ("&gt;", ">"), ("&quot;", '"'), ("&apos;", "'"), ("&amp;", "&"))
+# Public setter that re-applies each stored property
+PROPERTY_SETTERS = {
+    'label': 'set_label',
+    'markup': 'set_markup',
+    'title': 'set_title',
+    'subtitle': 'set_subtitle',
+    'description': 'set_description',
+    'heading': 'set_heading',
+    'body': 'set_body',
+    'application_name': 'set_application_name',
+    'developer_name': 'set_developer_name',
+    'comments': 'set_comments',
+}
 
 class SimpleLocalizationManager(GObject.GObject):
     """
     A robust, singleton localization manager that monkey-patches Gtk and Adw widgets
     to provide automatic translation support.
+    
+    Every object with translated properties is indexed, so set_language()
+    can re-translate the live UI in place without rebuilding any page.
+    
+    With NO_PATCHES_ENV set no class is patched and widget construction
+    runs at plain PyGObject speed; bind() then opts single properties into
+    translation and live switching.
     """
     
+    __gsignals__ = {
+        # Emitted after a language switch has been applied to the live UI,
+        # for texts built with _() outside the patched setters
+        'language-changed': (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+    }
+    
     _instance = None
     
     def __new__(cls):
@@ -37,59 +85,115 @@ class SimpleLocalizationManager(GObject.GObject):
         self.translations_dir = self.base_dir / "translations"
         
         # State
-        self.translations = {}
-        self.current_language = "en_US.UTF-8"
-        self.org_texts = {} # Store original English texts: {widget: {prop: text}}
+        self.translations = {} # Loaded locales only: {"pl_PL.UTF-8": catalog, "pl_PL": catalog}
+        self.available_languages = {} # Every shipped locale: {"pl_PL.UTF-8": "pl_PL"}
+        self.current_language = FALLBACK_LANGUAGE
+        self.fallback_chain = [FALLBACK_LANGUAGE]
+        self._language_defaults = {} # {"de": "de_DE.UTF-8"}
+        self._catalog = None # Current locale, with what it inherits merged in
+        self._translatable = weakref.WeakSet() # Live objects holding originals
+        self._reverse_maps = {} # {"pl_PL.UTF-8": {translation: key}}, built on first switch
+        self._displayed_language = None # Language of the texts currently on screen
+        self._retranslate_id = 0
+        self._translate_body_cached = functools.lru_cache(maxsize=BODY_CACHE_SIZE)(
+            self._translate_body_lines
+        )
+        self._lookup_cached = functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+        
+        sys.path.insert(0, str(self.base_dir))
+        
+        # Detect system language from the environment before loading anything,
+        # so only the catalogs that will actually be used get loaded
+        with tracer.span("localization: detect language", "localization"):
+            self.available_languages = self._scan_available_languages()
+            self._language_defaults = self._index_language_defaults()
+            chain = self._fallback_chain(self._detect_system_locale()) or [FALLBACK_LANGUAGE]
         
-        # Load translations
-        self.load_translations()
+        # Load the active locale and its fallbacks
+        with tracer.span("localization: load translations", "localization"):
+            self._activate(chain)
         
-        # Detect system language
-        self.current_language = self._detect_system_language()
+        # Fallback fonts for CJK/Devanagari load in the background meanwhile
+        start_prewarm(self.current_language,
+                      (value for _, value in self._catalog.items()) if self._catalog is not None else ())
         print(f"LocalizationManager initialized. Language: {self.current_language}")
         
-        # Apply patches immediately
-        self._apply_patches()
-
-    def load_translations(self):
-        """Load all available translation modules."""
+        # Apply patches immediately, unless explicit binding was asked for
+        self.patches_applied = os.environ.get(NO_PATCHES_ENV, "") in ("", "0")
+        if self.patches_applied:
+            with tracer.span("localization: apply patches", "localization"):
+                self._apply_patches()
+        else:
+            print("Localization patches disabled, using explicit bindings.")
+
+    def _scan_available_languages(self):
+        """List the shipped locales from file names, without loading any."""
         if not self.translations_dir.exists():
             print(f"Warning: Translations directory not found at {self.translations_dir}")
-            return
+            return {}
 
-        sys.path.insert(0, str(self.base_dir))
-        
-        # Scan for .py files in translations dir
-        for file in self.translations_dir.glob("*.py"):
-            if file.name.startswith("__") or file.name == "update_translations_tool_v2.py" or file.name == "fix_indentation.py":
+        languages = {}
+        for entry in sorted(os.listdir(self.translations_dir)):
+            lang_code, ext = os.path.splitext(entry) # e.g. "pl_PL", ".catalog"
+            if ext not in (".py", ".catalog") or lang_code.startswith("__"):
                 continue
-                
-            lang_code = file.stem # e.g. "pl_PL"
-            # Normalize to our internal format with .UTF-8 if needed, but file names are usually just lang_country
-            # We map filename -> full locale code if possible, or just use filename as key
-            
-            # Map common filenames to full locale codes for consistency with system detection
-            locale_map_rev = {
-                'en_US': 'en_US.UTF-8', 'pl_PL': 'pl_PL.UTF-8', 'de_DE': 'de_DE.UTF-8',
-                'fr_FR': 'fr_FR.UTF-8', 'es_ES': 'es_ES.UTF-8', 'pt_BR': 'pt_BR.UTF-8',
-                'ru_RU': 'ru_RU.UTF-8', 'zh_CN': 'zh_CN.UTF-8', 'hi_IN': 'hi_IN.UTF-8',
-                'en_GB': 'en_GB.UTF-8', 'en_AU': 'en_AU.UTF-8', 'en_CA': 'en_CA.UTF-8'
-            }
-            
-            full_code = locale_map_rev.get(lang_code, f"{lang_code}.UTF-8")
-            
-            try:
-                module = importlib.import_module(f"translations.{lang_code}")
-                if hasattr(module, 'translations'):
-                    self.translations[full_code] = module.translations
-                    # Also map simpler code for fallback lookup
-                    self.translations[lang_code] = module.translations
-                    print(f"Loaded translations for {lang_code}")
-            except Exception as e:
-                print(f"Failed to load translations for {lang_code}: {e}")
-
-    def _detect_system_language(self):
-        """Detect system language with robust fallback."""
+            if entry in ("update_translations_tool_v2.py", "fix_indentation.py"):
+                continue
+            # Internal format matches system detection: lang_country.UTF-8
+            languages[f"{lang_code}.UTF-8"] = lang_code
+        return languages
+
+    def load_translations(self):
+        """Load every available locale, e.g. before offering a language switch."""
+        for full_code in self.available_languages:
+            self._ensure_loaded(full_code)
+
+    def _ensure_loaded(self, full_code):
+        """Load a single locale on first use; return its translations or None."""
+        if full_code in self.translations:
+            return self.translations[full_code]
+        lang_code = self.available_languages.get(full_code)
+        if lang_code is None:
+            return None
+
+        try:
+            translations = self._load_locale(lang_code)
+        except Exception as e:
+            print(f"Failed to load translations for {lang_code}: {e}")
+            translations = None
+        if translations is not None:
+            self.translations[full_code] = translations
+            # Also map simpler code for fallback lookup
+            self.translations[lang_code] = translations
+            print(f"Loaded translations for {lang_code}")
+        return translations
+
+    def _load_locale(self, lang_code):
+        """
+        Map translations/<lang_code>.catalog if the build produced one,
+        otherwise import the translations/<lang_code>.py module.
+        """
+        path = catalog_path(str(self.translations_dir), lang_code)
+        try:
+            return TranslationCatalog(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring translation catalog {path}: {e}")
+
+        module = importlib.import_module(f"translations.{lang_code}")
+        translations = getattr(module, 'translations', None)
+        parent = LOCALE_PARENTS.get(lang_code)
+        inherited = self._ensure_loaded(f"{parent}.UTF-8") if parent else None
+        if translations is None or inherited is None:
+            return translations
+        # Merge in what a regional module leaves out, as its catalog would
+        merged = dict(inherited.items())
+        merged.update(translations)
+        return merged
+
+    def _detect_system_locale(self):
+        """Read the system locale from the environment, e.g. "de_AT"."""
         try:
             sys_loc = locale.getdefaultlocale()[0]
             if not sys_loc:
@@ -97,77 +201,138 @@ class SimpleLocalizationManager(GObject.GObject):
             
             # Normalize
             if sys_loc == 'C': sys_loc = 'en_US'
-            
-            # Try exact match with UTF-8
-            utf8_loc = f"{sys_loc}.UTF-8"
-            if utf8_loc in self.translations:
-                return utf8_loc
-            
-            # Try exact match without UTF-8
-            if sys_loc in self.translations:
-                # Find the full key that stores it
-                for k in self.translations:
-                    if k.startswith(sys_loc):
-                        return k
-                        
-            # Try base language (e.g. 'de' from 'de_AT')
-            base = sys_loc.split('_')[0]
-            for k in self.translations:
-                if k.startswith(base + '_'):
-                    return k
-                    
+            return sys_loc
         except Exception as e:
             print(f"Language detection error: {e}")
-            
-        return "en_US.UTF-8"
+            return 'en_US'
+
+    def _index_language_defaults(self):
+        """Pick the main shipped locale of each language: {"de": "de_DE.UTF-8"}."""
+        defaults = {}
+        for full_code, lang_code in self.available_languages.items():
+            base = lang_code.split('_')[0]
+            preferred = LANGUAGE_DEFAULTS.get(base, f"{base}_{base.upper()}")
+            if lang_code == preferred or base not in defaults:
+                defaults[base] = full_code
+        return defaults
+
+    def _fallback_chain(self, language):
+        """
+        Resolve a locale to the shipped locales its strings come from, most
+        specific first, e.g. "de_AT" -> ["de_DE.UTF-8", "en_US.UTF-8"] and
+        "en_GB" -> ["en_GB.UTF-8", "en_US.UTF-8"]. Regional locales are
+        followed by their parent, whose strings they hold as well. Returns
+        None if no locale of that language is shipped.
+        """
+        lang_code = language.split('.')[0]
+        base = lang_code.split('_')[0]
+        chain = []
+        for candidate in (f"{lang_code}.UTF-8", self._language_defaults.get(base)):
+            while candidate in self.available_languages and candidate not in chain:
+                chain.append(candidate)
+                parent = LOCALE_PARENTS.get(self.available_languages[candidate])
+                candidate = f"{parent}.UTF-8" if parent else None
+            if chain:
+                # Only the first locale is looked in; what follows must be
+                # merged into it already
+                break
+        if not chain:
+            return None
+        if FALLBACK_LANGUAGE not in chain:
+            chain.append(FALLBACK_LANGUAGE)
+        return chain
+
+    def _activate(self, chain):
+        """
+        Make chain[0] the current language. Its locale holds everything the
+        chain resolves (en_US only maps English to itself), so get_text()
+        asks that one alone; the first locale that loads stands in for it.
+        A mmapped catalog stays as loaded, it is not decoded.
+        """
+        self._catalog = next((translations for translations in map(self._ensure_loaded, chain)
+                              if translations is not None), None)
+        self.fallback_chain = chain
+        self.current_language = chain[0]
+        # Texts translated for the previous language are never asked for again
+        self._lookup_cached.cache_clear()
+        self._translate_body_cached.cache_clear()
+
+    def _lookup(self, text):
+        """Ask the current locale for `text`: one probe."""
+        if self._catalog is None:
+            return text
+        return self._catalog.get(text, text)
+
+    def _build_lookup(self, chain):
+        """
+        Merge the locales of a chain into one dict, most specific last,
+        decoding every catalog of it. Only used for the reverse map on a
+        language switch. Keys and values are interned, so a string shared
+        by several locales (every en_* value, most of pt_BR and pt_PT) is
+        held once however many are loaded.
+        """
+        intern = sys.intern
+        lookup = {}
+        for full_code in reversed(chain):
+            translations = self._ensure_loaded(full_code)
+            if translations is not None:
+                for key, value in translations.items():
+                    lookup[intern(key)] = intern(value)
+        return lookup
 
     def get_text(self, text):
         """
-        Translate the given text. 
-        Detailed logic:
-        1. If text is empty or not string, return as is.
-        2. Look up in current language.
-        3. If not found, look up in en_US (to ensure we verify key existence).
-        4. If not found anywhere, return original text.
+        Translate the given text through the current fallback chain; unknown
+        texts are returned as they are. Texts the UI shows again (on every
+        rebuild or language switch) come from a small LRU cache, the rest
+        cost one probe of the current locale.
         """
         if not text or not isinstance(text, str):
             return text
-            
-        current_dict = self.translations.get(self.current_language, {})
-        
-        if text in current_dict:
-            return current_dict[text]
-            
-        # Fallback for "invisible" keys? 
-        # Sometimes keys in code are English, but we might have a dedicated en_US dictionary 
-        # that maps "Key" -> "Value". If we are in English, we want "Value".
-        if self.current_language.startswith("en_"):
-             en_dict = self.translations.get("en_US.UTF-8", {})
-             if text in en_dict:
-                 return en_dict[text]
-
-        return text
+        return self._lookup_cached(text)
 
     def _store_original(self, obj, prop, text):
         """Store the original English text for a property to allow re-translation."""
         if not text: return
         
-        # We only store if we haven't stored it yet (first set is usually the init/English one)
-        # OR if we explicitly detect it's a valid English key (which means it's a raw string from code)
-        
-        # Simplest robust approach:
-        # If we don't have an original for this prop, store `text`.
-        # When translating, we use the stored original to look up the new target.
+        # The originals live on the object itself, so they are freed with it
+        # and can never be picked up by a later object that reuses its id().
+        # Setting a Python attribute makes PyGObject keep the wrapper alive
+        # for as long as the underlying GObject is.
+        originals = getattr(obj, ORIGINALS_ATTR, None)
+        if originals is None:
+            originals = {}
+            setattr(obj, ORIGINALS_ATTR, originals)
+            self._translatable.add(obj)
         
-        oid = id(obj)
-        if oid not in self.org_texts:
-            self.org_texts[oid] = {}
-        
-        if prop not in self.org_texts[oid]:
-             self.org_texts[oid][prop] = text
+        # The latest text set is what is on screen, so it is what a language
+        # switch has to re-translate
+        originals[prop] = text
+        # A label shows either plain text or markup, whichever was set last
+        if prop == 'label':
+            originals.pop('markup', None)
+        elif prop == 'markup':
+            originals.pop('label', None)
+
+    def _store_originals(self, obj, originals):
+        for prop, text in originals.items():
+            self._store_original(obj, prop, text)
 
     def _get_original(self, obj, prop):
-        return self.org_texts.get(id(obj), {}).get(prop)
+        return getattr(obj, ORIGINALS_ATTR, {}).get(prop)
+
+    def _translate_kwargs(self, kwargs, props, translate=None):
+        """
+        Translate the given constructor properties in place and return their
+        originals, to be stored once the object has been constructed.
+        """
+        translate = translate or self.get_text
+        originals = {}
+        for prop in props:
+            if prop in kwargs:
+                originals[prop] = kwargs[prop]
+                kwargs[prop] = translate(kwargs[prop])
+        return originals
 
     # --- MONKEY PATCHING ---
     
@@ -191,11 +356,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_markup = Gtk.Label.set_markup
         
         def patched_init(self_obj, **kwargs):
-            if 'label' in kwargs:
-                # Capture original
-                self._store_original(self_obj, 'label', kwargs['label'])
-                kwargs['label'] = self.get_text(kwargs['label'])
+            originals = self._translate_kwargs(kwargs, ('label',))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
 
         def patched_set_text(self_obj, text):
             self._store_original(self_obj, 'label', text)
@@ -208,18 +371,7 @@ class SimpleLocalizationManager(GObject.GObject):
             # But mostly we just translate if it's a known full string with markup in the dict.
             self._store_original(self_obj, 'markup', markup)
             
-            # 1. Try translating entire markup string
-            translated = self.get_text(markup)
-            if translated != markup:
-                 original_set_markup(self_obj, translated)
-                 return
-
-            # 2. Heuristic: Replace content between tags if it matches a key
-            # Simple approach: If markup contains a key we know, replace it.
-            # This is expensive to scan ALL keys. 
-            # Better: if user calls set_markup(_("<b>Bold</b>")), it's already translated.
-            # So we usually just pass it through if get_text didn't hit.
-            original_set_markup(self_obj, markup)
+            original_set_markup(self_obj, self._translate_markup(markup))
 
         Gtk.Label.__init__ = patched_init
         Gtk.Label.set_text = patched_set_text
@@ -230,10 +382,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_label = Gtk.Button.set_label
         
         def patched_init(self_obj, **kwargs):
-            if 'label' in kwargs:
-                self._store_original(self_obj, 'label', kwargs['label'])
-                kwargs['label'] = self.get_text(kwargs['label'])
+            originals = self._translate_kwargs(kwargs, ('label',))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
             
         def patched_set_label(self_obj, label):
             self._store_original(self_obj, 'label', label)
@@ -248,10 +399,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_title = Gtk.Window.set_title
         
         def patched_init(self_obj, **kwargs):
-            if 'title' in kwargs:
-                self._store_original(self_obj, 'title', kwargs['title'])
-                kwargs['title'] = self.get_text(kwargs['title'])
+            originals = self._translate_kwargs(kwargs, ('title',))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
             
         def patched_set_title(self_obj, title):
             self._store_original(self_obj, 'title', title)
@@ -266,13 +416,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_desc = Adw.PreferencesGroup.set_description
         
         def patched_init(self_obj, **kwargs):
-            if 'title' in kwargs:
-                self._store_original(self_obj, 'title', kwargs['title'])
-                kwargs['title'] = self.get_text(kwargs['title'])
-            if 'description' in kwargs:
-                self._store_original(self_obj, 'description', kwargs['description'])
-                kwargs['description'] = self.get_text(kwargs['description'])
+            originals = self._translate_kwargs(kwargs, ('title', 'description'))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
             
         def patched_set_title(self_obj, title):
             self._store_original(self_obj, 'title', title)
@@ -292,13 +438,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_subtitle = Adw.ActionRow.set_subtitle
         
         def patched_init(self_obj, **kwargs):
-            if 'title' in kwargs:
-                self._store_original(self_obj, 'title', kwargs['title'])
-                kwargs['title'] = self.get_text(kwargs['title'])
-            if 'subtitle' in kwargs:
-                self._store_original(self_obj, 'subtitle', kwargs['subtitle'])
-                kwargs['subtitle'] = self.get_text(kwargs['subtitle'])
+            originals = self._translate_kwargs(kwargs, ('title', 'subtitle'))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
 
         def patched_set_title(self_obj, title):
             self._store_original(self_obj, 'title', title)
@@ -318,13 +460,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_desc = Adw.StatusPage.set_description
         
         def patched_init(self_obj, **kwargs):
-            if 'title' in kwargs:
-                self._store_original(self_obj, 'title', kwargs['title'])
-                kwargs['title'] = self.get_text(kwargs['title'])
-            if 'description' in kwargs:
-                self._store_original(self_obj, 'description', kwargs['description'])
-                kwargs['description'] = self.get_text(kwargs['description'])
+            originals = self._translate_kwargs(kwargs, ('title', 'description'))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
 
         def patched_set_title(self_obj, title):
             self._store_original(self_obj, 'title', title)
@@ -346,13 +484,9 @@ class SimpleLocalizationManager(GObject.GObject):
         # Adw.WindowTitle init is weird, mostly uses properties. 
         # But let's safe guard.
         def patched_init(self_obj, **kwargs):
-            if 'title' in kwargs:
-                 self._store_original(self_obj, 'title', kwargs['title'])
-                 kwargs['title'] = self.get_text(kwargs['title'])
-            if 'subtitle' in kwargs:
-                 self._store_original(self_obj, 'subtitle', kwargs['subtitle'])
-                 kwargs['subtitle'] = self.get_text(kwargs['subtitle'])
+            originals = self._translate_kwargs(kwargs, ('title', 'subtitle'))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
 
         def patched_set_title(self_obj, title):
             self._store_original(self_obj, 'title', title)
@@ -373,13 +507,10 @@ class SimpleLocalizationManager(GObject.GObject):
         original_add_response = Adw.MessageDialog.add_response
         
         def patched_init(self_obj, **kwargs):
-            if 'heading' in kwargs:
-                self._store_original(self_obj, 'heading', kwargs['heading'])
-                kwargs['heading'] = self.get_text(kwargs['heading'])
-            if 'body' in kwargs:
-                self._store_original(self_obj, 'body', kwargs['body'])
-                kwargs['body'] = self._translate_body_smart(kwargs['body'])
+            originals = self._translate_kwargs(kwargs, ('heading',))
+            originals.update(self._translate_kwargs(kwargs, ('body',), self._translate_body_smart))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
 
         def patched_set_heading(self_obj, heading):
             self._store_original(self_obj, 'heading', heading)
@@ -401,9 +532,49 @@ class SimpleLocalizationManager(GObject.GObject):
         Adw.MessageDialog.set_body = patched_set_body
         Adw.MessageDialog.add_response = patched_add_response
         
+    def _translate_markup(self, markup):
+        # 1. Try translating entire markup string
+        translated = self.get_text(markup)
+        if translated != markup:
+            return translated
+
+        # 2. Translate each text run between tags that is a key, e.g.
+        # <span size="x-large">Choose Your Option</span>. One pass over
+        # the string and one lookup per run, whatever the catalog size.
+        return self._translate_markup_runs(markup, self.get_text)
+
+    @staticmethod
+    def _translate_markup_runs(markup, translate):
+        """
+        Apply `translate` to every text run of `markup`, unescaped, with
+        the surrounding whitespace kept. Tags are left untouched.
+        """
+        parts = MARKUP_TAG_RE.split(markup)
+        for i in range(0, len(parts), 2):
+            run = parts[i]
+            text = run.strip()
+            if not text:
+                continue
+            source = text
+            for entity, char in MARKUP_ENTITIES:
+                source = source.replace(entity, char)
+            translated = translate(source)
+            if translated != source:
+                start = run.index(text)
+                parts[i] = (run[:start] + GLib.markup_escape_text(translated, -1)
+                            + run[start + len(text):])
+        return "".join(parts)
+
     def _translate_body_smart(self, body):
-        """Preserve bullets and newlines when translating body."""
+        """
+        Preserve bullets and newlines when translating body. Dialogs are
+        rebuilt with the same bodies on every retry, so results are cached.
+        """
         if not body: return body
+        return self._translate_body_cached(self.current_language, body)
+
+    def _translate_body_lines(self, language, body):
+        """Uncached body translation; `language` only keys the cache."""
         lines = body.splitlines()
         translated_lines = []
         for line in lines:
@@ -429,10 +600,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_title = Adw.Toast.set_title
         
         def patched_init(self_obj, **kwargs):
-            if 'title' in kwargs:
-                self._store_original(self_obj, 'title', kwargs['title'])
-                kwargs['title'] = self.get_text(kwargs['title'])
+            originals = self._translate_kwargs(kwargs, ('title',))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
             
         def patched_set_title(self_obj, title):
             self._store_original(self_obj, 'title', title)
@@ -448,11 +618,9 @@ class SimpleLocalizationManager(GObject.GObject):
         original_set_comments = Adw.AboutWindow.set_comments
         
         def patched_init(self_obj, **kwargs):
-            for k in ['application_name', 'developer_name', 'comments']:
-                if k in kwargs:
-                    self._store_original(self_obj, k, kwargs[k])
-                    kwargs[k] = self.get_text(kwargs[k])
+            originals = self._translate_kwargs(kwargs, ('application_name', 'developer_name', 'comments'))
             original_init(self_obj, **kwargs)
+            self._store_originals(self_obj, originals)
             
         def patched_set_app(self_obj, name):
             self._store_original(self_obj, 'application_name', name)
@@ -480,6 +648,99 @@ class SimpleLocalizationManager(GObject.GObject):
         """
         pass
 
+    def bind(self, obj, prop, text):
+        """
+        Set property `prop` of `obj` to the translation of `text` and keep it
+        translated across set_language(), e.g.
+        bind(label, 'markup', '<b>Choose Your Option</b>').
+        
+        Needed only when the patches are disabled; with them, the plain
+        setters already do this.
+        """
+        setter = self._setter_for(obj, prop)
+        if setter is None:
+            raise ValueError(f"Cannot translate property '{prop}' of {type(obj).__name__}")
+        if self.patches_applied:
+            # The patched setter stores the original and translates
+            setter(text)
+            return
+        self._store_original(obj, prop, text)
+        if prop == 'markup':
+            setter(self._translate_markup(text))
+        elif prop == 'body':
+            setter(self._translate_body_smart(text))
+        else:
+            setter(self.get_text(text))
+
+    def set_language(self, language):
+        """
+        Switch the UI language, e.g. set_language("de_DE").
+        
+        Loads the locale if it is not resident yet, then re-translates every
+        live translated property in one batched pass on the main loop.
+        Returns False if the language is not available.
+        """
+        chain = self._fallback_chain(language)
+        if chain is None:
+            print(f"Warning: No translations for {language}")
+            return False
+        if chain[0] == self.current_language:
+            return True
+        
+        # Texts on screen are in the language that was active before the
+        # first switch of this batch
+        if self._displayed_language is None:
+            self._displayed_language = self.current_language
+        self._activate(chain)
+        print(f"Switching language to {self.current_language}")
+        
+        if not self._retranslate_id:
+            self._retranslate_id = GLib.idle_add(self._retranslate_all)
+        return True
+
+    def _retranslate_all(self):
+        """Re-apply every stored original in the current language."""
+        self._retranslate_id = 0
+        to_source = self._reverse_map(self._displayed_language)
+        self._displayed_language = None
+        
+        count = 0
+        for obj in list(self._translatable):
+            originals = getattr(obj, ORIGINALS_ATTR, {})
+            for prop, text in list(originals.items()):
+                if self._setter_for(obj, prop) is None:
+                    continue
+                # Code often passes _("...") results, so the stored text may
+                # be a translation; map it back to its English key, which
+                # bind() stores before applying the new language.
+                source = to_source.get(text, text)
+                if prop == 'markup' and source == text:
+                    source = self._translate_markup_runs(text, lambda run: to_source.get(run, run))
+                self.bind(obj, prop, source)
+                count += 1
+        
+        print(f"Re-translated {count} strings to {self.current_language}")
+        self.emit('language-changed', self.current_language)
+        return False
+
+    def _reverse_map(self, language):
+        """Map the translations of a resident locale back to their keys."""
+        if language not in self._reverse_maps:
+            # Use the whole chain: an overlay only holds part of its strings
+            translations = self._build_lookup(self._fallback_chain(language) or [])
+            self._reverse_maps[language] = {
+                value: key for key, value in translations.items() if value != key
+            }
+        return self._reverse_maps[language]
+
+    @staticmethod
+    def _setter_for(obj, prop):
+        # Gtk.Label keeps plain text under 'label' but it is set with set_text
+        if prop == 'label' and isinstance(obj, Gtk.Label):
+            return obj.set_text
+        name = PROPERTY_SETTERS.get(prop)
+        return getattr(obj, name, None) if name else None
+
 # Global Instance
 _manager_instance = None
 
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Startup phase tracer for the Linexin Upgrade Tool.
+
+Run the upgrader with --trace-startup (or --trace-startup=/path/file.json)
+to record wall-clock spans for module imports, localization setup, page
+construction, CSS provider registration and the first painted frame. The
+result is a Chrome trace / Perfetto JSON file that can be opened in
+ui.perfetto.dev or chrome://tracing. Without a path it goes to
+$XDG_RUNTIME_DIR (or the user's cache directory), never to a shared
+directory like /tmp, and an existing symlink in its place is not followed.
+
+When tracing is off every hook is a cheap no-op.
+"""
+
+import builtins
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_FLAG = "--trace-startup"
+TRACE_FILE_NAME = "linexin-upgrader-startup-trace.json"
+
+
+def default_trace_path():
+    """TRACE_FILE_NAME in a directory only the user can write to."""
+    directory = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(directory, TRACE_FILE_NAME)
+
+
+class StartupTracer:
+    """Collects trace events and writes them in the Chrome trace format."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None  # default_trace_path() unless one is given
+        self._origin = time.perf_counter()
+        self._events = []
+        self._lock = threading.Lock()
+        self._original_import = None
+        self._written = False
+        self._notes = {}
+
+    # --- Setup ---
+
+    def configure_from_argv(self, argv):
+        """
+        Enable tracing if TRACE_FLAG is present and return argv without it,
+        so GApplication never sees an option it does not know.
+        """
+        remaining = []
+        for arg in argv:
+            if arg == TRACE_FLAG:
+                self.enable()
+            elif arg.startswith(TRACE_FLAG + "="):
+                self.enable(arg.split("=", 1)[1])
+            else:
+                remaining.append(arg)
+        return remaining
+
+    def enable(self, path=None):
+        self.enabled = True
+        if path:
+            self.path = path
+        self.instrument_imports()
+
+    def instrument_imports(self):
+        """Record a span for every module imported for the first time."""
+        if self._original_import is not None:
+            return
+        original_import = builtins.__import__
+        self._original_import = original_import
+
+        def traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            start = self._now_us()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._add_complete(f"import {name}", "imports", start)
+
+        builtins.__import__ = traced_import
+
+    def instrument_css(self):
+        """Record spans for CSS parsing and provider registration."""
+        if not self.enabled:
+            return
+        from gi.repository import Gtk
+
+        original_load = Gtk.CssProvider.load_from_data
+        original_add = Gtk.StyleContext.add_provider_for_display
+
+        def traced_load(provider, data, *args):
+            with self.span("css: parse provider", "css", bytes=len(data)):
+                return original_load(provider, data, *args)
+
+        def traced_add(display, provider, priority):
+            with self.span("css: add provider for display", "css"):
+                return original_add(display, provider, priority)
+
+        Gtk.CssProvider.load_from_data = traced_load
+        Gtk.StyleContext.add_provider_for_display = staticmethod(traced_add)
+
+    def watch_first_frame(self, window):
+        """Mark the first frame painted for `window` and write the trace."""
+        if not self.enabled:
+            return
+
+        def on_after_paint(clock):
+            clock.disconnect(handler_id[0])
+            self.instant("first frame painted", "frame")
+            self._add_complete("launch to first frame", "startup", 0, dict(self._notes))
+            self.write()
+
+        handler_id = []
+
+        def connect_clock(*args):
+            clock = window.get_frame_clock()
+            handler_id.append(clock.connect("after-paint", on_after_paint))
+
+        if window.get_frame_clock() is not None:
+            connect_clock()
+        else:
+            window.connect("realize", connect_clock)
+
+    # --- Recording ---
+
+    def span(self, name, category="startup", **args):
+        """Context manager that records a complete event around its body."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._span(name, category, args)
+
+    @contextlib.contextmanager
+    def _span(self, name, category, args):
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self._add_complete(name, category, start, args)
+
+    def note(self, key, value):
+        """
+        Record a fact about this launch (e.g. a feature being on or off).
+        Notes are attached to the first-frame span and the trace metadata,
+        so traces of different setups can be told apart and compared.
+        """
+        if self.enabled:
+            self._notes[key] = value
+
+    def instant(self, name, category="startup", **args):
+        if not self.enabled:
+            return
+        self._append({
+            "name": name, "cat": category, "ph": "i", "s": "p",
+            "ts": self._now_us(), "args": args,
+        })
+
+    def _add_complete(self, name, category, start_us, args=None):
+        self._append({
+            "name": name, "cat": category, "ph": "X",
+            "ts": start_us, "dur": self._now_us() - start_us,
+            "args": args or {},
+        })
+
+    def _append(self, event):
+        event["pid"] = os.getpid()
+        event["tid"] = threading.get_native_id()
+        with self._lock:
+            self._events.append(event)
+
+    def _now_us(self):
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    # --- Output ---
+
+    def write(self):
+        """Write the collected events once and stop tracing imports."""
+        if not self.enabled or self._written:
+            return
+        self._written = True
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+
+        with self._lock:
+            events = list(self._events)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms", "metadata": dict(self._notes)}
+        if self.path is None:
+            self.path = default_trace_path()
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+            with open(fd, "w") as f:
+                json.dump(trace, f)
+            print(f"Startup trace written to {self.path}")
+        except OSError as e:
+            print(f"Warning: Could not write startup trace: {e}")
+
+
+# Global Instance
+tracer = StartupTracer()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+System facts the wizard needs (OS version, connectivity, installed
+desktops, running updates), probed concurrently on a small worker pool.
+
+Results are published as GObject properties on the main loop, so pages
+either read them directly or connect to "notify::<property>" and update
+themselves when a probe reports. No probe runs on the GTK main thread.
+
+Connectivity is not sampled just once: Gio.NetworkMonitor change signals
+re-run the internet probe, so pages follow Wi-Fi coming up or going away
+while the wizard is open.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import GObject, GLib, Gio
+
+from connectivity import has_internet_connection
+from process_table import get_process_table
+from pacman_db import get_local_database, PACMAN_LOCK_PATH
+
+OS_RELEASE_PATH = "/usr/lib/os-release"
+# Processes that mean the Linexin Updater is updating the system
+UPDATE_PROCESS_NAMES = ("paru", "makepkg")
+UPDATE_CMDLINE_PATTERNS = ("flatpak update",)
+
+
+# --- Probe functions (run on the worker pool) ---
+
+def read_version_id(path=OS_RELEASE_PATH):
+    """Read VERSION_ID from /usr/lib/os-release"""
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith("VERSION_ID="):
+                    return line.split("=", 1)[1].strip().strip('"')
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def is_package_installed(name):
+    """Check if a package is installed, from pacman's local database."""
+    try:
+        return get_local_database().is_installed(name)
+    except OSError as e:
+        print(f"Warning: Could not read the pacman database: {e}")
+        return False
+
+
+def is_system_updating():
+    """Check if Linexin Updater is currently updating the system."""
+    # Check pacman database lock
+    if os.path.exists(PACMAN_LOCK_PATH):
+        return True
+    # Check for running update processes (paru, makepkg, flatpak update)
+    try:
+        return get_process_table().is_running(UPDATE_PROCESS_NAMES, UPDATE_CMDLINE_PATTERNS)
+    except OSError as e:
+        print(f"Warning: Could not read the process table: {e}")
+        return False
+
+
+class SystemProbe(GObject.Object):
+    """
+    Singleton service that gathers startup facts in parallel.
+
+    Each fact is a property; `is_ready(name)` tells whether its probe has
+    reported yet, so pages can show a pending state until it has.
+    """
+
+    version_id = GObject.Property(type=str, default="")
+    has_internet = GObject.Property(type=bool, default=False)
+    has_kinexin_desktop = GObject.Property(type=bool, default=False)
+    system_updating = GObject.Property(type=bool, default=False)
+    current_desktop = GObject.Property(type=str, default="")
+
+    MAX_WORKERS = 4
+    # NetworkMonitor emits bursts of signals while a link comes up; wait for
+    # it to settle before probing
+    NETWORK_SETTLE_MS = 500
+    # A probe result stays valid this long while the network state it was
+    # taken in does not change
+    INTERNET_CACHE_SECONDS = 30
+
+    def __init__(self):
+        super().__init__()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS, thread_name_prefix="system-probe"
+        )
+        self._probes = {
+            "version-id": lambda: read_version_id() or "",
+            "has-internet": has_internet_connection,
+            "has-kinexin-desktop": lambda: is_package_installed("kinexin-desktop"),
+            "system-updating": is_system_updating,
+        }
+        self._ready = set()
+        self._running = set()
+        self._callbacks = {}
+        self._started = False
+
+        self._network_monitor = None
+        self._network_settle_id = 0
+        self._network_state = None
+        self._internet_checked_at = 0.0
+
+        # Reading the environment is not I/O, so this one is known up front
+        self.current_desktop = os.environ.get("XDG_CURRENT_DESKTOP", "").upper()
+        self._ready.add("current-desktop")
+
+    def start(self):
+        """Run every probe once on the worker pool."""
+        if self._started:
+            return
+        self._started = True
+        for name in self._probes:
+            self.refresh(name)
+        self._watch_network()
+
+    def refresh(self, name, callback=None):
+        """
+        Re-run a single probe. `callback(value)` is called on the main loop
+        once the new value has been published. A refresh requested while
+        the same probe is still running joins that run.
+        """
+        if callback is not None:
+            self._callbacks.setdefault(name, []).append(callback)
+        if name in self._running:
+            return
+        self._running.add(name)
+        future = self._executor.submit(self._probes[name])
+        future.add_done_callback(lambda f: GLib.idle_add(self._publish, name, f))
+
+    def is_ready(self, name):
+        return name in self._ready
+
+    # --- Network monitoring ---
+
+    def _watch_network(self):
+        """Re-probe connectivity whenever the network configuration changes."""
+        self._network_monitor = Gio.NetworkMonitor.get_default()
+        self._network_state = self._read_network_state()
+        self._network_monitor.connect("network-changed", self._on_network_changed)
+
+    def _read_network_state(self):
+        monitor = self._network_monitor
+        return (monitor.get_network_available(), monitor.get_connectivity())
+
+    def _on_network_changed(self, monitor, available):
+        if self._network_settle_id:
+            GLib.source_remove(self._network_settle_id)
+        self._network_settle_id = GLib.timeout_add(
+            self.NETWORK_SETTLE_MS, self._on_network_settled
+        )
+
+    def _on_network_settled(self):
+        self._network_settle_id = 0
+        state = self._read_network_state()
+        available, connectivity = state
+
+        if not available or connectivity == Gio.NetworkConnectivity.LOCAL:
+            # No route out at all, nothing to probe
+            self._network_state = state
+            if self.has_internet or not self.is_ready("has-internet"):
+                self._set_result("has-internet", False)
+            return False
+
+        is_fresh = time.monotonic() - self._internet_checked_at < self.INTERNET_CACHE_SECONDS
+        if state == self._network_state and is_fresh:
+            # Same network as the cached result was taken on
+            return False
+
+        self._network_state = state
+        self.refresh("has-internet")
+        return False
+
+    # --- Results ---
+
+    def _publish(self, name, future):
+        self._running.discard(name)
+        try:
+            value = future.result()
+        except Exception as e:
+            print(f"Warning: System probe '{name}' failed: {e}")
+            value = self.find_property(name).get_default_value()
+        self._set_result(name, value)
+        return False
+
+    def _set_result(self, name, value):
+        if name == "has-internet":
+            self._internet_checked_at = time.monotonic()
+        self._ready.add(name)
+        # Setting the property emits notify::<name> for bound pages
+        self.set_property(name, value)
+
+        for callback in self._callbacks.pop(name, []):
+            callback(value)
+
+
+# Global Instance
+_probe_instance = None
+
+def get_system_probe():
+    global _probe_instance
+    if _probe_instance is None:
+        _probe_instance = SystemProbe()
+    return _probe_instance
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Asynchronous execution of long operations on the GLib main loop.
+
+Pages used to start a daemon thread per click that blocked in
+subprocess.run(shell=True) and reported back through GLib.idle_add. The
+TaskRunner replaces that pattern:
+
+- `spawn()` starts a program through Gio.Subprocess. Its pipes are read
+  by the main loop without blocking, and an optional timeout kills it.
+- `run_privileged()` and `call_blocking()` hand work that has to block
+  (privileged commands, helper round-trips, file copies) to long-lived
+  worker threads.
+- `run_task()` drives a generator that yields those operations, so an
+  install sequence reads top to bottom and still runs on the main loop:
+
+      def steps():
+          result = yield runner.spawn(["flatpak", "install", ...])
+          yield runner.run_privileged(["pacman", "-Sy", ...])
+
+  The generator is resumed with each operation's CompletedProcess, or the
+  operation's exception is raised inside it.
+
+Every call returns an Operation, a completion future whose callbacks run
+on the main loop. Spawned programs, privileged commands and other
+blocking calls are limited, and queued, separately: at most MAX_SPAWNED
+programs, COMMAND_WORKERS privileged commands and BLOCKING_WORKERS
+blocking calls run at once. A queue of flatpak installs the user started
+thus never holds up a pacman step, and a pacman step that runs for
+minutes never holds up authentication or a file batch.
+
+Cancelling is cooperative. `Operation.cancel()` on a task stops the
+operation it is waiting for if that one can be interrupted (spawned
+programs, privileged commands started with `interruptible=True`, anything
+still queued), and raises Cancelled inside the generator the next time it
+is resumed, i.e. at its next yield. Commands that must not be cut short,
+like a pacman transaction, run to the end first. `pacman_sync()` splits
+an install that way: a download that can be stopped, then the
+transaction. Stopped programs are taken down with their whole process
+group, so nothing they started keeps running.
+"""
+
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from gi.repository import Gio, GLib
+
+from privileged_helper import get_privileged_helper, STOP_SIGNALS, CANCEL_GRACE
+from pacman_db import PACMAN_LOCK_PATH
+
+# Spawned programs running at once; flatpak serialises on its own lock
+# anyway, so more would only interleave their output
+MAX_SPAWNED = 2
+# Blocking calls running at once: authentication, file batches, lookups
+BLOCKING_WORKERS = 1
+# Privileged commands running at once; pacman holds its lock for the
+# whole transaction, so a second one would only wait for it
+COMMAND_WORKERS = 1
+# How often a cancel is retried for a privileged command still on its way
+# to the helper
+CANCEL_RETRY_MS = 50
+
+
+class Cancelled(BaseException):
+    """
+    Raised inside a task at its first yield after `cancel()`, and the
+    exception of an operation that was stopped. A BaseException, like
+    asyncio's CancelledError, so `except Exception` does not swallow it.
+    """
+
+
+class Operation:
+    """
+    Completion future of an asynchronous operation. Its state is only
+    changed, and its callbacks only run, on the GLib main loop.
+    """
+
+    def __init__(self, description):
+        self.description = description
+        self._done = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+        # Interrupts the operation, returns whether it could; None while it
+        # cannot be interrupted
+        self._on_cancel = None
+        self._cancel_requested = False
+
+    def done(self):
+        return self._done
+
+    def cancelled(self):
+        return isinstance(self._exception, Cancelled)
+
+    def cancel(self):
+        """
+        Ask the operation to stop. Returns False if it has finished or
+        cannot be interrupted, in which case it runs on unaffected.
+        """
+        if self._done:
+            return False
+        if not self._cancel_requested:
+            self._cancel_requested = True
+            if self._on_cancel is None or not self._on_cancel():
+                self._cancel_requested = False
+                return False
+        return True
+
+    def result(self):
+        """The operation's result; raises its exception if it failed."""
+        if not self._done:
+            raise RuntimeError(f"{self.description} has not finished")
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self):
+        return self._exception
+
+    def add_done_callback(self, callback):
+        """Call `callback(operation)` on the main loop once it has finished."""
+        if self._done:
+            GLib.idle_add(lambda: callback(self) and False)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(self, result=None, exception=None):
+        self._done = True
+        self._result = result
+        self._exception = exception
+        self._on_cancel = None
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class _Lane:
+    """Operations of one kind: how many may run, how many do, which wait."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.running = 0
+        self.queue = deque()
+
+
+class TaskRunner:
+    """Singleton executing Operations; see the module docstring."""
+
+    def __init__(self, max_spawned=MAX_SPAWNED):
+        self._spawn_lane = _Lane(max_spawned)
+        self._blocking_lane = _Lane(BLOCKING_WORKERS)
+        self._command_lane = _Lane(COMMAND_WORKERS)
+        # Each lane keeps under its limit, so the pool never queues
+        self._executor = ThreadPoolExecutor(
+            max_workers=BLOCKING_WORKERS + COMMAND_WORKERS, thread_name_prefix="task-runner"
+        )
+        self._job_ids = itertools.count(1)
+
+    # --- Leaf operations ---
+
+    def spawn(self, argv, check=True, capture=True, input=None, timeout=None):
+        """
+        Run `argv` (no shell) as the desktop user. Resolves to a
+        CompletedProcess; fails with CalledProcessError if `check` is set and
+        it exits non-zero, or TimeoutExpired after `timeout` seconds.
+        Without `capture`, its output goes to our terminal. It runs in a
+        process group of its own, which cancel() takes down.
+        """
+        operation = Operation(" ".join(argv))
+        self._submit(self._spawn_lane, operation, lambda: self._start_subprocess(
+            operation, list(argv), check, capture, input, timeout))
+        return operation
+
+    def run_privileged(self, argv, check=True, capture=False, timeout=None,
+                       interruptible=False, lock=None):
+        """
+        Run `argv` as root through the privileged helper. Only an
+        `interruptible` command is stopped by cancel(); `lock` is the lock
+        file it holds, released if it gets stopped.
+        """
+        helper = get_privileged_helper()
+        if not interruptible:
+            return self._call_blocking(
+                self._command_lane, None,
+                helper.run, argv, check=check, capture=capture, timeout=timeout, lock=lock
+            )
+        job = f"task-{next(self._job_ids)}"
+        operation = None
+
+        def interrupt():
+            def try_cancel():
+                # Until the worker thread has handed the command to the
+                # helper, there is no job to cancel yet
+                return not operation.done() and not helper.cancel(job)
+            if try_cancel():
+                GLib.timeout_add(CANCEL_RETRY_MS, try_cancel)
+            return True
+
+        operation = self._call_blocking(
+            self._command_lane, interrupt,
+            helper.run, argv, check=check, capture=capture, timeout=timeout, job=job, lock=lock
+        )
+        return operation
+
+    def call_blocking(self, function, *args, **kwargs):
+        """Run a blocking `function` on a worker thread; resolves to its return value."""
+        return self._call_blocking(self._blocking_lane, None, function, *args, **kwargs)
+
+    def pacman_sync(self, packages, overwrite=None):
+        """
+        Steps installing `packages` with `pacman -Sy`, for `yield from`
+        inside a task. The refresh and download can be cancelled; the
+        transaction only starts once everything is downloaded, and a
+        cancel during it waits for it to finish.
+        """
+        options = ["--noconfirm"]
+        if overwrite is not None:
+            options += ["--overwrite", overwrite]
+        yield self.run_privileged(["pacman", "-Syw", "--noconfirm", *packages],
+                                  interruptible=True, lock=PACMAN_LOCK_PATH)
+        return (yield self.run_privileged(["pacman", "-S", *options, *packages],
+                                          lock=PACMAN_LOCK_PATH))
+
+    # --- Tasks ---
+
+    def run_task(self, steps, description="task"):
+        """
+        Drive the generator `steps` on the main loop until it returns. Each
+        Operation it yields is awaited; its result is sent back in, or its
+        exception thrown in. The returned Operation resolves to the
+        generator's return value.
+        """
+        task = Operation(description)
+        state = {"current": None, "cancel_delivered": False}
+
+        def advance(value=None, error=None):
+            try:
+                if error is not None:
+                    operation = steps.throw(error)
+                else:
+                    operation = steps.send(value)
+            except StopIteration as stop:
+                task._finish(result=stop.value)
+                return
+            except Cancelled as e:
+                print(f"{description} cancelled")
+                task._finish(exception=e)
+                return
+            except Exception as e:
+                print(f"ERROR: {description} failed: {e}")
+                task._finish(exception=e)
+                return
+            state["current"] = operation
+            operation.add_done_callback(resume)
+
+        def resume(operation):
+            state["current"] = None
+            if task._cancel_requested and not state["cancel_delivered"]:
+                # Safe point: stop here whatever the step returned. Steps the
+                # generator yields while cleaning up run normally.
+                state["cancel_delivered"] = True
+                advance(error=Cancelled(description))
+            elif operation.exception() is not None:
+                advance(error=operation.exception())
+            else:
+                advance(operation.result())
+
+        def cancel():
+            if state["current"] is not None:
+                state["current"].cancel()
+            return True
+
+        task._on_cancel = cancel
+        advance()
+        return task
+
+    # --- Internals ---
+
+    def _call_blocking(self, lane, interrupt, function, *args, **kwargs):
+        operation = Operation(getattr(function, "__name__", "call"))
+
+        def start():
+            future = self._executor.submit(function, *args, **kwargs)
+            future.add_done_callback(
+                lambda future: GLib.idle_add(self._finish_blocking, operation, future)
+            )
+
+        self._submit(lane, operation, start, interrupt)
+        return operation
+
+    def _submit(self, lane, operation, start, interrupt=None):
+        """`interrupt()` stops the started operation; without it only a queued one can be."""
+        if lane.running < lane.limit:
+            self._start(lane, operation, start, interrupt)
+        else:
+            lane.queue.append((operation, start, interrupt))
+            operation._on_cancel = lambda: self._drop_queued(lane, operation)
+
+    def _drop_queued(self, lane, operation):
+        lane.queue = deque(entry for entry in lane.queue if entry[0] is not operation)
+        operation._finish(exception=Cancelled(operation.description))
+        return True
+
+    def _start(self, lane, operation, start, interrupt):
+        lane.running += 1
+        operation._on_cancel = interrupt
+        operation._callbacks.insert(0, lambda operation: self._on_operation_done(lane))
+        try:
+            start()
+        except Exception as e:
+            operation._finish(exception=e)
+
+    def _on_operation_done(self, lane):
+        lane.running -= 1
+        if lane.queue and lane.running < lane.limit:
+            self._start(lane, *lane.queue.popleft())
+
+    def _finish_blocking(self, operation, future):
+        exception = future.exception()
+        if operation._cancel_requested:
+            operation._finish(exception=Cancelled(operation.description))
+        elif exception is not None:
+            operation._finish(exception=exception)
+        else:
+            operation._finish(result=future.result())
+        return False
+
+    def _start_subprocess(self, operation, argv, check, capture, input, timeout):
+        import subprocess
+        flags = Gio.SubprocessFlags.NONE
+        if capture:
+            flags |= Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE
+        if input is not None:
+            flags |= Gio.SubprocessFlags.STDIN_PIPE
+
+        try:
+            # setsid execs the program as leader of a new process group
+            process = Gio.Subprocess.new(["setsid", *argv], flags)
+        except GLib.Error as e:
+            operation._finish(exception=OSError(e.message))
+            return
+        pgid = int(process.get_identifier())
+
+        state = {"timed_out": False, "timeout_id": None, "stop_id": None}
+
+        def stop(signals=STOP_SIGNALS):
+            # One signal to the group per CANCEL_GRACE seconds until it is gone
+            state["stop_id"] = None
+            try:
+                os.killpg(pgid, signals[0])
+            except ProcessLookupError:
+                return False
+            if len(signals) > 1:
+                state["stop_id"] = GLib.timeout_add_seconds(CANCEL_GRACE, stop, signals[1:])
+            return False
+
+        def interrupt():
+            stop()
+            return True
+
+        if timeout is not None:
+            def on_timeout():
+                state["timed_out"] = True
+                state["timeout_id"] = None
+                stop()
+                return False
+            state["timeout_id"] = GLib.timeout_add(int(timeout * 1000), on_timeout)
+        operation._on_cancel = interrupt
+
+        def on_communicated(process, result):
+            for source in ("timeout_id", "stop_id"):
+                if state[source] is not None:
+                    GLib.source_remove(state[source])
+            try:
+                _ok, stdout, stderr = process.communicate_utf8_finish(result)
+            except GLib.Error as e:
+                operation._finish(exception=OSError(e.message))
+                return
+
+            if state["timed_out"] or operation._cancel_requested:
+                # Children that outlived the group leader
+                try:
+                    os.killpg(pgid, STOP_SIGNALS[-1])
+                except ProcessLookupError:
+                    pass
+            if operation._cancel_requested:
+                operation._finish(exception=Cancelled(operation.description))
+                return
+            if state["timed_out"]:
+                operation._finish(exception=subprocess.TimeoutExpired(argv, timeout, stdout, stderr))
+                return
+            if process.get_if_exited():
+                returncode = process.get_exit_status()
+            else:
+                returncode = -process.get_term_sig()
+            if check and returncode != 0:
+                operation._finish(exception=subprocess.CalledProcessError(
+                    returncode, argv, stdout, stderr))
+            else:
+                operation._finish(result=subprocess.CompletedProcess(
+                    argv, returncode, stdout, stderr))
+
+        process.communicate_utf8_async(input, None, on_communicated)
+
+
+_runner_instance = None
+
+
+def get_task_runner():
+    global _runner_instance
+    if _runner_instance is None:
+        _runner_instance = TaskRunner()
+    return _runner_instance
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Compact binary translation catalogs.
+
+The translations/<locale>.py dicts are compiled at build time into one
+<locale>.catalog file each: an open-addressing hash table of fixed-size
+slots followed by a pool of UTF-8 strings. At runtime the file is mmapped
+and a lookup hashes the key, probes a few slots and decodes only the one
+value it returns, so no locale is ever materialized as Python objects.
+
+Regional variants listed in LOCALE_PARENTS are translated only where they
+differ from their parent locale. They are compiled flattened: the catalog
+holds the parent's strings with the variant's own laid over them, so a
+lookup in any locale probes one catalog.
+
+Layout (little endian):
+
+    header  magic (8s) | entry count (I) | slot count (I, power of two)
+    slots   key hash (I) | key offset (I) | key length (I)
+            | value offset (I) | value length (I)
+    pool    UTF-8 strings, identical strings stored once
+
+Empty slots have a key offset of EMPTY_SLOT. Keys are hashed with CRC-32
+and collisions are resolved by linear probing.
+
+The catalogs are build artifacts: when one is missing the localization
+manager imports the .py module instead. Rebuild them after editing a
+translation with:
+
+    python translation_catalog.py translations/
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"LXCAT\x00\x00\x03"
+CATALOG_SUFFIX = ".catalog"
+HEADER = struct.Struct("<8sII")
+SLOT = struct.Struct("<IIIII")
+EMPTY_SLOT = 0xFFFFFFFF
+
+# Regional locales that inherit every string they do not translate
+LOCALE_PARENTS = {
+    "en_GB": "en_US",
+    "en_AU": "en_US",
+    "en_CA": "en_US",
+    "pt_PT": "pt_BR",
+}
+
+
+def catalog_path(translations_dir, lang_code):
+    return os.path.join(translations_dir, lang_code + CATALOG_SUFFIX)
+
+
+class TranslationCatalog:
+    """Read-only mapping of English keys to translations backed by mmap."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, slot_count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or slot_count & (slot_count - 1):
+            self._mm.close()
+            raise ValueError(f"{path} is not a translation catalog")
+        self._mask = slot_count - 1
+        self.path = path
+
+    def get(self, key, default=None):
+        data = key.encode("utf-8")
+        key_hash = zlib.crc32(data)
+        mm = self._mm
+        index = key_hash & self._mask
+        while True:
+            slot_hash, key_offset, key_length, value_offset, value_length = \
+                SLOT.unpack_from(mm, HEADER.size + index * SLOT.size)
+            if key_offset == EMPTY_SLOT:
+                return default
+            if (slot_hash == key_hash and key_length == len(data)
+                    and mm[key_offset:key_offset + key_length] == data):
+                return mm[value_offset:value_offset + value_length].decode("utf-8")
+            index = (index + 1) & self._mask
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self._count
+
+    def items(self):
+        """Yield every (key, value) pair; decodes the whole catalog."""
+        mm = self._mm
+        for index in range(self._mask + 1):
+            _, key_offset, key_length, value_offset, value_length = \
+                SLOT.unpack_from(mm, HEADER.size + index * SLOT.size)
+            if key_offset != EMPTY_SLOT:
+                yield (mm[key_offset:key_offset + key_length].decode("utf-8"),
+                       mm[value_offset:value_offset + value_length].decode("utf-8"))
+
+    def close(self):
+        self._mm.close()
+
+
+# --- Build step ---
+
+def build_catalog(translations):
+    """Return the catalog bytes for a {key: value} dict."""
+    # Keep the load factor at or below one half so probes stay short
+    slot_count = 8
+    while slot_count < len(translations) * 2:
+        slot_count *= 2
+    mask = slot_count - 1
+
+    pool = bytearray()
+    pool_start = HEADER.size + slot_count * SLOT.size
+    offsets = {}
+
+    def intern_string(text):
+        data = text.encode("utf-8")
+        if data not in offsets:
+            offsets[data] = pool_start + len(pool)
+            pool.extend(data)
+        return offsets[data], len(data)
+
+    slots = [None] * slot_count
+    for key, value in translations.items():
+        if not key or not isinstance(key, str) or not isinstance(value, str):
+            continue
+        key_hash = zlib.crc32(key.encode("utf-8"))
+        index = key_hash & mask
+        while slots[index] is not None:
+            index = (index + 1) & mask
+        slots[index] = (key_hash, *intern_string(key), *intern_string(value))
+
+    out = bytearray(HEADER.pack(MAGIC, sum(s is not None for s in slots), slot_count))
+    for slot in slots:
+        out += SLOT.pack(*(slot or (0, EMPTY_SLOT, 0, 0, 0)))
+    out += pool
+    return bytes(out)
+
+
+def compile_directory(translations_dir):
+    """
+    Compile every translations/<locale>.py next to itself, regional
+    variants merged over their parent.
+    """
+    import runpy
+
+    sources = {}
+    for name in sorted(os.listdir(translations_dir)):
+        if not name.endswith(".py") or name.startswith("__"):
+            continue
+        translations = runpy.run_path(os.path.join(translations_dir, name)).get("translations")
+        if isinstance(translations, dict):
+            sources[name[:-3]] = translations
+
+    def effective(lang_code):
+        """Everything a locale resolves, including what it inherits."""
+        parent = LOCALE_PARENTS.get(lang_code)
+        merged = dict(effective(parent)) if parent in sources else {}
+        merged.update(sources[lang_code])
+        return merged
+
+    for lang_code in sources:
+        translations = effective(lang_code)
+
+        target = catalog_path(translations_dir, lang_code)
+        data = build_catalog(translations)
+        # Write and rename so a running upgrader never maps a partial file
+        with open(target + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(target + ".tmp", target)
+        parent = LOCALE_PARENTS.get(lang_code)
+        inherited = f", merged over {parent}" if parent in sources else ""
+        print(f"Compiled {lang_code}.py -> {os.path.basename(target)} "
+              f"({len(translations)} strings{inherited}, {len(data)} bytes)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(f"Usage: {sys.argv[0]} TRANSLATIONS_DIR")
+    compile_directory(sys.argv[1])
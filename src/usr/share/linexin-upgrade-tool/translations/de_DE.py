@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Systemaktualisierung läuft",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater aktualisiert derzeit Ihr System. Bitte warten Sie, bis die Aktualisierung abgeschlossen ist, bevor Sie neu starten.",
+
+    # Connectivity Check
+    "Checking connection...": "Verbindung wird geprüft...",
+    "Requires Internet": "Internet erforderlich",
+
+    # Cancelling Installations
+    "Cancelling...": "Wird abgebrochen...",
+    "Cancel Installation": "Installation abbrechen",
+    "Installation Cancelled": "Installation abgebrochen",
+    "The installation was cancelled.": "Die Installation wurde abgebrochen.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Separate Symbole nicht angewendet",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Ihre Linexin-Apps bleiben im Linexin Center gruppiert. Gehen Sie zurück und wählen Sie erneut Separate App-Symbole, um es noch einmal zu versuchen.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Das Passwort konnte nicht überprüft werden: ",
 }
@@ -140,4 +140,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "System Update in Progress",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.",
-}
\ No newline at end of file
+
+    # Connectivity Check
+    "Checking connection...": "Checking connection...",
+    "Requires Internet": "Requires Internet",
+
+    # Cancelling Installations
+    "Cancelling...": "Cancelling...",
+    "Cancel Installation": "Cancel Installation",
+    "Installation Cancelled": "Installation Cancelled",
+    "The installation was cancelled.": "The installation was cancelled.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Separate Icons Not Applied",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Could not check the password: ",
+}
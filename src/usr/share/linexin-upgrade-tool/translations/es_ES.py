@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Actualización del sistema en curso",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater está actualizando su sistema. Por favor, espere a que la actualización termine antes de reiniciar.",
+
+    # Connectivity Check
+    "Checking connection...": "Comprobando la conexión...",
+    "Requires Internet": "Requiere Internet",
+
+    # Cancelling Installations
+    "Cancelling...": "Cancelando...",
+    "Cancel Installation": "Cancelar instalación",
+    "Installation Cancelled": "Instalación cancelada",
+    "The installation was cancelled.": "La instalación se ha cancelado.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Iconos separados no aplicados",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Tus aplicaciones de Linexin siguen agrupadas en Linexin Center. Vuelve atrás y elige de nuevo Iconos de apps separados para reintentarlo.",
+
+    # Authentication Errors
+    "Could not check the password: ": "No se pudo comprobar la contraseña: ",
 }
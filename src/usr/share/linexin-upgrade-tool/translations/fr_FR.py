@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Mise à jour du système en cours",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater met actuellement à jour votre système. Veuillez attendre la fin de la mise à jour avant de redémarrer.",
+
+    # Connectivity Check
+    "Checking connection...": "Vérification de la connexion...",
+    "Requires Internet": "Internet requis",
+
+    # Cancelling Installations
+    "Cancelling...": "Annulation...",
+    "Cancel Installation": "Annuler l'installation",
+    "Installation Cancelled": "Installation annulée",
+    "The installation was cancelled.": "L'installation a été annulée.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Icônes séparées non appliquées",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Vos applications Linexin restent regroupées dans Linexin Center. Revenez en arrière et choisissez à nouveau Icônes d'apps séparées pour réessayer.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Impossible de vérifier le mot de passe : ",
 }
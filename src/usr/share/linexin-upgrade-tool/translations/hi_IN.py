@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "सिस्टम अपडेट प्रगति पर है",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater वर्तमान में आपके सिस्टम को अपडेट कर रहा है। कृपया पुनरारंभ करने से पहले अपडेट समाप्त होने की प्रतीक्षा करें।",
+
+    # Connectivity Check
+    "Checking connection...": "कनेक्शन की जाँच हो रही है...",
+    "Requires Internet": "इंटरनेट आवश्यक है",
+
+    # Cancelling Installations
+    "Cancelling...": "रद्द किया जा रहा है...",
+    "Cancel Installation": "इंस्टॉलेशन रद्द करें",
+    "Installation Cancelled": "इंस्टॉलेशन रद्द किया गया",
+    "The installation was cancelled.": "इंस्टॉलेशन रद्द कर दिया गया।",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "अलग आइकन लागू नहीं किए गए",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "आपके Linexin ऐप्स Linexin Center में समूहित रहेंगे। फिर से प्रयास करने के लिए वापस जाएँ और अलग ऐप्स आइकन दोबारा चुनें।",
+
+    # Authentication Errors
+    "Could not check the password: ": "पासवर्ड की जाँच नहीं की जा सकी: ",
 }
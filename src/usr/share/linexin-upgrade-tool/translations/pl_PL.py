@@ -135,4 +135,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Aktualizacja systemu w toku",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater aktualnie aktualizuje Twój system. Poczekaj na zakończenie aktualizacji przed ponownym uruchomieniem.",
+
+    # Connectivity Check
+    "Checking connection...": "Sprawdzanie połączenia...",
+    "Requires Internet": "Wymaga Internetu",
+
+    # Cancelling Installations
+    "Cancelling...": "Anulowanie...",
+    "Cancel Installation": "Anuluj instalację",
+    "Installation Cancelled": "Instalacja anulowana",
+    "The installation was cancelled.": "Instalacja została anulowana.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Nie zastosowano oddzielnych ikon",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Twoje aplikacje Linexin pozostają zgrupowane w Linexin Center. Wróć i ponownie wybierz Osobne ikony aplikacji, aby spróbować jeszcze raz.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Nie udało się sprawdzić hasła: ",
 }
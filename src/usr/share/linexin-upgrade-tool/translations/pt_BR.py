@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Atualização do Sistema em Andamento",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "O Linexin Updater está atualizando seu sistema. Por favor, aguarde a atualização terminar antes de reiniciar.",
+
+    # Connectivity Check
+    "Checking connection...": "Verificando a conexão...",
+    "Requires Internet": "Requer Internet",
+
+    # Cancelling Installations
+    "Cancelling...": "Cancelando...",
+    "Cancel Installation": "Cancelar instalação",
+    "Installation Cancelled": "Instalação cancelada",
+    "The installation was cancelled.": "A instalação foi cancelada.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Ícones separados não aplicados",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Seus aplicativos Linexin continuam agrupados no Linexin Center. Volte e escolha novamente Ícones de apps separados para tentar de novo.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Não foi possível verificar a senha: ",
 }
@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Atualização do Sistema em Curso",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "O Linexin Updater está a atualizar o seu sistema. Por favor, aguarde que a atualização termine antes de reiniciar.",
+
+    # Connectivity Check
+    "Checking connection...": "A verificar a ligação...",
+    "Requires Internet": "Requer Internet",
+
+    # Cancelling Installations
+    "Cancelling...": "A cancelar...",
+    "Cancel Installation": "Cancelar instalação",
+    "Installation Cancelled": "Instalação cancelada",
+    "The installation was cancelled.": "A instalação foi cancelada.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Ícones separados não aplicados",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "As suas aplicações Linexin continuam agrupadas no Linexin Center. Volte atrás e escolha novamente Ícones de apps separados para tentar de novo.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Não foi possível verificar a palavra-passe: ",
 }
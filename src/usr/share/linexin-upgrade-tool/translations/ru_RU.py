@@ -137,4 +137,21 @@ translations = {
     # Reboot Prevention
     "System Update in Progress": "Обновление системы выполняется",
     "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater в настоящее время обновляет вашу систему. Пожалуйста, дождитесь завершения обновления перед перезагрузкой.",
+
+    # Connectivity Check
+    "Checking connection...": "Проверка подключения...",
+    "Requires Internet": "Требуется Интернет",
+
+    # Cancelling Installations
+    "Cancelling...": "Отмена...",
+    "Cancel Installation": "Отменить установку",
+    "Installation Cancelled": "Установка отменена",
+    "The installation was cancelled.": "Установка была отменена.",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "Отдельные значки не применены",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "Ваши приложения Linexin остаются сгруппированными в Linexin Center. Вернитесь назад и снова выберите «Отдельные значки приложений», чтобы повторить попытку.",
+
+    # Authentication Errors
+    "Could not check the password: ": "Не удалось проверить пароль: ",
 }
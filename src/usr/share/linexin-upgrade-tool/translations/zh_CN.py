@@ -135,4 +135,22 @@ translations = {
     "Linexin LiveCD now uses a beautifully themed GRUB bootloader instead of systemd-boot. No more scary text-based boot menu! The new GRUB menu is visually appealing and provides a more user-friendly experience when selecting your boot options.": "Linexin LiveCD 现在使用瘡丽主题的 GRUB 引导加载程序，而非 systemd-boot。再也不怕文字式启动菜单！新的 GRUB 菜单美观大方，在选择启动选项时提供更友好的体验。",
     # Reboot Prevention
     "System Update in Progress": "系统更新正在进行中",
-    "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater 正在更新您的系统。请等待更新完成后再重新启动。",}
+    "Linexin Updater is currently updating your system. Please wait for the update to finish before restarting.": "Linexin Updater 正在更新您的系统。请等待更新完成后再重新启动。",
+
+    # Connectivity Check
+    "Checking connection...": "正在检查网络连接...",
+    "Requires Internet": "需要网络连接",
+
+    # Cancelling Installations
+    "Cancelling...": "正在取消...",
+    "Cancel Installation": "取消安装",
+    "Installation Cancelled": "安装已取消",
+    "The installation was cancelled.": "安装已被取消。",
+
+    # Separate Apps Icons
+    "Separate Icons Not Applied": "未应用单独图标",
+    "Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.": "您的 Linexin 应用仍归组在 Linexin Center 中。请返回并再次选择“独立应用图标”以重试。",
+
+    # Authentication Errors
+    "Could not check the password: ": "无法验证密码：",
+}
@@ -3,10 +3,7 @@
 
 import gi
 import os
-import gettext
-import locale
 import subprocess
-import threading
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
@@ -14,6 +11,8 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Gdk, GLib
 
 from simple_localization_manager import get_localization_manager, _
+from system_probe import get_system_probe, is_package_installed
+from task_runner import get_task_runner
 
 
 class InstallDefaultsWidget(Gtk.Box):
@@ -65,57 +64,66 @@ class InstallDefaultsWidget(Gtk.Box):
         # Get script directory for icons
         script_dir = os.path.dirname(os.path.abspath(__file__))
         
-        # Define applications with their specific installation commands
+        # Define applications with their specific installation commands (argv, no shell)
         self.applications = [
             {
                 "name": _("Zen Browser"),
                 "description": _("Browse your internet with beautifully designed, privacy-focused app."), 
                 "icon": "icon1.png",
-                "command": "flatpak install app.zen_browser.zen --assumeyes"
+                "command": ["flatpak", "install", "app.zen_browser.zen", "--assumeyes"]
             },
             {
                 "name": _("Gear Lever"),
                 "description": _("Manage AppImages and replace old AppImageLauncher with a modern tool"),
                 "icon": "icon2.png", 
-                "command": "flatpak install it.mijorus.gearlever --assumeyes && run0 pacman -Rsc appimagelauncher --noconfirm 2>/dev/null || true"
+                "command": ["flatpak", "install", "it.mijorus.gearlever", "--assumeyes"],
+                # Only run (and ask for authentication) if AppImageLauncher is installed
+                "cleanup_command": ["run0", "pacman", "-Rsc", "appimagelauncher", "--noconfirm"],
+                "cleanup_package": "appimagelauncher"
             },
             {
                 "name": _("Flatseal"),
                 "description": _("Manage Flatpak permissions with ease. No more pesky terminal commands."),
                 "icon": "icon3.png", 
-                "command": "flatpak install com.github.tchx84.Flatseal --assumeyes"
+                "command": ["flatpak", "install", "com.github.tchx84.Flatseal", "--assumeyes"]
             },
             {
                 "name": _("Bottles"),
                 "description": _("Run Windows software."),
                 "icon": "icon4.png",
-                "command": "flatpak install com.usebottles.bottles --assumeyes"
+                "command": ["flatpak", "install", "com.usebottles.bottles", "--assumeyes"]
             },
             {
                 "name": _("Heroic Launcher"), 
                 "description": _("Play Epic, GOG and Amazon Games"),
                 "icon": "icon5.png",
-                "command": "flatpak install com.heroicgameslauncher.hgl --assumeyes"
+                "command": ["flatpak", "install", "com.heroicgameslauncher.hgl", "--assumeyes"]
             },
             {
                 "name": _("Faugus Launcher"),
                 "description": _("Play your games with a simple and lightweight app."), 
                 "icon": "icon6.png",
-                "command": "flatpak install io.github.Faugus.faugus-launcher --assumeyes"
+                "command": ["flatpak", "install", "io.github.Faugus.faugus-launcher", "--assumeyes"]
             },
             {
                 "name": _("Twintail Launcher"),
                 "description": _("Run morally questionable anime games on Linexin."), 
                 "icon": "icon7.png",
-                "command": "flatpak install app.twintaillauncher.ttl --assumeyes"
+                "command": ["flatpak", "install", "app.twintaillauncher.ttl", "--assumeyes"]
             }
         ]
         
         self.install_buttons = []
         
+        # Installing needs internet; the buttons follow the SystemProbe live
+        probe = get_system_probe()
+        self.internet_checked = probe.is_ready("has-internet")
+        self.has_internet = probe.has_internet
+        probe.connect("notify::has-internet", self._on_internet_changed)
+        
         # Create app boxes
         for i, app in enumerate(self.applications):
-            print(f"DEBUG: Creating {app['name']} with command: {app['command']}")
+            print(f"DEBUG: Creating {app['name']} with command: {' '.join(app['command'])}")
             
             app_box = self.create_application_box(app, i, script_dir)
             self.append(app_box)
@@ -241,9 +249,12 @@ class InstallDefaultsWidget(Gtk.Box):
         
         # Store the command directly with the button for debugging
         install_btn.install_command = app["command"]
+        install_btn.cleanup_command = app.get("cleanup_command")
+        install_btn.cleanup_package = app.get("cleanup_package")
         install_btn.app_name = app["name"]
+        install_btn.install_state = "idle"
         
-        print(f"DEBUG: Button for {app['name']} will run: {app['command']}")
+        print(f"DEBUG: Button for {app['name']} will run: {' '.join(app['command'])}")
         
         # Connect the click event
         install_btn.connect("clicked", self.on_install_button_clicked)
@@ -256,54 +267,80 @@ class InstallDefaultsWidget(Gtk.Box):
         
         box.append(install_btn)
         self.install_buttons.append(install_btn)
+        self._apply_button_state(install_btn)
         
         return box
     
+    def _on_internet_changed(self, probe, param):
+        """Enable or disable the install buttons as connectivity changes."""
+        self.internet_checked = True
+        self.has_internet = probe.has_internet
+        print(f"DEBUG: Internet connection status: {self.has_internet}")
+        for button in self.install_buttons:
+            self._apply_button_state(button)
+    
+    def _apply_button_state(self, button):
+        """
+        Only idle or failed buttons can be clicked, and only when online.
+        While the connectivity check is still running they stay enabled, as
+        we are most likely online, and say so in their tooltip; an install
+        started offline just fails and can be retried.
+        """
+        if button.install_state in ("installing", "installed"):
+            return
+        if not self.internet_checked:
+            button.set_sensitive(True)
+            button.set_tooltip_text(_("Checking connection..."))
+            return
+        button.set_sensitive(self.has_internet)
+        button.set_tooltip_text(None if self.has_internet else _("Requires Internet"))
+    
     def on_install_button_clicked(self, button):
         """Handle install button clicks"""
         print(f"DEBUG: Installing {button.app_name}")
-        print(f"DEBUG: Running command: {button.install_command}")
+        print(f"DEBUG: Running command: {' '.join(button.install_command)}")
         
+        button.install_state = "installing"
         button.set_label(_("Installing..."))
         button.set_sensitive(False)
         
-        def run_installation():
-            try:
-                # Run the specific command for this app
-                result = subprocess.run(
-                    button.install_command, 
-                    shell=True, 
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
-                print(f"DEBUG: Installation of {button.app_name} completed successfully")
-                print(f"DEBUG: Output: {result.stdout}")
-                GLib.idle_add(self.installation_complete, button, True)
-                
-            except subprocess.CalledProcessError as e:
-                print(f"DEBUG: Installation of {button.app_name} failed")
-                print(f"DEBUG: Error: {e.stderr}")
-                GLib.idle_add(self.installation_complete, button, False)
-                
-            except Exception as e:
-                print(f"DEBUG: Unexpected error installing {button.app_name}: {e}")
-                GLib.idle_add(self.installation_complete, button, False)
-        
-        # Run installation in background thread
-        thread = threading.Thread(target=run_installation, daemon=True)
-        thread.start()
+        # Runs on the main loop; queued if other installs are still going
+        get_task_runner().run_task(self._install_app(button), f"Installing {button.app_name}")
+    
+    def _install_app(self, button):
+        """Install steps for one app, driven by the task runner"""
+        runner = get_task_runner()
+        try:
+            # Run the specific command for this app
+            result = yield runner.spawn(button.install_command)
+            if button.cleanup_command and (button.cleanup_package is None
+                                           or is_package_installed(button.cleanup_package)):
+                yield runner.spawn(button.cleanup_command, check=False)
+            print(f"DEBUG: Installation of {button.app_name} completed successfully")
+            print(f"DEBUG: Output: {result.stdout}")
+            self.installation_complete(button, True)
+            
+        except subprocess.CalledProcessError as e:
+            print(f"DEBUG: Installation of {button.app_name} failed")
+            print(f"DEBUG: Error: {e.stderr}")
+            self.installation_complete(button, False)
+            
+        except Exception as e:
+            print(f"DEBUG: Unexpected error installing {button.app_name}: {e}")
+            self.installation_complete(button, False)
     
     def installation_complete(self, button, success):
         """Called when installation completes"""
         if success:
+            button.install_state = "installed"
             button.set_label(_("Installed"))
             button.add_css_class("success_button")
             print(f"DEBUG: {button.app_name} installation marked as successful")
         else:
+            button.install_state = "failed"
             button.set_label(_("Failed"))
             button.add_css_class("error_button")
-            button.set_sensitive(True)
+            self._apply_button_state(button)
             print(f"DEBUG: {button.app_name} installation marked as failed")
     
     def on_continue_clicked(self, button):
@@ -467,6 +504,8 @@ if __name__ == "__main__":
             self.connect('activate', self.on_activate)
 
         def on_activate(self, app):
+            get_system_probe().start()
+            
             # Create window
             self.win = Adw.ApplicationWindow(application=app)
             self.win.set_title("Test - Install Defaults Widget")
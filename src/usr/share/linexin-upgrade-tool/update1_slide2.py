@@ -3,8 +3,6 @@
 
 import gi
 import os
-import gettext
-import locale
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
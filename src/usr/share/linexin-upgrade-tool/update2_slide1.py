@@ -3,10 +3,7 @@
 
 import gi
 import os
-import gettext
-import locale
-import socket
-import urllib.request
+import stat
 import subprocess
 
 gi.require_version("Gtk", "4.0")
@@ -15,6 +12,10 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Gdk, GLib
 
 from simple_localization_manager import get_localization_manager, _
+from system_probe import get_system_probe, is_package_installed
+from privileged_helper import HelperError
+from auth_session import get_auth_session
+from task_runner import get_task_runner, Cancelled
 
 
 class DEPicker(Gtk.Box):
@@ -35,13 +36,17 @@ class DEPicker(Gtk.Box):
         self.on_continue_callback = on_continue_callback
         self.selected_option = 0  # Default to first box
         self.animation_played = False  
+        self.update_task = None  # Package changes running behind the progress dialog
         
         # Auto-register for translation updates
         get_localization_manager().register_widget(self)
         
-        # Check internet connectivity
-        self.has_internet = self.check_internet_connection()
-        print(f"DEBUG: Internet connection status: {self.has_internet}")
+        # Internet connectivity comes from the SystemProbe; the option cards
+        # follow it live through notify::has-internet
+        probe = get_system_probe()
+        self.internet_checked = probe.is_ready("has-internet")
+        self.has_internet = probe.has_internet
+        probe.connect("notify::has-internet", self._on_internet_changed)
         
         # Basic widget setup - reduced margins and spacing
         self.set_orientation(Gtk.Orientation.VERTICAL)
@@ -148,47 +153,68 @@ class DEPicker(Gtk.Box):
         
         print("DEBUG: Two box selection widget initialization complete")
 
-    # ... [Rest of the file remains exactly the same] ...
-    
-    def check_internet_connection(self):
-        """Check if internet connection is available"""
-        # Try multiple methods to check connectivity
+    def _on_internet_changed(self, probe, param):
+        """Enable or disable the options that need internet."""
+        self.internet_checked = True
+        self.has_internet = probe.has_internet
+        print(f"DEBUG: Internet connection status: {self.has_internet}")
+        for box in self.option_boxes:
+            self._apply_option_state(box)
         
-        # Method 1: Check if we can resolve a DNS name
-        try:
-            socket.create_connection(("8.8.8.8", 53), timeout=3)
-            print("DEBUG: Internet check via DNS succeeded")
-            return True
-        except (socket.error, socket.timeout):
-            print("DEBUG: Internet check via DNS failed")
+        # Fall back to the first option if the selected one became unavailable
+        if self.option_boxes[self.selected_option].is_disabled:
+            self.selected_option = 0
+        self.update_selection(self.selected_option)
+    
+    def _apply_option_state(self, main_box):
+        """
+        Apply the disabled look to an option box that needs internet we lack.
+        While the connectivity check is still running the box stays disabled
+        and its notice shows a spinner instead of the warning.
+        """
+        option = self.options[main_box.option_index]
+        requires_internet = option.get("requires_internet", False)
+        is_pending = requires_internet and not self.internet_checked
+        is_disabled = requires_internet and not self.has_internet
+        main_box.is_disabled = is_disabled
         
-        # Method 2: Try to open a connection to a reliable host
-        try:
-            urllib.request.urlopen('http://clients3.google.com/generate_204', timeout=3)
-            print("DEBUG: Internet check via HTTP succeeded")
-            return True
-        except:
-            print("DEBUG: Internet check via HTTP failed")
+        main_box.set_sensitive(not is_disabled)
+        main_box.notice_box.set_visible(is_disabled)
+        main_box.warning_icon.set_visible(not is_pending)
+        main_box.pending_spinner.set_visible(is_pending)
+        main_box.pending_spinner.set_spinning(is_pending)
+        notice_text = _("Checking connection...") if is_pending else _("Requires Internet")
+        main_box.notice_label.set_markup(f'<span size="small" weight="bold">{notice_text}</span>')
+        if is_disabled:
+            main_box.add_css_class("disabled")
+            main_box.remove_css_class("selected")
+            main_box.remove_css_class("unselected")
+        else:
+            main_box.remove_css_class("disabled")
         
-        print("DEBUG: No internet connection detected")
-        return False
+        for widget in main_box.icon_widgets:
+            if is_disabled:
+                widget.add_css_class("disabled_icon")
+            else:
+                widget.remove_css_class("disabled_icon")
+        for widget in main_box.text_widgets:
+            if is_disabled:
+                widget.add_css_class("disabled_text")
+            else:
+                widget.remove_css_class("disabled_text")
     
     def create_option_box(self, option, index, script_dir):
         """Create a single selectable option box with smaller image"""
         
-        # Check if this option requires internet and we don't have it
-        is_disabled = option.get("requires_internet", False) and not self.has_internet
-        
         # Main container - smaller dimensions
         main_box = Gtk.Button()
         main_box.add_css_class("option_box")
         main_box.set_size_request(240, 320)
+        main_box.connect("clicked", lambda btn, idx=index: self.on_option_selected(idx))
         
-        if is_disabled:
-            main_box.add_css_class("disabled")
-            main_box.set_sensitive(False)
-        else:
-            main_box.connect("clicked", lambda btn, idx=index: self.on_option_selected(idx))
+        # Widgets that change look when the option becomes unavailable
+        icon_widgets = []
+        text_widgets = []
         
         # Content container - reduced spacing
         content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
@@ -220,8 +246,7 @@ class DEPicker(Gtk.Box):
                     icon.set_content_fit(Gtk.ContentFit.CONTAIN)
                     icon.set_size_request(210, 210)
                     icon.add_css_class("option_icon_image")
-                    if is_disabled:
-                        icon.add_css_class("disabled_icon")
+                    icon_widgets.append(icon)
                     icon_container.append(icon)
                     icon_loaded = True
                     print(f"DEBUG: Loaded icon for {option['name']}: {path}")
@@ -236,8 +261,7 @@ class DEPicker(Gtk.Box):
             fallback = Gtk.Box()
             fallback.set_size_request(210, 210)
             fallback.add_css_class("large_fallback_icon")
-            if is_disabled:
-                fallback.add_css_class("disabled_icon")
+            icon_widgets.append(fallback)
             
             # Add some text to the fallback
             fallback_label = Gtk.Label()
@@ -261,8 +285,7 @@ class DEPicker(Gtk.Box):
         name_label.set_halign(Gtk.Align.CENTER)
         name_label.set_wrap(True)
         name_label.set_justify(Gtk.Justification.CENTER)
-        if is_disabled:
-            name_label.add_css_class("disabled_text")
+        text_widgets.append(name_label)
         content_box.append(name_label)
         
         # Option description - smaller font
@@ -272,33 +295,40 @@ class DEPicker(Gtk.Box):
         desc_label.set_wrap(True)
         desc_label.set_justify(Gtk.Justification.CENTER)
         desc_label.add_css_class("option_description")
-        if is_disabled:
-            desc_label.add_css_class("disabled_text")
+        text_widgets.append(desc_label)
         content_box.append(desc_label)
         
-        # Add internet requirement notice if disabled
-        if is_disabled:
-            notice_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
-            notice_box.set_halign(Gtk.Align.CENTER)
-            notice_box.set_margin_top(5)
-            
-            # Warning icon
-            warning_icon = Gtk.Label()
-            warning_icon.set_text("⚠️")
-            notice_box.append(warning_icon)
-            
-            notice_label = Gtk.Label()
-            notice_label.set_markup('<span size="small" weight="bold">Requires Internet</span>')
-            notice_label.add_css_class("internet_notice")
-            notice_box.append(notice_label)
-            
-            content_box.append(notice_box)
+        # Internet requirement notice, shown while the option is disabled
+        notice_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=5)
+        notice_box.set_halign(Gtk.Align.CENTER)
+        notice_box.set_margin_top(5)
+        
+        # Warning icon
+        warning_icon = Gtk.Label()
+        warning_icon.set_text("⚠️")
+        notice_box.append(warning_icon)
+        
+        # Spinner shown while the connectivity check is running
+        pending_spinner = Gtk.Spinner()
+        notice_box.append(pending_spinner)
+        
+        notice_label = Gtk.Label()
+        notice_label.add_css_class("internet_notice")
+        notice_box.append(notice_label)
+        
+        content_box.append(notice_box)
         
         main_box.set_child(content_box)
         
-        # Store index for reference
+        # Store index and state widgets for reference
         main_box.option_index = index
-        main_box.is_disabled = is_disabled
+        main_box.notice_box = notice_box
+        main_box.warning_icon = warning_icon
+        main_box.pending_spinner = pending_spinner
+        main_box.notice_label = notice_label
+        main_box.icon_widgets = icon_widgets
+        main_box.text_widgets = text_widgets
+        self._apply_option_state(main_box)
         
         return main_box
     
@@ -332,54 +362,8 @@ class DEPicker(Gtk.Box):
     
     def on_continue_clicked(self, button):
         """Handle continue button click"""
-        # Start the password flow
-        self._prompt_for_password()
-
-    def _prompt_for_password(self):
-        """Creates a dialog to ask for sudo password."""
-        root = self.get_root()
-        pass_dialog = Adw.MessageDialog(
-            transient_for=root,
-            heading=_("Authentication Required"),
-            body=_("Please enter your password to modify system packages.")
-        )
-        
-        # Create a password entry box
-        self.password_entry = Gtk.PasswordEntry()
-        self.password_entry.set_hexpand(True)
-        self.password_entry.connect("activate", lambda entry: pass_dialog.response("continue"))
-        
-        pass_dialog.set_extra_child(self.password_entry)
-        
-        pass_dialog.add_response("cancel", _("Cancel"))
-        pass_dialog.add_response("continue", _("Continue"))
-        pass_dialog.set_default_response("continue")
-        
-        pass_dialog.connect("response", self._on_password_entered)
-        pass_dialog.present()
-
-    def _on_password_entered(self, dialog, response):
-        """Handle password submission."""
-        password = self.password_entry.get_text()
-        dialog.close()
-
-        if response == "continue":
-            if password:
-                if self._validate_password(password):
-                    self._perform_package_changes(password)
-                else:
-                    self._show_error(_("Incorrect password. Please try again."))
-            else:
-                self._show_error(_("Password cannot be empty."))
-
-    def _validate_password(self, password):
-        """Verify password using sudo -v"""
-        try:
-            cmd = f"echo '{password}' | sudo -S -v -k"
-            subprocess.run(cmd, shell=True, check=True, stderr=subprocess.PIPE)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        # Asks for the password only if no earlier page has authenticated
+        get_auth_session().authenticate(self.get_root(), self._perform_package_changes)
 
     def _show_error(self, message):
         """Show error dialog"""
@@ -413,6 +397,9 @@ class DEPicker(Gtk.Box):
         content_box.append(self.status_label)
         
         self.progress_dialog.set_extra_child(content_box)
+        self.progress_dialog.add_response("cancel", _("Cancel"))
+        self.progress_dialog.connect("response", self._on_progress_response)
+        self.progress_dialog.connect("close-request", lambda dialog: self.update_task is not None)
         self.progress_dialog.present()
 
     def _update_progress(self, message):
@@ -420,54 +407,72 @@ class DEPicker(Gtk.Box):
         if hasattr(self, 'status_label'):
             self.status_label.set_label(message)
 
-    def _perform_package_changes(self, password):
+    def _on_progress_response(self, dialog, response):
+        if response == "cancel" and self.update_task is not None:
+            # Stops at the next safe point; the dialog stays up until then
+            self.update_task.cancel()
+            self._update_progress(_("Cancelling..."))
+            dialog.set_response_enabled("cancel", False)
+
+    def _perform_package_changes(self):
         """Remove affinity-installer and install affinity-installer2 and linpama"""
         # Show progress dialog
         self._create_progress_dialog()
         
-        def run_ops():
-            try:
-                # 1. Remove affinity-installer
-                GLib.idle_add(self._update_progress, _("Removing affinity-installer..."))
+        # Runs on the main loop; the privileged steps don't block it
+        self.update_task = get_task_runner().run_task(self._package_changes(), "Package changes")
+
+    def _package_changes(self):
+        """Package steps, driven by the task runner"""
+        runner = get_task_runner()
+        try:
+            # 1. Remove affinity-installer if it is installed; the first
+            # query reads the local DB, so not on the main loop
+            installed = yield runner.call_blocking(is_package_installed, "affinity-installer")
+            if installed:
+                self._update_progress(_("Removing affinity-installer..."))
                 print("DEBUG: Removing affinity-installer...")
-                remove_cmd = f"echo '{password}' | sudo -S pacman -R --noconfirm affinity-installer 2>/dev/null || true"
-                subprocess.run(remove_cmd, shell=True, check=False)
-                
-                # 2. Install new packages
-                GLib.idle_add(self._update_progress, _("Installing affinity-installer2 and linpama..."))
-                print("DEBUG: Installing new packages...")
-                install_cmd = f"echo '{password}' | sudo -S pacman -Sy --noconfirm --overwrite '*' affinity-installer2 linpama"
-                subprocess.run(install_cmd, shell=True, check=True)
-                
-                # 3. Clear sudo cache
-                subprocess.run("sudo -k", shell=True)
-                
-                print("DEBUG: Package operations completed successfully")
-                
-                # Close dialog and continue on main thread
-                GLib.idle_add(self._on_package_ops_success, password)
-                
-            except subprocess.CalledProcessError as e:
-                print(f"ERROR: Package operation failed: {e}")
-                subprocess.run("sudo -k", shell=True)
-                GLib.idle_add(self._on_package_ops_error, str(e))
+                yield runner.run_privileged(["pacman", "-R", "--noconfirm", "affinity-installer"],
+                                            check=False, capture=True)
+            
+            # 2. Install new packages
+            self._update_progress(_("Installing affinity-installer2 and linpama..."))
+            print("DEBUG: Installing new packages...")
+            yield from runner.pacman_sync(["affinity-installer2", "linpama"], overwrite="*")
+            
+            print("DEBUG: Package operations completed successfully")
+            
+            # Close dialog and continue
+            self._on_package_ops_success()
+            
+        except Cancelled:
+            self._on_package_ops_cancelled()
+        except (subprocess.CalledProcessError, HelperError) as e:
+            print(f"ERROR: Package operation failed: {e}")
+            self._on_package_ops_error(str(e))
+        except Exception as e:
+            print(f"ERROR: Unexpected error during package operations: {e}")
+            self._on_package_ops_error(str(e))
 
-        # Run in thread to not block UI
-        import threading
-        thread = threading.Thread(target=run_ops, daemon=True)
-        thread.start()
+    def _on_package_ops_success(self):
+        self.update_task = None
+        if hasattr(self, 'progress_dialog'):
+            self.progress_dialog.close()
+        self._finalize_continue()
 
-    def _on_package_ops_success(self, password):
+    def _on_package_ops_cancelled(self):
+        # Stay on this page so the user can try again
+        self.update_task = None
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
-        self._finalize_continue(password)
 
     def _on_package_ops_error(self, error_message):
+        self.update_task = None
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
         self._show_error(_("Failed to update packages: ") + error_message)
 
-    def _finalize_continue(self, password):
+    def _finalize_continue(self):
         """Original continue logic after successful package changes"""
         selected_option = self.options[self.selected_option]
         print(f"DEBUG: Continue clicked with selection: {selected_option['name']}")
@@ -476,81 +481,30 @@ class DEPicker(Gtk.Box):
         self.write_selection_to_file()
         
         if self.on_continue_callback:
-            # Pass the selected option AND password to the callback
-            self.on_continue_callback(self.selected_option, selected_option, password)
+            self.on_continue_callback(self.selected_option, selected_option)
         else:
             print("DEBUG: No continue callback provided")
     
     def write_selection_to_file(self):
-        """Write the selected option index"""
+        """
+        Write the selected option index. Always as ourselves: /tmp is
+        shared, so a config directory someone else owns is left alone
+        rather than written into as root.
+        """
         config_dir = "/tmp/installer_config"
         config_file = os.path.join(config_dir, "de_selection")
         
         try:
-            # Check if we have write permission to the directory
-            if os.path.exists(config_dir):
-                can_write = os.access(config_dir, os.W_OK)
-            else:
-                # Check if we can write to parent directory
-                can_write = os.access(os.path.dirname(config_dir), os.W_OK)
-            
-            if can_write:
-                # We have permission, write directly
-                os.makedirs(config_dir, exist_ok=True)
-                with open(config_file, 'w') as f:
-                    f.write(str(self.selected_option))
-                print(f"DEBUG: Wrote selection index {self.selected_option} to {config_file}")
-            else:
-                # Need elevated privileges, use pkexec
-                print("DEBUG: Elevated privileges required, using pkexec")
-                self.write_selection_with_pkexec(config_dir, config_file)
-            
-        except Exception as e:
+            os.makedirs(config_dir, exist_ok=True)
+            info = os.lstat(config_dir)
+            if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+                print(f"ERROR: {config_dir} is not ours, not writing the selection")
+                return
+            with open(config_file, 'w') as f:
+                f.write(str(self.selected_option))
+            print(f"DEBUG: Wrote selection index {self.selected_option} to {config_file}")
+        except OSError as e:
             print(f"ERROR: Failed to write selection to file: {e}")
-            # Try with pkexec as fallback
-            try:
-                self.write_selection_with_pkexec(config_dir, config_file)
-            except Exception as e2:
-                print(f"ERROR: Fallback with pkexec also failed: {e2}")
-    
-    def write_selection_with_pkexec(self, config_dir, config_file):
-        """Write selection file using pkexec for elevated privileges"""
-        import subprocess
-        
-        # Create a temporary script to execute with elevated privileges
-        script_content = f"""#!/bin/bash
-mkdir -p "{config_dir}"
-echo "{self.selected_option}" > "{config_file}"
-chmod 644 "{config_file}"
-"""
-        
-        # Write temp script
-        temp_script = "/tmp/de_selection_writer.sh"
-        with open(temp_script, 'w') as f:
-            f.write(script_content)
-        os.chmod(temp_script, 0o755)
-        
-        try:
-            # Execute with pkexec
-            result = subprocess.run(
-                ['pkexec', 'bash', temp_script],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                print(f"DEBUG: Successfully wrote selection index {self.selected_option} to {config_file} using pkexec")
-            else:
-                print(f"ERROR: pkexec failed with return code {result.returncode}")
-                print(f"STDERR: {result.stderr}")
-                raise Exception(f"pkexec failed: {result.stderr}")
-        finally:
-            # Clean up temp script
-            try:
-                os.remove(temp_script)
-            except:
-                pass
     
     def get_selected_option(self):
         """Get the currently selected option"""
@@ -3,10 +3,7 @@
 
 import gi
 import os
-import configparser
-import shutil
 import subprocess
-import threading
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
@@ -14,6 +11,10 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Gdk, GLib
 
 from simple_localization_manager import get_localization_manager, _
+from system_probe import get_system_probe, is_package_installed
+from privileged_helper import HelperError
+from auth_session import get_auth_session
+from task_runner import get_task_runner, Cancelled
 
 
 class ThemePicker(Gtk.Box):
@@ -27,6 +28,7 @@ class ThemePicker(Gtk.Box):
         self.on_continue_callback = on_continue_callback
         self.selected_option = 0  # Default to first box (use new theme)
         self.animation_played = False
+        self.update_task = None  # Update running behind the progress dialog
 
         # Auto-register for translation updates
         get_localization_manager().register_widget(self)
@@ -53,7 +55,7 @@ class ThemePicker(Gtk.Box):
         script_dir = os.path.dirname(os.path.abspath(__file__))
 
         # Choose screenshots based on current desktop environment
-        current_de = os.environ.get("XDG_CURRENT_DESKTOP", "").upper()
+        current_de = get_system_probe().current_desktop
         is_plasma = "KDE" in current_de
         if is_plasma:
             icon1, icon2 = "screen1_update3.png", "screen2_update3.png"
@@ -137,15 +139,11 @@ class ThemePicker(Gtk.Box):
 
     @staticmethod
     def _has_kinexin_desktop():
-        """Check if kinexin-desktop package is installed."""
-        try:
-            result = subprocess.run(
-                ["pacman", "-Q", "kinexin-desktop"],
-                capture_output=True, text=True
-            )
-            return result.returncode == 0
-        except Exception:
-            return False
+        """
+        Check if kinexin-desktop package is installed. Asked live, not from
+        the startup probe: the Kinexin install may have run since then.
+        """
+        return is_package_installed("kinexin-desktop")
 
     # ---- Option box creation ----
 
@@ -237,51 +235,11 @@ class ThemePicker(Gtk.Box):
                 box.add_css_class("unselected")
                 box.remove_css_class("selected")
 
-    # ---- Continue / password flow ----
+    # ---- Continue / authentication ----
 
     def on_continue_clicked(self, button):
-        self._prompt_for_password()
-
-    def _prompt_for_password(self):
-        root = self.get_root()
-        pass_dialog = Adw.MessageDialog(
-            transient_for=root,
-            heading=_("Authentication Required"),
-            body=_("Please enter your password to modify system packages.")
-        )
-
-        self.password_entry = Gtk.PasswordEntry()
-        self.password_entry.set_hexpand(True)
-        self.password_entry.connect("activate", lambda entry: pass_dialog.response("continue"))
-        pass_dialog.set_extra_child(self.password_entry)
-
-        pass_dialog.add_response("cancel", _("Cancel"))
-        pass_dialog.add_response("continue", _("Continue"))
-        pass_dialog.set_default_response("continue")
-
-        pass_dialog.connect("response", self._on_password_entered)
-        pass_dialog.present()
-
-    def _on_password_entered(self, dialog, response):
-        password = self.password_entry.get_text()
-        dialog.close()
-
-        if response == "continue":
-            if password:
-                if self._validate_password(password):
-                    self._perform_update(password)
-                else:
-                    self._show_error(_("Incorrect password. Please try again."))
-            else:
-                self._show_error(_("Password cannot be empty."))
-
-    def _validate_password(self, password):
-        try:
-            cmd = f"echo '{password}' | sudo -S -v -k"
-            subprocess.run(cmd, shell=True, check=True, stderr=subprocess.PIPE)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        # Usually already authenticated on the apps page; prompts otherwise
+        get_auth_session().authenticate(self.get_root(), self._perform_update)
 
     def _show_error(self, message):
         root = self.get_root()
@@ -315,60 +273,74 @@ class ThemePicker(Gtk.Box):
         content_box.append(self.status_label)
 
         self.progress_dialog.set_extra_child(content_box)
+        self.progress_dialog.add_response("cancel", _("Cancel"))
+        self.progress_dialog.connect("response", self._on_progress_response)
+        self.progress_dialog.connect("close-request", lambda dialog: self.update_task is not None)
         self.progress_dialog.present()
 
     def _update_progress(self, message):
         if hasattr(self, 'status_label'):
             self.status_label.set_label(message)
 
+    def _on_progress_response(self, dialog, response):
+        if response == "cancel" and self.update_task is not None:
+            # Stops at the next safe point; the dialog stays up until then
+            self.update_task.cancel()
+            self._update_progress(_("Cancelling..."))
+            dialog.set_response_enabled("cancel", False)
+
     # ---- Core update logic ----
 
-    def _perform_update(self, password):
+    def _perform_update(self):
         self._create_progress_dialog()
 
         has_kinexin = self._has_kinexin_desktop()
         apply_theme = self.selected_option == 0
 
-        def run_ops():
-            try:
-                # 1. Install linexin-hello (always)
-                packages = "linexin-hello"
-                if has_kinexin:
-                    packages += " kinexin-deco"
-
-                GLib.idle_add(self._update_progress, _("Installing new packages..."))
-                print(f"DEBUG: Installing packages: {packages}")
-                install_cmd = f"echo '{password}' | sudo -S pacman -Sy --noconfirm --overwrite '*' {packages}"
-                subprocess.run(install_cmd, shell=True, check=True)
-
-                # 2. Apply theme if user chose option 0
-                if apply_theme:
-                    GLib.idle_add(self._update_progress, _("Applying new theme..."))
-                    print("DEBUG: Applying new Linexin theme")
-                    self._apply_theme(has_kinexin)
-
-                    # Allow flatpak apps to read the GTK theme configs
-                    for gtk_ver in ("gtk-4.0", "gtk-3.0"):
-                        flatpak_cmd = f"echo '{password}' | sudo -S flatpak override --filesystem=xdg-config/{gtk_ver}:ro"
-                        subprocess.run(flatpak_cmd, shell=True, check=True)
-                        print(f"DEBUG: flatpak override set for {gtk_ver}")
-
-                # 3. Clear sudo cache
-                subprocess.run("sudo -k", shell=True)
-
-                print("DEBUG: Update completed successfully")
-                GLib.idle_add(self._on_update_success, password)
-
-            except subprocess.CalledProcessError as e:
-                print(f"ERROR: Update failed: {e}")
-                subprocess.run("sudo -k", shell=True)
-                GLib.idle_add(self._on_update_error, str(e))
+        # Runs on the main loop; privileged steps and file copies don't block it
+        self.update_task = get_task_runner().run_task(
+            self._update_steps(has_kinexin, apply_theme), "Theme update"
+        )
 
-        thread = threading.Thread(target=run_ops, daemon=True)
-        thread.start()
+    def _update_steps(self, has_kinexin, apply_theme):
+        runner = get_task_runner()
+        try:
+            # 1. Install linexin-hello (always)
+            packages = ["linexin-hello"]
+            if has_kinexin:
+                packages.append("kinexin-deco")
+
+            self._update_progress(_("Installing new packages..."))
+            print(f"DEBUG: Installing packages: {' '.join(packages)}")
+            yield from runner.pacman_sync(packages, overwrite="*")
+
+            # 2. Apply theme if user chose option 0
+            if apply_theme:
+                self._update_progress(_("Applying new theme..."))
+                print("DEBUG: Applying new Linexin theme")
+                yield runner.call_blocking(self._apply_theme, has_kinexin)
+
+                # Allow flatpak apps to read the GTK theme configs
+                for gtk_ver in ("gtk-4.0", "gtk-3.0"):
+                    yield runner.run_privileged(["flatpak", "override", f"--filesystem=xdg-config/{gtk_ver}:ro"])
+                    print(f"DEBUG: flatpak override set for {gtk_ver}")
+
+            print("DEBUG: Update completed successfully")
+            self._on_update_success()
+
+        except Cancelled:
+            self._on_update_cancelled()
+        except (subprocess.CalledProcessError, HelperError, OSError) as e:
+            print(f"ERROR: Update failed: {e}")
+            self._on_update_error(str(e))
+        except Exception as e:
+            print(f"ERROR: Unexpected error during update: {e}")
+            self._on_update_error(str(e))
 
     def _apply_theme(self, has_kinexin):
         """Copy GTK theme dirs from skel and optionally update kwinrc."""
+        import shutil
+
         home = os.path.expanduser("~")
         config_dir = os.path.join(home, ".config")
 
@@ -395,6 +367,8 @@ class ThemePicker(Gtk.Box):
     @staticmethod
     def _update_kwinrc(kwinrc_path):
         """Change library= in [org.kde.kdecoration2] to kinexin-deco-kwin."""
+        import configparser
+
         config = configparser.ConfigParser(interpolation=None)
         # Preserve case of option names
         config.optionxform = str
@@ -411,7 +385,8 @@ class ThemePicker(Gtk.Box):
 
     # ---- Completion handlers ----
 
-    def _on_update_success(self, password):
+    def _on_update_success(self):
+        self.update_task = None
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
 
@@ -419,11 +394,18 @@ class ThemePicker(Gtk.Box):
         print(f"DEBUG: Update finished with selection: {selected_option['name']}")
 
         if self.on_continue_callback:
-            self.on_continue_callback(self.selected_option, selected_option, password)
+            self.on_continue_callback(self.selected_option, selected_option)
         else:
             print("DEBUG: No continue callback provided")
 
+    def _on_update_cancelled(self):
+        # Stay on this page so the user can try again
+        self.update_task = None
+        if hasattr(self, 'progress_dialog'):
+            self.progress_dialog.close()
+
     def _on_update_error(self, error_message):
+        self.update_task = None
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
         self._show_error(_("Failed to update packages: ") + error_message)
@@ -0,0 +1,792 @@
+#!/usr/bin/env python3
+
+import gi
+import os
+import sys
+import time
+
+# Page modules are imported by their page factories in MainWindow, so a
+# slide and its dependencies only load once the page is first needed.
+#from custom_widget import CustomWidget
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, GLib, Gdk
+
+from simple_localization_manager import get_localization_manager, _
+from startup_tracer import tracer
+from system_probe import get_system_probe
+from pacman_db import get_local_database
+from privileged_helper import get_privileged_helper, FileBatch, HelperError
+from auth_session import get_auth_session
+from task_runner import get_task_runner, Cancelled
+
+tracer.instrument_css()
+
+# --- Localization Setup ---
+APP_NAME = "linexin-upgrader"
+
+# Time budget (ms) for one idle prebuild chunk, so input and animations
+# on the visible page keep getting serviced between chunks.
+PREBUILD_CHUNK_BUDGET_MS = 12
+
+class MainWindow(Adw.ApplicationWindow):
+    def __init__(self, app):
+
+        config_dir = "/tmp/installer_config"
+        if os.path.exists(config_dir):
+            import shutil
+            shutil.rmtree(config_dir)  
+
+        super().__init__(application=app)
+        self.set_title("")
+        self.set_default_size(800, 700)
+        self.set_size_request(-1, 700)
+        self.progress_visible = False
+        self.install_started = False
+        self.progress_data = ""
+        self.error_message = None
+        self.progress_data = ""
+        self.error_message = None
+        self.caro = 4
+        self.is_installing = False # Flag to track active installation
+        self.install_task = None # Task runner operation of the running installation
+        self.force_close = False # Flag to allow closing programmatically (e.g. reboot)
+
+        # Connect the close request signal
+        self.connect("close-request", self.on_close_request)
+
+        # --- Main Layout Changes ---
+        top_level_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.set_content(top_level_box)
+
+        self.header_bar = Adw.HeaderBar()
+        self.header_bar.set_title_widget(Adw.WindowTitle.new(self.get_title(), ""))
+        # Disable window controls as requested (Kiosk-like mode)
+        self.header_bar.set_show_end_title_buttons(False)
+        self.header_bar.set_show_start_title_buttons(False)
+        
+        top_level_box.append(self.header_bar)
+        css_provider = Gtk.CssProvider()
+        css = """
+        headerbar {
+            background-color: transparent;
+            border: none;
+            box-shadow: none;
+        }
+        .titlebar {
+            background-color: transparent;
+        }
+        .proceed_button {
+            font-size: 16px;
+            min-width: 300px;
+            min-height: 40px; 
+        }
+        .welcome_text {
+            font-size: 40px;
+        }
+        .buttons_all {
+            font-size: 14px;
+            min-width: 150px;
+            min-height: 40px;
+        }
+        """
+        css_provider.load_from_data(css.encode())
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
+        
+        # System version decides the flow; it arrives from the SystemProbe
+        self.version_id = None
+        self.needs_update1 = False
+        self.needs_update2 = False
+        self._pending_news_continue = False
+
+        # --- Main Gtk.Stack to switch between app sections ---
+        self.main_stack = Gtk.Stack()
+        self.main_stack.set_transition_type(Gtk.StackTransitionType.SLIDE_LEFT_RIGHT)
+        self.main_stack.set_vexpand(True)
+        self.main_stack.set_hexpand(True)
+        self.main_stack.set_halign(Gtk.Align.FILL)
+        self.main_stack.set_valign(Gtk.Align.FILL)
+        top_level_box.append(self.main_stack)
+
+        # --- Page registry ---
+        # Every stack child is a factory that only runs the first time
+        # navigation targets it, so startup pays for the welcome page alone.
+        self._page_factories = {
+            "welcome": self._build_welcome_page,
+            "news": self._build_news_page,
+            "update1_slide1": self._build_update1_slide1_page,
+            "update1_slide2": self._build_update1_slide2_page,
+            "update2_slide1": self._build_update2_slide1_page,
+            "update3_slide1": self._build_update3_slide1_page,
+            "finish": self._build_finish_page,
+        }
+        self._pages = {}
+
+        # Pages in the order they appear in the flow. The version specific
+        # part is appended once the system version is known.
+        self.page_flow = ["welcome", "news"]
+
+        self._get_page("welcome")
+
+        # Also register the main window for header bar elements
+        get_localization_manager().register_widget(self)
+
+        # --- Handle Page Switching & Header Bar Logic ---
+        self.main_stack.connect("notify::visible-child", self._on_page_changed)
+        # Initial state check
+        self._on_page_changed(self.main_stack, None)
+
+        # Build the rest of the flow in the background once we are on screen
+        self._prebuild_running = False
+        self.connect("map", self._on_window_mapped)
+
+        probe = get_system_probe()
+        if probe.is_ready("version-id"):
+            self._on_version_id_ready(probe, None)
+        else:
+            probe.connect("notify::version-id", self._on_version_id_ready)
+
+    def _on_version_id_ready(self, probe, param):
+        """Complete the page flow for the detected system version."""
+        if self.version_id is not None:
+            return
+        self.version_id = probe.version_id
+        self.needs_update1 = self.version_id in ("1.0", "1.0.1")
+        self.needs_update2 = self.version_id in ("1.0", "1.0.1", "1.1", "1.1.1")
+        # 1.0 / 1.0.1 -> update1 slides + update2_slide1 + update3_slide1
+        # 1.1 / 1.1.1 -> update2_slide1 + update3_slide1
+        # 2.0         -> update3_slide1 only
+        if self.needs_update1:
+            self.page_flow += ["update1_slide1", "update1_slide2"]
+        if self.needs_update2:
+            self.page_flow.append("update2_slide1")
+        self.page_flow += ["update3_slide1", "finish"]
+
+        # Resume prebuilding if it already ran out of known pages
+        if self.get_mapped():
+            self._on_window_mapped(self)
+
+        if self._pending_news_continue:
+            self._pending_news_continue = False
+            self.on_news_continue_clicked(None)
+
+    def _on_page_changed(self, stack, param):
+        """Updates window controls based on current page."""
+        name = stack.get_visible_child_name()
+        self._update_header_bar(name)
+
+    def _update_header_bar(self, page_name):
+        """
+        Show window controls only on 'welcome' and 'news'.
+        Hide them on 'apps', 'finish' or others.
+        """
+        if page_name in ["welcome", "news"]:
+            self.header_bar.set_show_end_title_buttons(True)
+            self.header_bar.set_show_start_title_buttons(True) # Optional, usually just end buttons needed
+        else:
+            self.header_bar.set_show_end_title_buttons(False)
+            self.header_bar.set_show_start_title_buttons(False)
+
+        # Variable to store the user's choice regarding GNOME removal
+        self.remove_gnome_flag = False
+        self.installing_kinexin = False # Track which DE is being installed
+
+    # --- Page registry ---
+    def _get_page(self, name):
+        """Return the page for `name`, building it on first use."""
+        page = self._pages.get(name)
+        if page is not None:
+            return page
+
+        # Gtk.Stack slides according to child order, so make sure every
+        # earlier page of the flow is in the stack before this one.
+        if name in self.page_flow:
+            for earlier in self.page_flow[:self.page_flow.index(name)]:
+                if earlier not in self._pages:
+                    self._get_page(earlier)
+
+        with tracer.span(f"build page: {name}", "pages"):
+            page = self._page_factories[name]()
+        self._pages[name] = page
+        self.main_stack.add_named(page, name)
+        get_localization_manager().register_widget(page)
+        return page
+
+    def _show_page(self, name):
+        """Build the page if needed and make it the visible child."""
+        self._get_page(name)
+        self.main_stack.set_visible_child_name(name)
+
+    def _on_window_mapped(self, window):
+        """Start prebuilding the upcoming pages at low idle priority."""
+        if not self._prebuild_running:
+            self._prebuild_running = True
+            GLib.idle_add(self._prebuild_pages_chunk, priority=GLib.PRIORITY_LOW)
+
+    def _prebuild_pages_chunk(self):
+        """
+        Build the next unbuilt pages of the flow until the chunk budget is
+        spent. Returns True while pages remain so GLib calls us again.
+        """
+        start = time.monotonic()
+        for name in self.page_flow:
+            if name in self._pages:
+                continue
+            self._get_page(name)
+            if (time.monotonic() - start) * 1000 >= PREBUILD_CHUNK_BUDGET_MS:
+                return True
+        self._prebuild_running = False
+        if self.version_id is not None:
+            print("Prebuilt all wizard pages.")
+        return False
+
+    def _build_welcome_page(self):
+        from welcome_widget import WelcomeWidget
+
+        page = WelcomeWidget()
+        page.btn_install.connect("clicked", self.on_begin_clicked)
+        return page
+
+    def _build_news_page(self):
+        from news_widget import WhatsNewWidget
+
+        page = WhatsNewWidget()
+        page.btn_continue.connect("clicked", self.on_news_continue_clicked)
+        return page
+
+    def _build_update1_slide1_page(self):
+        from update1_slide1 import InstallDefaultsWidget
+
+        page = InstallDefaultsWidget()
+        page.back_btn.connect("clicked", self.on_update1_slide1_back_clicked)
+        page.continue_btn.connect("clicked", self.on_update1_slide1_continue_clicked)
+        return page
+
+    def _build_update1_slide2_page(self):
+        from update1_slide2 import LinexinCenterStyleWidget
+
+        page = LinexinCenterStyleWidget()
+        page.back_btn.connect("clicked", self.on_update1_slide2_back_clicked)
+        page.continue_btn.connect("clicked", self.on_update1_slide2_continue_clicked)
+        return page
+
+    def _build_update2_slide1_page(self):
+        # DEPicker uses a callback for continue
+        from update2_slide1 import DEPicker
+
+        page = DEPicker()
+        page.back_btn.connect("clicked", self.on_update2_slide1_back_clicked)
+        page.on_continue_callback = self.on_update2_slide1_continue_clicked
+        return page
+
+    def _build_update3_slide1_page(self):
+        # ThemePicker uses a callback for continue
+        from update3_slide1 import ThemePicker
+
+        page = ThemePicker()
+        page.back_btn.connect("clicked", self.on_update3_slide1_back_clicked)
+        page.on_continue_callback = self.on_update3_slide1_continue_clicked
+        return page
+
+    def _build_finish_page(self):
+        from finish_widget import FinishWidget
+
+        page = FinishWidget()
+        page.btn_back.connect("clicked", self.on_back_from_finish_clicked)
+        return page
+
+    def on_begin_clicked(self, button):
+        self._show_page("news")
+
+    def on_news_continue_clicked(self, button):
+        if self.version_id is None:
+            # The flow is not known yet; continue as soon as it is
+            self._pending_news_continue = True
+            return
+        if self.needs_update1:
+            self._show_page("update1_slide1")
+        elif self.needs_update2:
+            self._show_page("update2_slide1")
+        else:
+            self._show_page("update3_slide1")
+
+    # --- update1 slide navigation (only used for 1.0 / 1.0.1) ---
+    def on_update1_slide1_back_clicked(self, button):
+        self._show_page("news")
+
+    def on_update1_slide1_continue_clicked(self, button):
+        self._show_page("update1_slide2")
+
+    def on_update1_slide2_back_clicked(self, button):
+        self._show_page("update1_slide1")
+
+    def on_update1_slide2_continue_clicked(self, button):
+        # Apply the user's Linexin Center style choice
+        if self._get_page("update1_slide2").selected_option == 1:
+            get_auth_session().authenticate(self, self._show_separate_desktop_files,
+                                            self._on_separate_desktop_files_skipped)
+        self._show_page("update2_slide1")
+
+    # --- update2 slide navigation ---
+    def on_update2_slide1_back_clicked(self, button):
+        if self.needs_update1:
+            self._show_page("update1_slide2")
+        else:
+            self._show_page("news")
+
+    def on_update2_slide1_continue_clicked(self, index, option):
+        """
+        Handle the continue button click on the Apps/DE Picker page.
+        Received via callback from DEPicker.
+        """
+        if index == 1:
+            # Option 1: Kinexin Desktop -> Trigger confirmation flow
+            self.installing_kinexin = True
+            self.confirm_installation()
+        elif index == 0:
+            # Option 0: Linexin -> Install directly (no conflict check)
+            self.installing_kinexin = False
+            if get_auth_session().authenticated:
+                self._start_linexin_installation()
+            else:
+                self._show_page("update3_slide1")
+        else:
+            # Other logical paths
+            self.installing_kinexin = False
+            self._get_page("finish").set_requires_restart(False)
+            self._show_page("update3_slide1")
+
+    def confirm_installation(self):
+        """
+        Displays a warning dialog with 3 choices: Cancel, Keep GNOME, Remove GNOME.
+        """
+        # Create the warning dialog
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            heading=_("Installation Conflict Warning"),
+            body=_("Installing Kinexin Desktop alongside your current desktop (GNOME) may cause configuration conflicts.\n\n"
+                   "You can choose to remove GNOME completely to ensure the best experience, or keep both installed side-by-side.")
+        )
+
+        # Add the three responses
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("keep_gnome", _("Install Side-by-Side"))
+        dialog.add_response("remove_gnome", _("Remove GNOME & Install"))
+        
+        # Style the remove button as destructive to warn the user
+        dialog.set_response_appearance("remove_gnome", Adw.ResponseAppearance.DESTRUCTIVE)
+        
+        # Style the keep button as suggested/default if preferred, or leave neutral
+        #dialog.set_response_appearance("keep_gnome", Adw.ResponseAppearance.SUGGESTED)
+
+        dialog.connect("response", self._on_confirm_response)
+        dialog.present()
+
+    def _on_confirm_response(self, dialog, response):
+        """Handle the user's choice from the confirmation dialog."""
+        if response == "remove_gnome":
+            self.remove_gnome_flag = True
+            self._authenticate_and_install()
+        elif response == "keep_gnome":
+            self.remove_gnome_flag = False
+            self._authenticate_and_install()
+        else:
+            # Cancelled or closed
+            self._show_page("update2_slide1")
+
+    # --- update3 slide navigation ---
+    def on_update3_slide1_back_clicked(self, button):
+        if self.needs_update2:
+            self._show_page("update2_slide1")
+        else:
+            self._show_page("news")
+
+    def on_update3_slide1_continue_clicked(self, index, option):
+        """Handle continue from ThemePicker. Navigate to finish."""
+        if not self.needs_update2:
+            self._get_page("finish").set_requires_restart(True)
+
+        # Update version/os-release files and hide desktop entry
+        if get_auth_session().authenticated:
+            task = get_task_runner().run_task(self._finalize_system_files(), "Finalizing")
+            task.add_done_callback(lambda task: self._show_page("finish"))
+        else:
+            self._show_page("finish")
+
+    def _authenticate_and_install(self):
+        """Start the installation once the wizard's auth session is ready."""
+        get_auth_session().authenticate(
+            self, self._start_installation,
+            on_cancelled=lambda: self._show_page("update2_slide1")
+        )
+
+    def _start_installation(self):
+        """Starts the Kinexin installation"""
+        self.is_installing = True
+        # 1. Show the Progress Dialog immediately
+        self._create_progress_dialog()
+        
+        # 2. Run the installation steps on the task runner
+        self.install_task = get_task_runner().run_task(
+            self._execute_installation_logic(self.remove_gnome_flag), "Kinexin installation"
+        )
+
+    def _start_linexin_installation(self):
+        """Start Linexin installation immediately"""
+        self.is_installing = True
+        # 1. Show the Progress Dialog (using Linexin title)
+        self._create_progress_dialog(is_kinexin=False)
+        
+        # 2. Run the installation steps on the task runner
+        self.install_task = get_task_runner().run_task(
+            self._execute_linexin_logic(), "Linexin installation"
+        )
+
+    def _create_progress_dialog(self, is_kinexin=True):
+        """
+        Creates a modal dialog with a spinner to show installation progress.
+        """
+        title = _("Installing Kinexin Desktop") if is_kinexin else _("Installing Linexin Desktop")
+        
+        self.progress_dialog = Adw.MessageDialog(
+            transient_for=self,
+            heading=title,
+            body=_("Please wait while the system is being updated.\nThis may take several minutes.")
+        )
+        
+        # Create a box to hold the spinner and a status label
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        content_box.set_halign(Gtk.Align.CENTER)
+        
+        # Add Spinner
+        self.spinner = Gtk.Spinner()
+        self.spinner.set_size_request(32, 32)
+        self.spinner.start()
+        content_box.append(self.spinner)
+        
+        # Add Status Label (to update text like "Running pacman...")
+        self.status_label = Gtk.Label(label=_("Initializing..."))
+        content_box.append(self.status_label)
+        
+        self.progress_dialog.set_extra_child(content_box)
+        
+        # Cancel stops at the next safe point: between downloads, or once a
+        # running package transaction has finished. The dialog stays up
+        # until the installation has actually stopped.
+        self.progress_dialog.add_response("cancel", _("Cancel"))
+        self.progress_dialog.connect("response", self._on_progress_response)
+        self.progress_dialog.connect("close-request", lambda dialog: self.is_installing)
+        self.progress_dialog.present()
+
+    def _on_progress_response(self, dialog, response):
+        if response == "cancel":
+            self._cancel_installation()
+
+    def _cancel_installation(self):
+        """Ask the running installation to stop."""
+        if not self.is_installing or self.install_task is None:
+            return
+        print("Cancelling installation...")
+        self.install_task.cancel()
+        self._update_progress_status(_("Cancelling..."))
+        if hasattr(self, 'progress_dialog'):
+            self.progress_dialog.set_response_enabled("cancel", False)
+
+    def _update_progress_status(self, message):
+        """Helper to update status label from main thread."""
+        if hasattr(self, 'status_label'):
+            self.status_label.set_label(message)
+
+    def _on_installation_success(self):
+        """Called when installation finishes successfully."""
+        self.is_installing = False
+        # Close the progress dialog
+        if hasattr(self, 'progress_dialog'):
+            self.progress_dialog.close()
+        
+        # The desktop packages changed; keep the startup facts current
+        get_system_probe().refresh("has-kinexin-desktop")
+
+        # Set the reboot flag for both Linexin and Kinexin installations
+        self._get_page("finish").set_requires_restart(True)
+        
+        # Switch to the update3 slide (theme picker) after DE installation
+        self._show_page("update3_slide1")
+
+    def _on_installation_error(self, error_message):
+        """Called if installation fails."""
+        self.is_installing = False
+        # Stop spinner
+        if hasattr(self, 'spinner'):
+            self.spinner.stop()
+        
+        # Update text to show error
+        if hasattr(self, 'status_label'):
+            self.status_label.set_label(f"Error: {error_message}")
+            
+        # Add a Close button so user can dismiss the failed dialog
+        if hasattr(self, 'progress_dialog'):
+            self.progress_dialog.set_heading(_("Installation Failed"))
+            self.progress_dialog.set_body(_("An error occurred during installation."))
+            self.progress_dialog.set_response_enabled("cancel", False)
+            self.progress_dialog.add_response("close", _("Close"))
+
+    def _on_installation_cancelled(self):
+        """Called once a cancelled installation has stopped."""
+        self.is_installing = False
+        if hasattr(self, 'spinner'):
+            self.spinner.stop()
+        if hasattr(self, 'status_label'):
+            self.status_label.set_label("")
+
+        # The user stays on the desktop picker and can start over
+        if hasattr(self, 'progress_dialog'):
+            self.progress_dialog.set_heading(_("Installation Cancelled"))
+            self.progress_dialog.set_body(_("The installation was cancelled."))
+            self.progress_dialog.add_response("close", _("Close"))
+
+    def _execute_linexin_logic(self):
+        """
+        Executes the Linexin Desktop installation commands.
+        A task runner generator: each yield waits for one step.
+        """
+        import subprocess
+        runner = get_task_runner()
+        try:
+            self._update_progress_status(_("Installing Linexin Desktop..."))
+            print("Running pacman for Linexin...")
+            
+            # Install linexin-desktop with overwrite
+            yield from runner.pacman_sync(["linexin-desktop"], overwrite="*")
+            
+            # Update OS Release and Version files, hide desktop entry
+            yield from self._finalize_system_files()
+
+            print("Linexin installation completed successfully.")
+            self._on_installation_success()
+            
+        except Cancelled:
+            self._on_installation_cancelled()
+        except subprocess.CalledProcessError as e:
+            print(f"An error occurred during Linexin installation: {e}")
+            self._on_installation_error(f"Command failed: {e}")
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            self._on_installation_error(str(e))
+
+    def _execute_installation_logic(self, remove_gnome):
+        """
+        Executes the installation commands.
+        A task runner generator: each yield waits for one step, and the UI
+        is updated directly since it runs on the main loop.
+        """
+        import subprocess
+        runner = get_task_runner()
+        helper = get_privileged_helper()
+        
+        try:
+            # Update UI
+            self._update_progress_status(_("Creating permissions wrapper..."))
+            
+            # 1. paru takes a sudo program; point it at the privileged helper
+            wrapper_path = helper.write_sudo_wrapper()
+
+            # 3. Run Pacman for Kinexin (and Linexin if side-by-side)
+            self._update_progress_status(_("Installing Desktop Environment..."))
+            print("Running pacman for Kinexin...")
+            
+            pkgs = ["kinexin-desktop"]
+            if not remove_gnome:
+                # User requested both for side-by-side
+                pkgs.append("linexin-desktop")
+
+            yield from runner.pacman_sync(pkgs, overwrite="*")
+
+            # 4. Run Paru for Effects
+            self._update_progress_status(_("Installing Window Effects..."))
+            print("Running paru...")
+            
+            paru_cmd = [
+                "paru", "-S", "--overwrite", "*", "--rebuild", "--noconfirm",
+                "--sudo", wrapper_path, 
+                "kwin-effect-rounded-corners-git", "kwin-effects-glass-git"
+            ]
+            
+            yield runner.spawn(paru_cmd, capture=False)
+
+            # 2. (Optional) Remove GNOME; pacman fails on a group with no
+            # installed members, so look it up in the (just changed) local DB
+            gnome_packages = []
+            if remove_gnome:
+                gnome_packages = yield runner.call_blocking(get_local_database().group, "gnome")
+            if gnome_packages:
+                self._update_progress_status(_("Removing GNOME Desktop..."))
+                print("Removing GNOME...")
+                # Using -Rsc to remove gnome recursively and clean deps
+                # WARNING: This is aggressive, but requested by user
+                yield runner.run_privileged(["pacman", "-Rsc", "gnome", "--noconfirm"])
+
+            # 5. Update OS Release and Version files (User Request), hide desktop entry
+            yield from self._finalize_system_files()
+
+            print("Installation commands completed successfully.")
+            
+            # Success! Transition to finish page
+            self._on_installation_success()
+            
+        except Cancelled:
+            self._on_installation_cancelled()
+        except subprocess.CalledProcessError as e:
+            print(f"An error occurred during installation: {e}")
+            # Show error on UI
+            self._on_installation_error(f"Command failed: {e}")
+            
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            # Show error on UI
+            self._on_installation_error(str(e))
+
+    def _finalize_system_files(self):
+        """
+        Post-install file changes, applied as root:
+        1. copy /usr/share/linexin-upgrade-tool/os-release -> /usr/lib/os-release
+        2. link /usr/lib/os-release -> /etc/os-release
+        3. copy /usr/share/linexin-upgrade-tool/version -> /version
+        4. turn NoDisplay=false into NoDisplay=true in our desktop entry
+           to hide it from menus
+        1-3 are one all-or-nothing batch; 4 is applied on its own, so a
+        problem with the desktop entry cannot hold back the version files.
+        A task runner generator, so installs can `yield from` it.
+        """
+        helper = get_privileged_helper()
+        runner = get_task_runner()
+        try:
+            self._update_progress_status(_("Updating system version info..."))
+            print("Updating OS release and version files...")
+            
+            # Source paths
+            src_os_release = "/usr/share/linexin-upgrade-tool/os-release"
+            src_version = "/usr/share/linexin-upgrade-tool/version"
+            
+            # Destination paths
+            dest_os_release_lib = "/usr/lib/os-release"
+            dest_os_release_etc = "/etc/os-release"
+            dest_version = "/version"
+            desktop_file = "/usr/share/applications/github.petexy.linexinupgradetool.desktop"
+
+            batch = (
+                FileBatch()
+                .copy(src_os_release, dest_os_release_lib, mode=0o644)
+                .symlink(dest_os_release_lib, dest_os_release_etc)
+                .copy(src_version, dest_version, mode=0o644)
+            )
+            yield runner.call_blocking(helper.apply, batch)
+            
+            print("OS files updated successfully.")
+            
+        except HelperError as e:
+            print(f"Warning: Failed to update OS files: {e}")
+            # We log but might not want to fail the whole install for this? 
+            # Proceeding as it is a post-install step.
+
+        try:
+            print("Hiding desktop entry...")
+            batch = FileBatch().set_ini_key(desktop_file, "Desktop Entry", "NoDisplay", "true",
+                                            skip_missing=True, only_if="false")
+            yield runner.call_blocking(helper.apply, batch)
+        except HelperError as e:
+            print(f"Warning: Failed to hide desktop entry: {e}")
+
+    def _show_separate_desktop_files(self):
+        """Show individual app desktop files when user chooses 'Separate Apps Icons'."""
+        batch = FileBatch()
+        for name in ("github.petexy.linexinupdater.desktop",
+                     "github.petexy.linexin-desktop-presets.desktop",
+                     "github.petexy.affinityinstaller.desktop",
+                     "github.petexy.davinciinstaller.desktop"):
+            batch.set_ini_key(f"/usr/share/applications/{name}", "Desktop Entry",
+                              "Hidden", "false", skip_missing=True)
+        operation = get_task_runner().call_blocking(get_privileged_helper().apply, batch)
+        operation.add_done_callback(self._on_separate_desktop_files_done)
+
+    def _on_separate_desktop_files_done(self, operation):
+        try:
+            operation.result()
+        except HelperError as e:
+            print(f"Warning: Failed to show separate desktop files: {e}")
+            self._on_separate_desktop_files_skipped()
+
+    def _on_separate_desktop_files_skipped(self):
+        """Tell the user the icons were left grouped; the wizard goes on regardless."""
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            heading=_("Separate Icons Not Applied"),
+            body=_("Your Linexin apps stay grouped in Linexin Center. Go back and choose Separate Apps Icons again to retry.")
+        )
+        dialog.add_response("ok", _("OK"))
+        dialog.present()
+
+    def get_app_directory(self):
+        """Get the directory where the installer script is located"""
+        return os.path.dirname(os.path.abspath(__file__))
+
+    def on_back_from_finish_clicked(self, button):
+        self._show_page("update3_slide1")
+
+    def on_close_request(self, window):
+        """
+        Handle application close request.
+        - Allow close on 'welcome', 'news'.
+        - Prevent close on others (enforcing kiosk-like flow).
+        - Prevent close if installing.
+        """
+        if self.force_close:
+            return False # Allow closing immediately
+            
+        if self.is_installing:
+            dialog = Adw.MessageDialog(
+                transient_for=self,
+                heading=_("Installation in Progress"),
+                body=_("The installation process is currently running. Please wait for it to complete.")
+            )
+            dialog.add_response("ok", _("OK"))
+            dialog.add_response("cancel", _("Cancel Installation"))
+            dialog.set_response_appearance("cancel", Adw.ResponseAppearance.DESTRUCTIVE)
+            dialog.connect("response", lambda dialog, response:
+                           response == "cancel" and self._cancel_installation())
+            dialog.present()
+            return True # Prevent closing
+            
+        current_page = self.main_stack.get_visible_child_name()
+        if current_page in ["welcome", "news"]:
+             # Allow closing
+             print("Application closing from allowed page.")
+             return False 
+        
+        # Block closing on other pages
+        print(f"Close request ignored on page: {current_page}")
+        return True # Prevent closing
+
+class Installer(Adw.Application):
+    def __init__(self):
+        super().__init__(application_id="github.petexy.linexinupgradetool")
+
+    def do_activate(self):
+        with tracer.span("MainWindow construction", "pages"):
+            win = MainWindow(self)
+        win.present()
+        tracer.watch_first_frame(win)
+
+def main(argv=None):
+    # Gather system facts while GTK starts up
+    get_system_probe().start()
+    app = Installer()
+    return app.run(sys.argv if argv is None else argv)
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
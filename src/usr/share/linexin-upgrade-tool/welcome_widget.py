@@ -3,8 +3,6 @@
 
 import gi
 import os
-import gettext
-import locale
 import math
 
 gi.require_version("Gtk", "4.0")